@@ -1,7 +1,6 @@
 import re
 import threading
 import time
-import random
 import sys
 
 try:
@@ -24,10 +23,17 @@ except ImportError:
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+# rosto animado (compartilhado com GuiaJarvis.py; tema em temas.py)
+from rosto import FaceLayout, FaceWidget
+from texto_ia import TextoIA
+from registro import BufferLogs, FiltrosLogs, LimitadorLogs, VisorLogs
+
 # parâmetros gerais
 BOT_TURN_TIMEOUT = 3.0          # janela para agrupar linhas da IA
 SLEEP_TIMEOUT = 20.0            # tempo parado até marcar como desconectada
 SIDE_CYCLE_INTERVAL = 100_000   # troca automática de aba (Projeto/Equipe/QR)
+REPOUSO_TIMEOUT = 15 * 60.0     # s em "sleep" até o repouso profundo (0 desliga)
+RESIZE_SETTLE_MS = 120          # rajadas de <Configure> viram um único passe de layout
 
 
 # -------------------- parse de linha do ESP --------------------
@@ -61,287 +67,13 @@ def parse_line(line: str):
     return {"type": "other", "tag": None, "content": line}
 
 
-# -------------------- rosto da Alicia --------------------
-
-class FaceWidget:
-    def __init__(self, parent):
-        self.canvas = tk.Canvas(parent, bg="#020308", highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-
-        self.estado = "sleep"  # idle | listening | speaking | sleep
-        self.boca_fase = 0.0
-        self.glow_fase = 0.0
-
-        self.piscando = False
-        self.ultimo_piscar = time.time()
-        self.intervalo_piscar = 4.0
-        self.intervalo_piscar_sono = 10.0
-
-        self.particulas = []
-        self._init_particulas()
-
-        self.fala_ate = 0.0  # anima boca mais forte até este timestamp
-
-        self.canvas.after(60, self._loop)
-
-    def _init_particulas(self):
-        self.particulas.clear()
-        for _ in range(18):
-            self.particulas.append(
-                {
-                    "x": random.random(),
-                    "y": random.random(),
-                    "r": random.uniform(1.5, 3.5),
-                    "vy": random.uniform(0.001, 0.003),
-                }
-            )
-
-    def set_estado(self, estado: str):
-        self.estado = estado
-        if estado == "speaking":
-            self.boca_fase = 0.0
-
-    def marcar_fala(self, segundos=2.0):
-        agora = time.time()
-        self.fala_ate = max(self.fala_ate, agora + segundos)
-
-    def _loop(self):
-        if self.estado == "speaking":
-            self.boca_fase += 1.0
-        else:
-            self.boca_fase = max(0.0, self.boca_fase - 0.5)
-
-        self.glow_fase += 0.6
-        self._desenhar()
-        self.canvas.after(60, self._loop)
-
-    def _desenhar(self):
-        self.canvas.delete("all")
-        w = self.canvas.winfo_width() or 800
-        h = self.canvas.winfo_height() or 450
-
-        self._desenhar_fundo(w, h)
-        self._desenhar_visor(w, h)
-
-    def _desenhar_fundo(self, w, h):
-        topo = (4, 9, 24)
-        meio = (9, 10, 32)
-        base = (6, 5, 16)
-        passos = 7
-
-        for i in range(passos):
-            t = i / (passos - 1)
-            if t < 0.5:
-                a = t * 2
-                r = int(topo[0] + (meio[0] - topo[0]) * a)
-                g = int(topo[1] + (meio[1] - topo[1]) * a)
-                b = int(topo[2] + (meio[2] - topo[2]) * a)
-            else:
-                a = (t - 0.5) * 2
-                r = int(meio[0] + (base[0] - meio[0]) * a)
-                g = int(meio[1] + (base[1] - meio[1]) * a)
-                b = int(meio[2] + (base[2] - meio[2]) * a)
-            self.canvas.create_rectangle(
-                0,
-                i * (h / passos),
-                w,
-                (i + 1) * (h / passos),
-                fill=f"#{r:02x}{g:02x}{b:02x}",
-                outline="",
-            )
-
-        for p in self.particulas:
-            fator = 0.25 if self.estado == "sleep" else 1.0
-            p["y"] -= p["vy"] * fator
-            if p["y"] < 0:
-                p["y"] = 1.0
-                p["x"] = random.random()
-
-            r = p["r"]
-            x = p["x"] * w
-            y = p["y"] * h
-            self.canvas.create_oval(
-                x - r, y - r, x + r, y + r, fill="#1B2B33", outline=""
-            )
-
-    def _round_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        pts = [
-            x1 + radius, y1,
-            x2 - radius, y1,
-            x2, y1,
-            x2, y1 + radius,
-            x2, y2 - radius,
-            x2, y2,
-            x2 - radius, y2,
-            x1 + radius, y2,
-            x1, y2,
-            x1, y2 - radius,
-            x1, y1 + radius,
-            x1, y1,
-        ]
-        self.canvas.create_polygon(pts, smooth=True, **kwargs)
-
-    def _desenhar_visor(self, w, h):
-        margem_x = w * 0.20
-        margem_y = h * 0.18
-        x1, y1 = margem_x, margem_y
-        x2, y2 = w - margem_x, h - margem_y
-        cx = (x1 + x2) / 2
-        cy = (y1 + y2) / 2
-        raio = min(w, h) * 0.05
-
-        if self.estado == "speaking":
-            base = 78
-        elif self.estado == "listening":
-            base = 68
-        else:
-            base = 52
-        brilho = base + int(24 * abs((self.glow_fase % 40) - 20) / 20)
-        cor_borda = f"#{brilho:02x}{(brilho+30):02x}{(brilho+70):02x}"
-
-        self._round_rect(
-            x1, y1, x2, y2,
-            radius=raio,
-            fill="#050508",
-            outline=cor_borda,
-            width=5,
-        )
-
-        margem_int = max(6, int(min(w, h) * 0.01))
-        self._round_rect(
-            x1 + margem_int,
-            y1 + margem_int,
-            x2 - margem_int,
-            y2 - margem_int,
-            radius=max(8, raio - 6),
-            fill="#020307",
-            outline="",
-        )
-
-        if self.estado == "speaking":
-            cor_olho = "#7CFF2F"
-        elif self.estado == "listening":
-            cor_olho = "#00E5FF"
-        elif self.estado == "sleep":
-            cor_olho = "#4E656F"
-        else:
-            cor_olho = "#4FFFB2"
-
-        espacamento = (x2 - x1) * 0.34
-        r_olho = min((x2 - x1), (y2 - y1)) * 0.11
-        olho_esq = (cx - espacamento / 2, cy - r_olho * 0.25)
-        olho_dir = (cx + espacamento / 2, cy - r_olho * 0.25)
-
-        agora = time.time()
-        intervalo = (
-            self.intervalo_piscar_sono if self.estado == "sleep"
-            else self.intervalo_piscar
-        )
-        if not self.piscando and (agora - self.ultimo_piscar) > intervalo:
-            self.piscando = True
-            self.ultimo_piscar = agora
-        elif self.piscando and (agora - self.ultimo_piscar) > 0.18:
-            self.piscando = False
-
-        if self.estado == "sleep":
-            for ex, ey in (olho_esq, olho_dir):
-                self.canvas.create_line(
-                    ex - r_olho * 0.9,
-                    ey + 1,
-                    ex + r_olho * 0.9,
-                    ey + 1,
-                    fill=cor_olho,
-                    width=5,
-                    capstyle=tk.ROUND,
-                )
-        else:
-            if self.piscando:
-                for ex, ey in (olho_esq, olho_dir):
-                    self.canvas.create_line(
-                        ex - r_olho,
-                        ey,
-                        ex + r_olho,
-                        ey,
-                        fill=cor_olho,
-                        width=6,
-                        capstyle=tk.ROUND,
-                    )
-            else:
-                for ex, ey in (olho_esq, olho_dir):
-                    self.canvas.create_oval(
-                        ex - r_olho,
-                        ey - r_olho,
-                        ex + r_olho,
-                        ey + r_olho,
-                        outline=cor_olho,
-                        width=5,
-                    )
-                    self.canvas.create_line(
-                        ex - r_olho * 0.78,
-                        ey,
-                        ex + r_olho * 0.78,
-                        ey,
-                        fill=cor_olho,
-                        width=5,
-                        capstyle=tk.ROUND,
-                    )
-
-        largura_boca = (x2 - x1) * 0.48
-        base_altura = (y2 - y1) * 0.22
-
-        intensidade = 0.0
-        if self.estado == "speaking":
-            resto = self.fala_ate - agora
-            intensidade = 0.65 if resto > 0 else 0.35
-        elif self.estado == "listening":
-            intensidade = 0.12
-        elif self.estado == "sleep":
-            intensidade = 0.05
-        else:
-            intensidade = 0.22
-
-        amp = base_altura * intensidade
-        altura = base_altura + amp * abs((self.boca_fase % 18) - 9) / 9
-        y_boca = cy + r_olho * 1.4
-
-        self.canvas.create_arc(
-            cx - largura_boca / 2,
-            y_boca - altura / 2,
-            cx + largura_boca / 2,
-            y_boca + altura / 2,
-            start=200,
-            extent=140,
-            style=tk.ARC,
-            outline=cor_olho,
-            width=6,
-        )
-
-        h_barra = max(4, int((y2 - y1) * 0.03))
-        comp_barra = (y2 - y1) * 0.34
-        self.canvas.create_line(
-            x1 + 14, cy - comp_barra / 2, x1 + 14, cy + comp_barra / 2,
-            fill=cor_olho, width=h_barra,
-        )
-        self.canvas.create_line(
-            x2 - 14, cy - comp_barra / 2, x2 - 14, cy + comp_barra / 2,
-            fill=cor_olho, width=h_barra,
-        )
-
-        self.canvas.create_text(
-            cx,
-            y2 + h * 0.03,
-            text="Alicia",
-            fill="#FFFFFF",
-            font=("Segoe UI", max(20, int(h * 0.04)), "bold"),
-        )
-
-
 # -------------------- painel lateral --------------------
 
 class SidePanel:
     MODOS = ("PROJETO", "EQUIPE", "QR", "CONFIG")
 
-    def __init__(self, parent, exit_cb):
+    def __init__(self, parent, exit_cb, buffer_logs=None):
+        self.buffer_logs = buffer_logs if buffer_logs is not None else BufferLogs()
         self.frame = tk.Frame(parent, bg="#050509", width=440)
         self.frame.pack(side=tk.RIGHT, fill=tk.Y)
         self.frame.pack_propagate(False)
@@ -561,19 +293,23 @@ class SidePanel:
         scroll = ttk.Scrollbar(
             logs_container, orient="vertical", command=self.text_logs.yview
         )
-        self.text_logs.config(yscrollcommand=scroll.set)
 
         self.text_logs.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=(4, 0))
         scroll.pack(side=tk.RIGHT, fill=tk.Y, pady=(4, 0))
 
         self.text_logs.config(state=tk.DISABLED)
-        self.buffer_logs = []
+        # o visor liga a barra à janela que ele mostra do buffer, não ao Text
+        self.visor_logs = VisorLogs(self.text_logs, scroll, self.buffer_logs)
+        self.filtros_logs = FiltrosLogs(self.page_config, self.visor_logs)
+        self.filtros_logs.frame.pack(fill=tk.X, pady=(0, 4), before=logs_container)
 
     def set_modo(self, modo: str):
         if modo not in self.MODOS:
             return
         self.modo = modo
         self.auto = modo not in ("CONFIG",)
+        if modo != "CONFIG":
+            self.visor_logs.ocultar()
 
         if modo == "PROJETO":
             self._raise_page(self.page_projeto)
@@ -585,19 +321,14 @@ class SidePanel:
             if callable(self.on_enter_config):
                 self.on_enter_config()
             self._raise_page(self.page_config)
+            self.visor_logs.mostrar()
 
     def _raise_page(self, page):
         page.tkraise()
 
     def add_log(self, nivel, tag, msg):
         self.buffer_logs.append((nivel, tag, msg))
-        if self.modo == "CONFIG":
-            self.text_logs.config(state=tk.NORMAL)
-            pref = {"warn": "⚠️ ", "error": "❌ ", "state": "🎛 "}.get(nivel, "ℹ️ ")
-            tag_str = f"[{tag}] " if tag else ""
-            self.text_logs.insert(tk.END, f"{pref}{tag_str}{msg}\n")
-            self.text_logs.see(tk.END)
-            self.text_logs.config(state=tk.DISABLED)
+        self.visor_logs.novo()
 
     def ciclo_auto(self):
         if not self.auto:
@@ -635,7 +366,7 @@ class StatusBar:
 
         self.estado = "sleep"
         self.fase = 0
-        self.frame.after(350, self._loop)
+        self._after_id = self.frame.after(350, self._loop)
 
     def set_estado(self, estado: str):
         self.estado = estado
@@ -656,13 +387,22 @@ class StatusBar:
             dots = ""
         self.lbl_dots.config(text=dots)
         self.fase += 1
-        self.frame.after(350, self._loop)
+        self._after_id = self.frame.after(350, self._loop)
+
+    def repousar(self, ativo: bool):
+        """Repouso profundo: para a animação dos pontos até ser desligado."""
+        if ativo and self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+            self._after_id = None
+            self.lbl_dots.config(text="")
+        elif not ativo and self._after_id is None:
+            self._after_id = self.frame.after(350, self._loop)
 
 
 # -------------------- app principal --------------------
 
 class App:
-    def __init__(self, root):
+    def __init__(self, root, repouso=REPOUSO_TIMEOUT):
         self.root = root
         self.root.title("Alicia – Assistente de voz (ESP32-S3 + Xiaozhi)")
         self.root.configure(bg="#000000")
@@ -672,6 +412,14 @@ class App:
         self.root.bind("<F11>", self.toggle_fullscreen)
         self.root.bind("<Escape>", self.sair_fullscreen)
         self.root.bind("<Configure>", self._on_resize)
+        self._resize_id = None
+
+        # Repouso profundo: depois de `repouso` s em sleep o rosto congela e os
+        # timers periódicos param; o primeiro byte da serial acorda tudo.
+        self.estado = "sleep"
+        self.repouso_timeout = repouso
+        self.em_repouso = False
+        self._repouso_id = None
 
         self.main = tk.Frame(self.root, bg="#000000")
         self.main.pack(fill=tk.BOTH, expand=True)
@@ -681,7 +429,8 @@ class App:
 
         self.face_frame = tk.Frame(self.left, bg="#020308")
         self.face_frame.pack(fill=tk.BOTH, expand=True)
-        self.face = FaceWidget(self.face_frame)
+        self.face = FaceWidget(self.face_frame, tema="alicia")
+        self.face.ao_mudar_qualidade = self._qualidade_mudou
         self.face.set_estado("sleep")
 
         self.text_frame = tk.Frame(self.left, bg="#020308", height=260)
@@ -711,6 +460,11 @@ class App:
         )
         self.txt_ia.pack(fill=tk.BOTH, padx=44, pady=(0, 18))
         self.txt_ia.config(state=tk.DISABLED)
+        self.ia = TextoIA(self.txt_ia)
+
+        # Repetições e rajadas de log param aqui, antes do painel
+        self.limitador = LimitadorLogs()
+        self._limitador_id = None
 
         self.side_panel = SidePanel(self.main, exit_cb=self.on_close)
         self.side_panel.on_enter_config = self._atualizar_portas
@@ -729,7 +483,8 @@ class App:
         self.reader_running = False
         self.serial_lock = threading.Lock()
 
-        self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._set_estado("sleep")
 
     # --- UI de serial ---
 
@@ -838,8 +593,7 @@ class App:
             except Exception as e:
                 messagebox.showerror("Serial", f"Erro ao abrir {port}: {e}")
                 self._log("error", "SYSTEM", f"Erro ao abrir {port}: {e}")
-                self.face.set_estado("sleep")
-                self.status_bar.set_estado("sleep")
+                self._set_estado("sleep")
                 self._sync_serial_buttons(False)
                 return
 
@@ -851,8 +605,7 @@ class App:
             self.reader_thread.start()
 
         self._sync_serial_buttons(True)
-        self.face.set_estado("idle")
-        self.status_bar.set_estado("idle")
+        self._set_estado("idle")
         self.ultimo_atividade = time.time()
 
     def desconectar_serial(self):
@@ -867,17 +620,24 @@ class App:
 
         self._log("info", "SYSTEM", "Serial desconectada.")
         self._sync_serial_buttons(False)
-        self.face.set_estado("sleep")
-        self.status_bar.set_estado("sleep")
+        self._set_estado("sleep")
 
     def _serial_loop(self):
         while self.reader_running and self.ser is not None:
             try:
-                raw = self.ser.readline()
+                if self.em_repouso:
+                    # acorda no primeiro byte, sem esperar a linha inteira
+                    primeiro = self.ser.read(1)
+                    if not primeiro:
+                        continue
+                    self.root.after(0, self._sair_repouso)
+                    raw = primeiro + self.ser.readline()
+                else:
+                    raw = self.ser.readline()
                 if not raw:
-                    if time.time() - self.ultimo_atividade > SLEEP_TIMEOUT:
-                        self.face.set_estado("sleep")
-                        self.status_bar.set_estado("sleep")
+                    if (self.estado != "sleep"
+                            and time.time() - self.ultimo_atividade > SLEEP_TIMEOUT):
+                        self.root.after(0, self._set_estado, "sleep")
                     time.sleep(0.01)
                     continue
 
@@ -907,8 +667,7 @@ class App:
 
     def _serial_down(self):
         self._sync_serial_buttons(False)
-        self.face.set_estado("sleep")
-        self.status_bar.set_estado("sleep")
+        self._set_estado("sleep")
 
     # --- tratamento de linha ---
 
@@ -930,12 +689,11 @@ class App:
         if is_user:
             self.lbl_user.config(text=f"Você: {txt}")
             self.texto_ia = ""
-            self._set_ia("")
+            self.ia.limpar()
             self.em_resposta = False
             self.ultimo_bot = 0.0
 
-            self.face.set_estado("listening")
-            self.status_bar.set_estado("listening")
+            self._set_estado("listening")
             self._log("info", tag or "APP", f"Usuário: {txt}")
             return
 
@@ -943,13 +701,13 @@ class App:
             if (not self.em_resposta) or (agora - self.ultimo_bot) > BOT_TURN_TIMEOUT:
                 self.texto_ia = txt
                 self.em_resposta = True
+                self.ia.definir(txt)
             else:
                 self.texto_ia += "\n" + txt
+                self.ia.acrescentar("\n" + txt)
             self.ultimo_bot = agora
-            self._set_ia(self.texto_ia)
 
-            self.face.set_estado("speaking")
-            self.status_bar.set_estado("speaking")
+            self._set_estado("speaking")
             self.face.marcar_fala(2.5)
 
             self._log("info", tag or "APP", f"Alicia: {txt}")
@@ -959,16 +717,13 @@ class App:
             self._log("state", tag, msg)
             low = msg.lower()
             if "listening" in low:
-                self.face.set_estado("listening")
-                self.status_bar.set_estado("listening")
+                self._set_estado("listening")
                 self.em_resposta = False
             elif "speaking" in low:
-                self.face.set_estado("speaking")
-                self.status_bar.set_estado("speaking")
+                self._set_estado("speaking")
                 self.face.marcar_fala(1.5)
             else:
-                self.face.set_estado("idle")
-                self.status_bar.set_estado("idle")
+                self._set_estado("idle")
         elif tipo in ("info", "warn", "error"):
             self._log(tipo, tag, msg)
         else:
@@ -976,24 +731,74 @@ class App:
 
     # --- helpers GUI ---
 
-    def _set_ia(self, txt: str):
-        self.txt_ia.config(state=tk.NORMAL)
-        self.txt_ia.delete("1.0", tk.END)
-        self.txt_ia.insert(tk.END, txt)
-        self.txt_ia.config(state=tk.DISABLED)
-
     def _log(self, nivel, tag, msg):
-        self.side_panel.add_log(nivel, tag, msg)
+        for entrada in self.limitador.admitir(nivel, tag, msg):
+            self.side_panel.add_log(*entrada)
+        if self._limitador_id is None and self.limitador.pendente:
+            self._limitador_id = self.root.after(int(self.limitador.resumo * 1000),
+                                                 self._resumir_limitador)
+
+    def _resumir_limitador(self):
+        self._limitador_id = None
+        for entrada in self.limitador.pendentes():
+            self.side_panel.add_log(*entrada)
+
+    def _qualidade_mudou(self, qualidade):
+        self._log("info", "PERF", f"Qualidade do rosto: {qualidade['nome']}")
 
     def _ciclo_painel(self):
         self.side_panel.ciclo_auto()
-        self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+
+    def _set_estado(self, estado: str):
+        self.estado = estado
+        self.face.set_estado(estado)
+        self.status_bar.set_estado(estado)
+        if estado == "sleep":
+            if self.repouso_timeout > 0 and self._repouso_id is None and not self.em_repouso:
+                self._repouso_id = self.root.after(int(self.repouso_timeout * 1000),
+                                                   self._entrar_repouso)
+            return
+        if self._repouso_id is not None:
+            self.root.after_cancel(self._repouso_id)
+            self._repouso_id = None
+        self._sair_repouso()
+
+    def _entrar_repouso(self):
+        self._repouso_id = None
+        self.em_repouso = True
+        self.face.repousar(True)
+        self.status_bar.repousar(True)
+        self.root.after_cancel(self._ciclo_id)
+        self._log("info", "SYSTEM", "Repouso profundo: rosto congelado até chegar dado na serial.")
+
+    def _sair_repouso(self):
+        if not self.em_repouso:
+            return
+        self.em_repouso = False
+        self.face.repousar(False)
+        self.status_bar.repousar(False)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._log("info", "SYSTEM", "Saindo do repouso profundo.")
+        if self.estado == "sleep":
+            self._set_estado("sleep")  # rearma o timer caso a linha não mude o estado
 
     def _on_resize(self, _event):
+        # <Configure> chega de cada widget da árvore: só reagenda o passe
+        if self._resize_id is not None:
+            self.root.after_cancel(self._resize_id)
+        self._resize_id = self.root.after(RESIZE_SETTLE_MS, self._aplicar_layout)
+
+    def _aplicar_layout(self):
+        self._resize_id = None
         try:
-            w = self.left.winfo_width()
-            self.wrap_len = max(600, w - 180)
-            self.lbl_user.config(wraplength=self.wrap_len)
+            wrap_len = max(600, self.left.winfo_width() - 180)
+            if wrap_len != self.wrap_len:
+                self.wrap_len = wrap_len
+                self.lbl_user.config(wraplength=self.wrap_len)
+            canvas = self.face.canvas
+            self.face.set_layout(FaceLayout(canvas.winfo_width() or 800,
+                                            canvas.winfo_height() or 450, self.face.tema))
         except Exception:
             pass
 
@@ -1007,6 +812,9 @@ class App:
 
     def on_close(self):
         self.reader_running = False
+        for entrada in self.limitador.pendentes():
+            self.side_panel.add_log(*entrada)
+        self.side_panel.buffer_logs.fechar()
         if self.ser:
             try:
                 self.ser.close()
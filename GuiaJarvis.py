@@ -1,7 +1,8 @@
+import argparse
+import functools
 import re
 import threading
 import time
-import random
 import sys
 import math
 import io
@@ -33,6 +34,17 @@ except ImportError:
     )
     sys.exit(1)
 
+# Rosto animado (compartilhado com AliciaGUI.py e novo.py)
+from rosto import BACKENDS, QUALIDADES, FaceLayout, FaceWidget
+from texto_ia import TextoIA
+from registro import (LOGS_CAPACIDADE, LOGS_RAJADA, LOGS_TAXA, BufferLogs, FiltrosLogs,
+                      LimitadorLogs, VisorLogs, parse_line)
+from sessao import EVENTOS_ARQUIVO, SESSAO_ARQUIVO, EscritorSessao, EventosSessao
+from telemetria import TELEMETRIA_INTERVALO, Telemetria, ler_extrator
+from temas import TEMAS
+from envelope import NUMPY_AVAILABLE, LeitorEnvelope
+from visemas import ContagemFala, visemas
+
 # Somente imagem local (sem URL)
 # Coloque o arquivo do QR ao lado do script, por exemplo: qr.png (PNG recomendado)
 QR_LOCAL_FILE = "qr.png"  # se for JPEG, use Pillow; com PhotoImage só PNG/GIF
@@ -41,216 +53,17 @@ QR_LOCAL_FILE = "qr.png"  # se for JPEG, use Pillow; com PhotoImage só PNG/GIF
 BOT_TURN_TIMEOUT = 3.0
 SLEEP_TIMEOUT = 20.0
 SIDE_CYCLE_INTERVAL = 100_000
-
-# -------------------- Parse de linha do ESP --------------------
-
-regex_info = re.compile(r"^I\s*\((\d+)\)\s+(.+?):\s*(.*)")
-regex_warn = re.compile(r"^W\s*\((\d+)\)\s+(.+?):\s*(.*)")
-regex_error = re.compile(r"^E\s*\((\d+)\)\s+(.+?):\s*(.*)")
-
-
-def parse_line(line: str):
-    line = line.strip("\r\n")
-
-    m = regex_info.match(line)
-    if m:
-        _ts, tag, msg = m.groups()
-        return {"type": "info", "tag": tag, "content": msg}
-
-    m = regex_warn.match(line)
-    if m:
-        _ts, tag, msg = m.groups()
-        return {"type": "warn", "tag": tag, "content": msg}
-
-    m = regex_error.match(line)
-    if m:
-        _ts, tag, msg = m.groups()
-        return {"type": "error", "tag": tag, "content": msg}
-
-    if "STATE:" in line:
-        return {"type": "state", "tag": "STATE", "content": line}
-
-    return {"type": "other", "tag": None, "content": line}
-
-
-# -------------------- Rosto do Jarvis --------------------
-
-class FaceWidget:
-    def __init__(self, parent):
-        self.canvas = tk.Canvas(parent, bg="#010204", highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-
-        self.estado = "sleep"  # idle | listening | speaking | sleep
-        self.boca_fase = 0.0
-        self.glow_fase = 0.0
-
-        self.piscando = False
-        self.ultimo_piscar = time.time()
-        self.intervalo_piscar = 3.2
-        self.intervalo_piscar_sono = 7.5
-
-        self.particulas = []
-        self._init_particulas()
-
-        self.fala_ate = 0.0
-        self.boca_intensidade = 0.35
-
-        self._mouth_override_until = 0.0
-        self._mouth_override_level = None
-
-        self.canvas.after(60, self._loop)
-
-    def _init_particulas(self):
-        self.particulas.clear()
-        for _ in range(30):
-            self.particulas.append({
-                "x": random.random(),
-                "y": random.random(),
-                "vx": random.uniform(-0.0008, 0.0008),
-                "vy": random.uniform(0.001, 0.004),
-                "r": random.uniform(0.8, 2.2),
-                "alpha": random.uniform(0.4, 1.0),
-            })
-
-    def set_estado(self, estado: str):
-        self.estado = estado
-        if estado == "speaking":
-            self.boca_fase = 0.0
-
-    def marcar_fala(self, segundos=2.0, intensidade=0.35):
-        agora = time.time()
-        self.fala_ate = max(self.fala_ate, agora + segundos)
-        self.boca_intensidade = max(0.2, min(0.9, intensidade))
-
-    def set_mouth_level(self, level: float):
-        self._mouth_override_level = max(0.0, float(level))
-        self._mouth_override_until = time.time() + 0.3
-
-    def clear_mouth_override(self):
-        if time.time() >= self._mouth_override_until:
-            self._mouth_override_level = None
-
-    def _loop(self):
-        if self.estado == "speaking":
-            self.boca_fase += 0.9
-        else:
-            self.boca_fase = max(0.0, self.boca_fase - 0.25)
-
-        self.glow_fase += 0.45
-        self._desenhar()
-        self.canvas.after(60, self._loop)
-
-    def _desenhar(self):
-        self.canvas.delete("all")
-        w = self.canvas.winfo_width() or 800
-        h = self.canvas.winfo_height() or 450
-
-        self._desenhar_fundo(w, h)
-        self._desenhar_visor(w, h)
-
-    def _desenhar_fundo(self, w, h):
-        cores = ["#030608", "#060A12", "#0A101C", "#080C16", "#030509"]
-        for i, c in enumerate(cores):
-            self.canvas.create_rectangle(
-                0, (h/len(cores))*i, w, (h/len(cores))*(i+1),
-                fill=c, outline=""
-            )
-        for p in self.particulas:
-            p["x"] += p["vx"]
-            p["y"] -= p["vy"]
-            if p["y"] < 0:
-                p["y"] = 1
-                p["x"] = random.random()
-            x = p["x"] * w
-            y = p["y"] * h
-            r = p["r"]
-            glow = f"#{int(40+p['alpha']*80):02x}{int(120+p['alpha']*80):02x}{255:02x}"
-            self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=glow, outline="")
-
-    def _desenhar_visor(self, w, h):
-        margem_x = w * 0.20
-        margem_y = h * 0.16
-        x1, y1 = margem_x, margem_y
-        x2, y2 = w - margem_x, h - margem_y
-        cx, cy = (x1+x2)/2, (y1+y2)/2
-        raio = min(w, h) * 0.06
-
-        base = 140 if self.estado == "speaking" else 110 if self.estado == "listening" else 70
-        brilho = base + int(40 * abs((self.glow_fase % 60) - 30)/30)
-        cor_neon = f"#{(brilho//2):02x}{brilho:02x}{255:02x}"
-
-        for halo in range(6):
-            self._round_rect(
-                x1-halo*2, y1-halo*2, x2+halo*2, y2+halo*2,
-                radius=raio+halo*1.6,
-                outline=cor_neon, width=1,
-            )
-        self._round_rect(x1, y1, x2, y2, radius=raio, fill="#05070D", outline=cor_neon, width=3)
-        self._round_rect(x1+6, y1+6, x2-6, y2-6, radius=raio-5, fill="#020307", outline="")
-
-        self._desenhar_olhos(cx, cy, x1, x2, y1, y2, cor_neon)
-        self._desenhar_boca(cx, cy, x1, x2, y1, y2, cor_neon)
-
-        self.canvas.create_text(
-            cx, y2 + h*0.035, text="Jarvis", fill=cor_neon,
-            font=("Segoe UI", max(18, int(h*0.04)), "bold")
-        )
-
-    def _desenhar_olhos(self, cx, cy, x1, x2, y1, y2, cor):
-        espacamento = (x2 - x1) * 0.36
-        r = min((x2-x1), (y2-y1)) * 0.12
-        olhos = [(cx - espacamento/2, cy - r*0.25), (cx + espacamento/2, cy - r*0.25)]
-        agora = time.time()
-        intervalo = self.intervalo_piscar_sono if self.estado == "sleep" else self.intervalo_piscar
-        if not self.piscando and (agora - self.ultimo_piscar) > intervalo:
-            self.piscando = True
-            self.ultimo_piscar = agora
-        elif self.piscando and (agora - self.ultimo_piscar) > 0.16:
-            self.piscando = False
-        if self.piscando:
-            for x, y in olhos:
-                self.canvas.create_line(x-r, y, x+r, y, fill=cor, width=8, capstyle=tk.ROUND)
-            return
-        for x, y in olhos:
-            self.canvas.create_oval(x-r*1.25, y-r*1.25, x+r*1.25, y+r*1.25, outline=cor, width=2)
-            self.canvas.create_oval(x-r, y-r, x+r, y+r, outline=cor, width=5)
-            self.canvas.create_line(x - r*0.8, y, x + r*0.8, y, fill=cor, width=5, capstyle=tk.ROUND)
-
-    def _desenhar_boca(self, cx, cy, x1, x2, y1, y2, cor):
-        largura = (x2 - x1) * 0.50
-        base_altura = (y2 - y1) * 0.20
-        intensidade = 0.15
-        agora = time.time()
-        if self._mouth_override_level is not None and agora < self._mouth_override_until:
-            intensidade = 0.2 + min(0.8, self._mouth_override_level)
-        else:
-            if self.estado == "speaking":
-                intensidade = self.boca_intensidade if (self.fala_ate - agora) > 0 else 0.33
-            elif self.estado == "listening":
-                intensidade = 0.16
-            elif self.estado == "sleep":
-                intensidade = 0.08
-        amp = base_altura * intensidade
-        altura = base_altura + amp * abs((self.boca_fase % 20) - 10) / 10
-        y_boca = cy + base_altura * 1.4
-        self.canvas.create_arc(
-            cx - largura/2, y_boca - altura/2, cx + largura/2, y_boca + altura/2,
-            start=200, extent=140, style=tk.ARC, outline=cor, width=6
-        )
-
-    def _round_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        pts = [x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius,
-               x2, y2, x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius,
-               x1, y1+radius, x1, y1]
-        self.canvas.create_polygon(pts, smooth=True, **kwargs)
-
+RESIZE_SETTLE_MS = 120  # rajadas de <Configure> viram um único passe de layout
+PERF_LOG_INTERVAL = 60_000  # ms entre linhas de desempenho do rosto no log
+REPOUSO_TIMEOUT = 15 * 60.0  # s em "sleep" até o repouso profundo (0 desliga)
 
 # -------------------- Painel lateral --------------------
 
 class SidePanel:
     MODOS = ("PROJETO", "EQUIPE", "QR", "CONFIG")
 
-    def __init__(self, parent, exit_cb):
+    def __init__(self, parent, exit_cb, buffer_logs=None):
+        self.buffer_logs = buffer_logs if buffer_logs is not None else BufferLogs()
         self.frame = tk.Frame(parent, bg="#050509", width=440)
         self.frame.pack(side=tk.RIGHT, fill=tk.Y)
         self.frame.pack_propagate(False)
@@ -418,6 +231,12 @@ class SidePanel:
                  anchor="nw").pack(anchor="nw", pady=(0, 6))
         self.config_serial_host = tk.Frame(self.page_config, bg="#050509")
         self.config_serial_host.pack(fill=tk.X, pady=(4, 10))
+        tk.Label(self.page_config, text="Telemetria", bg="#050509", fg="#FFFFFF",
+                 font=("Segoe UI", 14, "bold"), anchor="nw").pack(anchor="nw", pady=(8, 2))
+        self.lbl_telemetria = tk.Label(self.page_config, text="(sem dados)", bg="#050509",
+                                       fg="#B0BEC5", font=("Consolas", 10),
+                                       justify=tk.LEFT, anchor="nw")
+        self.lbl_telemetria.pack(anchor="nw", fill=tk.X)
         tk.Label(self.page_config, text="Logs", bg="#050509", fg="#FFFFFF",
                  font=("Segoe UI", 14, "bold"), anchor="nw").pack(anchor="nw", pady=(8, 2))
         logs_container = tk.Frame(self.page_config, bg="#050509")
@@ -425,17 +244,21 @@ class SidePanel:
         self.text_logs = tk.Text(logs_container, bg="#0E1114", fg="#D8DEE9",
                                  font=("Consolas", 11), relief=tk.FLAT)
         scroll = ttk.Scrollbar(logs_container, orient="vertical", command=self.text_logs.yview)
-        self.text_logs.config(yscrollcommand=scroll.set)
         self.text_logs.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=(4, 0))
         scroll.pack(side=tk.RIGHT, fill=tk.Y, pady=(4, 0))
         self.text_logs.config(state=tk.DISABLED)
-        self.buffer_logs = []
+        # o visor liga a barra à janela que ele mostra do buffer, não ao Text
+        self.visor_logs = VisorLogs(self.text_logs, scroll, self.buffer_logs)
+        self.filtros_logs = FiltrosLogs(self.page_config, self.visor_logs)
+        self.filtros_logs.frame.pack(fill=tk.X, pady=(0, 4), before=logs_container)
 
     def set_modo(self, modo: str):
         if modo not in self.MODOS:
             return
         self.modo = modo
         self.auto = modo not in ("CONFIG",)
+        if modo != "CONFIG":
+            self.visor_logs.ocultar()
         if modo == "PROJETO":
             self._raise_page(self.page_projeto)
         elif modo == "EQUIPE":
@@ -446,19 +269,17 @@ class SidePanel:
             if callable(self.on_enter_config):
                 self.on_enter_config()
             self._raise_page(self.page_config)
+            self.visor_logs.mostrar()
 
     def _raise_page(self, page):
         page.tkraise()
 
     def add_log(self, nivel, tag, msg):
         self.buffer_logs.append((nivel, tag, msg))
-        if self.modo == "CONFIG":
-            self.text_logs.config(state=tk.NORMAL)
-            pref = {"warn": "⚠️ ", "error": "❌ ", "state": "🎛 "}.get(nivel, "ℹ️ ")
-            tag_str = f"[{tag}] " if tag else ""
-            self.text_logs.insert(tk.END, f"{pref}{tag_str}{msg}\n")
-            self.text_logs.see(tk.END)
-            self.text_logs.config(state=tk.DISABLED)
+        self.visor_logs.novo()
+
+    def set_telemetria(self, texto: str):
+        self.lbl_telemetria.config(text=texto or "(sem dados)")
 
     def ciclo_auto(self):
         if not self.auto:
@@ -482,7 +303,7 @@ class StatusBar:
         self.lbl_dots.pack(side=tk.LEFT)
         self.estado = "sleep"
         self.fase = 0
-        self.frame.after(350, self._loop)
+        self._after_id = self.frame.after(350, self._loop)
 
     def set_estado(self, estado: str):
         self.estado = estado
@@ -496,13 +317,24 @@ class StatusBar:
         dots = "." * ((self.fase % 3) + 1) if self.estado in ("listening", "speaking") else ""
         self.lbl_dots.config(text=dots)
         self.fase += 1
-        self.frame.after(350, self._loop)
+        self._after_id = self.frame.after(350, self._loop)
+
+    def repousar(self, ativo: bool):
+        """Repouso profundo: para a animação dos pontos até ser desligado."""
+        if ativo and self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+            self._after_id = None
+            self.lbl_dots.config(text="")
+        elif not ativo and self._after_id is None:
+            self._after_id = self.frame.after(350, self._loop)
 
 
 # -------------------- App principal --------------------
 
 class App:
-    def __init__(self, root):
+    def __init__(self, root, backend="canvas", tema="jarvis", audio=None,
+                 repouso=REPOUSO_TIMEOUT, qualidade=None, buffer_logs=None, sessao=None,
+                 limitador=None, eventos=None, telemetria=None):
         self.root = root
         self.root.title("Jarvis – Assistente de voz (ESP32-S3 + Xiaozhi)")
         self.root.configure(bg="#000000")
@@ -512,6 +344,41 @@ class App:
         self.root.bind("<F11>", self.toggle_fullscreen)
         self.root.bind("<Escape>", self.sair_fullscreen)
         self.root.bind("<Configure>", self._on_resize)
+        self._resize_id = None
+
+        # Linhas da serial postadas com after(0) e ainda não tratadas: cada
+        # contador tem um só escritor (thread da serial / thread da UI).
+        self.linhas_postadas = 0
+        self.linhas_tratadas = 0
+
+        # Repetições e rajadas de log param aqui, antes do painel e do disco
+        self.limitador = limitador if limitador is not None else LimitadorLogs()
+        self._limitador_id = None
+        # os eventos das linhas comuns do ESP-IDF passam por um limitador
+        # próprio, com os mesmos limites: rajada não chega inteira ao JSONL
+        self.limitador_eventos = LimitadorLogs(self.limitador.taxa, self.limitador.rajada,
+                                               self.limitador.por_tag, self.limitador.resumo)
+
+        # Log da sessão em disco (opcional): _log só enfileira, a thread grava
+        self.sessao = sessao
+        if sessao is not None:
+            sessao.iniciar(erro=functools.partial(self._erro_disco, sessao))
+
+        # Números das linhas do ESP-IDF (heap, RSSI, buffer de áudio) em séries no tempo
+        self.telemetria = telemetria if telemetria is not None else Telemetria()
+        self._telemetria_id = None
+
+        # Eventos classificados em JSONL (opcional): mesma fila + thread, outro arquivo
+        self.eventos = eventos
+        if eventos is not None:
+            eventos.iniciar(erro=functools.partial(self._erro_disco, eventos))
+
+        # Repouso profundo: depois de `repouso` s em sleep o rosto congela e os
+        # timers periódicos param; o primeiro byte da serial acorda tudo.
+        self.estado = "sleep"
+        self.repouso_timeout = repouso
+        self.em_repouso = False
+        self._repouso_id = None
 
         self.main = tk.Frame(self.root, bg="#000000")
         self.main.pack(fill=tk.BOTH, expand=True)
@@ -521,8 +388,10 @@ class App:
 
         self.face_frame = tk.Frame(self.left, bg="#020308")
         self.face_frame.pack(fill=tk.BOTH, expand=True)
-        self.face = FaceWidget(self.face_frame)
-        self.face.set_estado("sleep")
+        self.face = FaceWidget(self.face_frame, backend=backend, tema=tema, qualidade=qualidade)
+        self.face.ao_mudar_qualidade = self._qualidade_mudou
+        self.face.profundidade_fila = self._profundidade_fila
+        self.root.bind("<F12>", self.face.alternar_overlay)
 
         self.text_frame = tk.Frame(self.left, bg="#020308", height=260)
         self.text_frame.pack(fill=tk.X, side=tk.BOTTOM)
@@ -539,17 +408,24 @@ class App:
                               wrap="word", relief=tk.FLAT, height=3)
         self.txt_ia.pack(fill=tk.BOTH, padx=44, pady=(0, 18))
         self.txt_ia.config(state=tk.DISABLED)
+        self.ia = TextoIA(self.txt_ia)
 
-        self.side_panel = SidePanel(self.main, exit_cb=self.on_close)
-        self.side_panel.on_enter_config = self._atualizar_portas
+        self.side_panel = SidePanel(self.main, exit_cb=self.on_close, buffer_logs=buffer_logs)
+        # transbordo dos logs que falhar no disco é desligado; o aviso vem aqui
+        self.side_panel.buffer_logs.ao_falhar = self._erro_disco
+        self.side_panel.on_enter_config = self._entrar_config
         self.status_bar = StatusBar(self.root)
-        self.status_bar.set_estado("sleep")
 
         self._montar_serial_ui(self.side_panel.config_serial_host)
 
+        if self.face.backend.nome != backend:
+            self._log("warn", "SYSTEM", f"Backend '{backend}' requer Pillow; usando '{self.face.backend.nome}'.")
+
         self.texto_ia = ""
+        self.fala = ContagemFala()  # palavras/sílabas da resposta atual
         self.em_resposta = False
         self.ultimo_bot = 0.0
+        self.turno = 0  # interações (falas do usuário) desde o início, para os eventos
         self.ultimo_atividade = time.time()
 
         self.ser = None
@@ -557,7 +433,20 @@ class App:
         self.reader_running = False
         self.serial_lock = threading.Lock()
 
-        self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        # Envelope do áudio do TTS (opcional): quando ativo, ele move a boca
+        # e a estimativa por contagem de palavras deixa de ser usada.
+        self.audio = None
+        if audio is not None:
+            if NUMPY_AVAILABLE:
+                self.audio = audio
+                self.audio.iniciar(self.face.set_mouth_level, erro=self._erro_audio)
+                self._log("info", "AUDIO", f"Boca seguindo o áudio de {audio.caminho}")
+            else:
+                self._log("warn", "AUDIO", "Envelope de áudio requer NumPy (pip install numpy).")
+
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._perf_id = self.root.after(PERF_LOG_INTERVAL, self._log_desempenho)
+        self._set_estado("sleep")
 
     def _montar_serial_ui(self, parent):
         frame = tk.Frame(parent, bg="#050509")
@@ -631,8 +520,7 @@ class App:
             except Exception as e:
                 messagebox.showerror("Serial", f"Erro ao abrir {port}: {e}")
                 self._log("error", "SYSTEM", f"Erro ao abrir {port}: {e}")
-                self.face.set_estado("sleep")
-                self.status_bar.set_estado("sleep")
+                self._set_estado("sleep")
                 self._sync_serial_buttons(False)
                 return
             self._log("info", "SYSTEM", f"Conectado em {port} @ {baud}")
@@ -640,8 +528,7 @@ class App:
             self.reader_thread = threading.Thread(target=self._serial_loop, daemon=True)
             self.reader_thread.start()
         self._sync_serial_buttons(True)
-        self.face.set_estado("idle")
-        self.status_bar.set_estado("idle")
+        self._set_estado("idle")
         self.ultimo_atividade = time.time()
 
     def desconectar_serial(self):
@@ -655,17 +542,24 @@ class App:
                 self.ser = None
         self._log("info", "SYSTEM", "Serial desconectada.")
         self._sync_serial_buttons(False)
-        self.face.set_estado("sleep")
-        self.status_bar.set_estado("sleep")
+        self._set_estado("sleep")
 
     def _serial_loop(self):
         while self.reader_running and self.ser is not None:
             try:
-                raw = self.ser.readline()
+                if self.em_repouso:
+                    # acorda no primeiro byte, sem esperar a linha inteira
+                    primeiro = self.ser.read(1)
+                    if not primeiro:
+                        continue
+                    self.root.after(0, self._sair_repouso)
+                    raw = primeiro + self.ser.readline()
+                else:
+                    raw = self.ser.readline()
                 if not raw:
-                    if time.time() - self.ultimo_atividade > SLEEP_TIMEOUT:
-                        self.face.set_estado("sleep")
-                        self.status_bar.set_estado("sleep")
+                    if (self.estado != "sleep"
+                            and time.time() - self.ultimo_atividade > SLEEP_TIMEOUT):
+                        self.root.after(0, self._set_estado, "sleep")
                     time.sleep(0.01)
                     continue
                 try:
@@ -675,6 +569,7 @@ class App:
                 if not line:
                     continue
                 self.ultimo_atividade = time.time()
+                self.linhas_postadas += 1
                 self.root.after(0, self._handle_line, line)
             except Exception as e:
                 self._log("error", "SYSTEM", f"Erro na serial: {e}")
@@ -691,23 +586,21 @@ class App:
 
     def _serial_down(self):
         self._sync_serial_buttons(False)
-        self.face.set_estado("sleep")
-        self.status_bar.set_estado("sleep")
-
-    def _estimate_speech_from_text(self, txt: str):
-        words = len(txt.split())
-        duration = max(0.6, words / 2.5)
-        syll_est = words * 1.4
-        intensity = min(0.9, 0.35 + (syll_est / 40.0))
+        self._set_estado("sleep")
+
+    def _estimar_fala(self, contagem):
+        duration = max(0.6, contagem.palavras / 2.5)
+        intensity = min(0.9, 0.35 + (contagem.silabas / 40.0))
         return duration, intensity
 
     def _handle_line(self, line: str):
+        self.linhas_tratadas += 1
         m = re.match(r"^\s*MOUTH[:\s]+([0-9]*\.?[0-9]+)", line, flags=re.I)
         if m:
             try:
                 lvl = float(m.group(1))
+                self._evento("mouth", None, None, valor=lvl)
                 self.face.set_mouth_level(lvl)
-                self.root.after(300, self.face.clear_mouth_override)
             except Exception:
                 pass
             return
@@ -716,9 +609,13 @@ class App:
         if m2:
             try:
                 dur = float(m2.group(1))
-                self.face.set_estado("speaking")
-                self.status_bar.set_estado("speaking")
+                self._evento("speak_start", None, None, valor=dur)
+                self._set_estado("speaking")
                 self.face.marcar_fala(dur, intensidade=0.55)
+                if self.em_resposta and self.texto_ia:
+                    # a duração real chegou: a resposta inteira cabe nela
+                    self.face.parar_visemas()
+                    self.face.tocar_visemas(visemas(self.texto_ia), inicio=time.time(), duracao=dur)
             except Exception:
                 pass
             return
@@ -737,69 +634,193 @@ class App:
         agora = time.time()
 
         if is_user:
+            self.turno += 1
+            self._evento("user", tag, txt, parsed["ts"])
             self.lbl_user.config(text=f"Você: {txt}")
             self.texto_ia = ""
-            self._set_ia("")
+            self.ia.limpar()
             self.em_resposta = False
             self.ultimo_bot = 0.0
-            self.face.set_estado("listening")
-            self.status_bar.set_estado("listening")
+            self.face.parar_visemas()
+            self._set_estado("listening")
             self._log("info", tag or "APP", f"Usuário: {txt}")
             return
 
         if is_bot:
+            self._evento("bot", tag, txt, parsed["ts"])
             if (not self.em_resposta) or (agora - self.ultimo_bot) > BOT_TURN_TIMEOUT:
                 self.texto_ia = txt
                 self.em_resposta = True
+                self.ia.definir(txt)
+                self.fala.zerar()
             else:
                 self.texto_ia += "\n" + txt
+                self.ia.acrescentar("\n" + txt)
+            self.fala.acrescentar(txt)
             self.ultimo_bot = agora
-            self._set_ia(self.texto_ia)
 
-            duration, intensity = self._estimate_speech_from_text(self.texto_ia)
-            self.face.set_estado("speaking")
-            self.status_bar.set_estado("speaking")
-            self.face.marcar_fala(duration, intensidade=intensity)
+            self._set_estado("speaking")
+            if self.audio is None:
+                duration, intensity = self._estimar_fala(self.fala)
+                self.face.marcar_fala(duration, intensidade=intensity)
+                self.face.tocar_visemas(visemas(txt))
             self._log("info", tag or "APP", f"Jarvis: {txt}")
             return
 
+        self._evento_limitado(tipo, tag, msg, parsed["ts"])
+        metricas = self.telemetria.processar(tag, msg, agora)
+        if metricas:
+            for nome, valor in metricas:
+                self._evento("metric", tag, nome, parsed["ts"], valor=valor)
+            self._telemetria_mudou()
         if tipo == "state":
             self._log("state", tag, msg)
             low = msg.lower()
             if "listening" in low:
-                self.face.set_estado("listening")
-                self.status_bar.set_estado("listening")
+                self._set_estado("listening")
                 self.em_resposta = False
             elif "speaking" in low:
-                self.face.set_estado("speaking")
-                self.status_bar.set_estado("speaking")
-                self.face.marcar_fala(1.5, intensidade=0.5)
+                self._set_estado("speaking")
+                if self.audio is None:
+                    self.face.marcar_fala(1.5, intensidade=0.5)
             else:
-                self.face.set_estado("idle")
-                self.status_bar.set_estado("idle")
+                self._set_estado("idle")
         elif tipo in ("info", "warn", "error"):
             self._log(tipo, tag, msg)
         else:
             self._log("info", tag, msg)
 
-    def _set_ia(self, txt: str):
-        self.txt_ia.config(state=tk.NORMAL)
-        self.txt_ia.delete("1.0", tk.END)
-        self.txt_ia.insert(tk.END, txt)
-        self.txt_ia.config(state=tk.DISABLED)
+    def _set_estado(self, estado: str):
+        if estado != self.estado and self.eventos is not None:
+            self.eventos.registrar("transition", None, None, de=self.estado, para=estado,
+                                   turno=self.turno or None)
+        self.estado = estado
+        self.face.set_estado(estado)
+        self.status_bar.set_estado(estado)
+        if estado == "sleep":
+            if self.repouso_timeout > 0 and self._repouso_id is None and not self.em_repouso:
+                self._repouso_id = self.root.after(int(self.repouso_timeout * 1000),
+                                                   self._entrar_repouso)
+            return
+        if self._repouso_id is not None:
+            self.root.after_cancel(self._repouso_id)
+            self._repouso_id = None
+        self._sair_repouso()
+
+    def _entrar_repouso(self):
+        self._repouso_id = None
+        self.em_repouso = True
+        self.face.repousar(True)
+        self.status_bar.repousar(True)
+        self.root.after_cancel(self._ciclo_id)
+        self.root.after_cancel(self._perf_id)
+        self._log("info", "SYSTEM", "Repouso profundo: rosto congelado até chegar dado na serial.")
+
+    def _sair_repouso(self):
+        if not self.em_repouso:
+            return
+        self.em_repouso = False
+        self.face.repousar(False)
+        self.status_bar.repousar(False)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._perf_id = self.root.after(PERF_LOG_INTERVAL, self._log_desempenho)
+        self._log("info", "SYSTEM", "Saindo do repouso profundo.")
+        if self.estado == "sleep":
+            self._set_estado("sleep")  # rearma o timer caso a linha não mude o estado
+
+    def _erro_audio(self, erro):
+        # chamado na thread do leitor
+        self.root.after(0, self._log, "error", "AUDIO", f"Leitura do áudio falhou: {erro}")
 
     def _log(self, nivel, tag, msg):
+        for entrada in self.limitador.admitir(nivel, tag, msg):
+            self._registrar(*entrada)
+        self._agendar_resumo()
+
+    def _agendar_resumo(self):
+        if self._limitador_id is None and (self.limitador.pendente
+                                           or self.limitador_eventos.pendente):
+            self._limitador_id = self.root.after(int(self.limitador.resumo * 1000),
+                                                 self._resumir_limitador)
+
+    def _registrar(self, nivel, tag, msg):
         self.side_panel.add_log(nivel, tag, msg)
+        if self.sessao is not None:
+            self.sessao.registrar(nivel, tag, msg)
+
+    def _resumir_limitador(self):
+        self._limitador_id = None
+        for entrada in self.limitador.pendentes():
+            self._registrar(*entrada)
+        for entrada in self.limitador_eventos.pendentes():
+            self._evento(*entrada)
+
+    def _erro_disco(self, escritor, erro):
+        # chamado na thread do escritor; só o painel, para não realimentar o disco
+        self.root.after(0, self.side_panel.add_log, "error", "SESSAO",
+                        f"Falha gravando {escritor.caminho}: {erro}")
+
+    def _evento(self, tipo, tag, conteudo, device_ts=None, valor=None):
+        if self.eventos is not None:
+            self.eventos.registrar(tipo, tag, conteudo, device_ts, turno=self.turno or None,
+                                   valor=valor)
+
+    def _evento_limitado(self, tipo, tag, conteudo, device_ts):
+        # resumos do limitador ("repetida N vezes") viram eventos sem device_ts
+        if self.eventos is None:
+            return
+        for entrada in self.limitador_eventos.admitir(tipo, tag, conteudo):
+            self._evento(*entrada, device_ts if entrada[2] is conteudo else None)
+        self._agendar_resumo()
+
+    def _telemetria_mudou(self):
+        # o resumo só é redesenhado com o CONFIG aberto, no máximo uma vez por intervalo
+        if self.side_panel.modo == "CONFIG" and self._telemetria_id is None:
+            self._telemetria_id = self.root.after(TELEMETRIA_INTERVALO, self._mostrar_telemetria)
+
+    def _mostrar_telemetria(self):
+        self._telemetria_id = None
+        self.side_panel.set_telemetria(self.telemetria.resumo(desde=time.time() - 3600))
+
+    def _entrar_config(self):
+        self._atualizar_portas()
+        self._mostrar_telemetria()
+
+    def _qualidade_mudou(self, qualidade):
+        self._log("info", "PERF", f"Qualidade do rosto: {qualidade['nome']}")
+
+    def _profundidade_fila(self):
+        return self.linhas_postadas - self.linhas_tratadas
+
+    def _log_desempenho(self):
+        self._log("info", "PERF", self.face.metricas.texto(time.time(), self._profundidade_fila()))
+        self._log("info", "PERF", self.side_panel.buffer_logs.relatorio())
+        self._log("info", "PERF", self.limitador.relatorio())
+        resumo = self.telemetria.resumo(desde=time.time() - PERF_LOG_INTERVAL / 1000)
+        if resumo:
+            self._log("info", "PERF", resumo.replace("\n", " · "))
+        self._perf_id = self.root.after(PERF_LOG_INTERVAL, self._log_desempenho)
 
     def _ciclo_painel(self):
         self.side_panel.ciclo_auto()
-        self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
 
     def _on_resize(self, _event):
+        # <Configure> chega de cada widget da árvore: só reagenda o passe
+        if self._resize_id is not None:
+            self.root.after_cancel(self._resize_id)
+        self._resize_id = self.root.after(RESIZE_SETTLE_MS, self._aplicar_layout)
+
+    def _aplicar_layout(self):
+        self._resize_id = None
         try:
-            w = self.left.winfo_width()
-            self.wrap_len = max(600, w - 180)
-            self.lbl_user.config(wraplength=self.wrap_len)
+            wrap_len = max(600, self.left.winfo_width() - 180)
+            if wrap_len != self.wrap_len:
+                self.wrap_len = wrap_len
+                self.lbl_user.config(wraplength=self.wrap_len)
+            canvas = self.face.canvas
+            self.face.set_layout(FaceLayout(canvas.winfo_width() or 800,
+                                            canvas.winfo_height() or 450, self.face.tema))
         except Exception:
             pass
 
@@ -813,6 +834,17 @@ class App:
 
     def on_close(self):
         self.reader_running = False
+        for entrada in self.limitador.pendentes():
+            self._registrar(*entrada)
+        for entrada in self.limitador_eventos.pendentes():
+            self._evento(*entrada)
+        self.side_panel.buffer_logs.fechar()
+        if self.sessao is not None:
+            self.sessao.parar()
+        if self.eventos is not None:
+            self.eventos.parar()
+        if self.audio is not None:
+            self.audio.parar()
         if self.ser:
             try:
                 self.ser.close()
@@ -822,8 +854,73 @@ class App:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Jarvis – Assistente de voz (ESP32-S3 + Xiaozhi)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="canvas",
+                        help="desenho do rosto: itens do canvas ou imagem única composta com Pillow")
+    parser.add_argument("--tema", choices=sorted(TEMAS), default="jarvis",
+                        help="rosto exibido (descritores em temas.py)")
+    parser.add_argument("--audio", metavar="CAMINHO",
+                        help="WAV ou FIFO com o PCM do TTS tocado neste PC; a boca segue o áudio")
+    parser.add_argument("--audio-taxa", type=int, default=16000, help="Hz do PCM cru no FIFO")
+    parser.add_argument("--audio-canais", type=int, default=1, help="canais do PCM cru no FIFO")
+    parser.add_argument("--audio-latencia", type=float, default=0.0,
+                        help="segundos entre o áudio chegar e sair no alto-falante")
+    parser.add_argument("--qualidade", choices=["auto"] + [q["nome"] for q in QUALIDADES],
+                        default="auto",
+                        help="efeitos do rosto; auto mede a máquina e ajusta durante a execução")
+    parser.add_argument("--logs-capacidade", type=int, default=LOGS_CAPACIDADE, metavar="N",
+                        help="entradas de log mantidas em memória")
+    parser.add_argument("--logs-transbordo", metavar="ARQUIVO",
+                        help="anexa a este arquivo os logs que saem da memória")
+    parser.add_argument("--logs-taxa", type=float, default=LOGS_TAXA, metavar="N",
+                        help="entradas de log por segundo aceitas por tag (0 desliga o limite)")
+    parser.add_argument("--logs-rajada", type=int, default=LOGS_RAJADA, metavar="N",
+                        help="rajada de entradas aceita por tag antes do limite")
+    parser.add_argument("--logs-taxa-tag", action="append", default=[], metavar="TAG=N",
+                        help="limite próprio de uma tag (repetível; N=0 deixa a tag livre)")
+    parser.add_argument("--sessao", default=SESSAO_ARQUIVO, metavar="ARQUIVO",
+                        help="log da sessão em disco, rotacionado e comprimido (\"\" desliga)")
+    parser.add_argument("--eventos", default=EVENTOS_ARQUIVO, metavar="ARQUIVO",
+                        help="eventos classificados em JSON Lines, para análise (\"\" desliga)")
+    parser.add_argument("--telemetria", action="append", default=[], metavar="NOME:TAG:PADRÃO",
+                        help="extrator de número das linhas de uma tag (repetível; "
+                             "substitui os extratores padrão)")
+    parser.add_argument("--repouso", type=float, default=REPOUSO_TIMEOUT / 60, metavar="MIN",
+                        help="minutos em sleep até o repouso profundo (0 desliga)")
+    args = parser.parse_args()
+
+    por_tag = {}
+    for item in args.logs_taxa_tag:
+        tag, _, taxa = item.partition("=")
+        try:
+            por_tag[tag] = float(taxa)
+        except ValueError:
+            parser.error(f"--logs-taxa-tag espera TAG=N, recebeu {item!r}")
+
+    try:
+        extratores = [ler_extrator(texto) for texto in args.telemetria] or None
+    except ValueError as e:
+        parser.error(f"--telemetria: {e}")
+
+    try:
+        buffer_logs = BufferLogs(args.logs_capacidade, args.logs_transbordo)
+    except OSError as e:
+        parser.error(f"--logs-transbordo: {e}")
+
+    audio = None
+    if args.audio:
+        audio = LeitorEnvelope(args.audio, taxa=args.audio_taxa, canais=args.audio_canais,
+                               latencia=args.audio_latencia)
+
     root = tk.Tk()
-    app = App(root)
+    app = App(root, backend=args.backend, tema=args.tema, audio=audio,
+              repouso=args.repouso * 60,
+              qualidade=None if args.qualidade == "auto" else args.qualidade,
+              buffer_logs=buffer_logs,
+              sessao=EscritorSessao(args.sessao) if args.sessao else None,
+              limitador=LimitadorLogs(args.logs_taxa, args.logs_rajada, por_tag),
+              eventos=EventosSessao(args.eventos) if args.eventos else None,
+              telemetria=Telemetria(extratores))
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
@@ -0,0 +1,428 @@
+"""Micro-benchmarks do painel.
+
+    python benchmarks.py rosto [--quadros 600] [--tamanho 1280x720] [--tema jarvis] [--qualidade alta]
+    python benchmarks.py cena [--quadros 5000] [--tamanho 1280x720] [--sprites] [--qualidade alta]
+    python benchmarks.py fala [--fragmentos 200] [--palavras 12] [--respostas 50]
+    python benchmarks.py logs [--linhas 2000000] [--capacidade 5000] [--transbordo ARQ]
+    python benchmarks.py sessao [--linhas 500000] [--tamanho 1048576]
+    python benchmarks.py indice [--linhas 1000000]
+    python benchmarks.py limite [--linhas 500000]
+    python benchmarks.py gravacao [--linhas 2000000]
+    python benchmarks.py compartilhar [--linhas 100000] [--variaveis 0.3]
+    python benchmarks.py telemetria [--linhas 500000]
+
+O benchmark do rosto abre uma janela Tk (precisa de display); o da cena roda
+só o modelo com o GravadorBackend e serve em CI, sem display.
+"""
+import argparse
+import statistics
+import time
+
+
+def _resumo(tempos):
+    tempos = sorted(tempos)
+    return (statistics.fmean(tempos),
+            tempos[len(tempos) // 2],
+            tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))])
+
+
+def bench_rosto(args):
+    """Tempo por quadro (montar a cena + desenhar + flush do Tk) por backend."""
+    import tkinter as tk
+    import rosto
+
+    root = tk.Tk()
+    root.geometry(args.tamanho)
+    estados = ("sleep", "idle", "listening", "speaking")
+    print(f"{'backend':<8} {'média ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for nome in sorted(rosto.BACKENDS):
+        frame = tk.Frame(root)
+        frame.pack(fill=tk.BOTH, expand=True)
+        face = rosto.FaceWidget(frame, backend=nome, tema=args.tema, qualidade=args.qualidade)
+        if face.backend.nome != nome:
+            print(f"{nome:<8} indisponível (Pillow não instalado)")
+            frame.destroy()
+            continue
+        # o benchmark dirige os quadros; sem _after_id, _acordar não reagenda
+        face.canvas.after_cancel(face._after_id)
+        face._after_id = None
+        root.update()
+
+        t = time.time()
+        tempos = []
+        for i in range(args.quadros):
+            if i % 150 == 0:
+                face.set_estado(estados[(i // 150) % len(estados)])
+            t += 1 / 60
+            inicio = time.perf_counter()
+            face.modelo.invalidar()  # força o desenho de todo quadro
+            face._passo(t)
+            root.update_idletasks()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        media, p50, p95 = _resumo(tempos)
+        print(f"{nome:<8} {media:9.2f} {p50:8.2f} {p95:8.2f}")
+        frame.destroy()
+    root.destroy()
+
+
+def bench_cena(args):
+    """Tempo da lógica de desenho (RostoModelo.passo) por tema, sem Tk."""
+    import rosto
+    from temas import TEMAS
+    from visemas import visemas
+
+    w, h = (int(v) for v in args.tamanho.split("x"))
+    fala = visemas("Olá! Eu sou o assistente, em que posso ajudar hoje?")
+    estados = ("sleep", "idle", "listening", "speaking")
+    print(f"{'tema':<8} {'quadros':>8} {'média ms':>9} {'p95 ms':>8} "
+          f"{'prims/q':>8} {'alter/q':>8}")
+    for tema in sorted(TEMAS):
+        modelo = rosto.RostoModelo(tema, usar_sprites=args.sprites)
+        modelo.set_qualidade(next(q for q in rosto.QUALIDADES if q["nome"] == args.qualidade))
+        modelo.set_layout(rosto.FaceLayout(w, h, modelo.tema))
+        gravador = rosto.GravadorBackend()
+        t = time.time()
+        tempos = []
+        for i in range(args.quadros):
+            if i % 300 == 0:
+                estado = estados[(i // 300) % len(estados)]
+                modelo.set_estado(estado)
+                if estado == "speaking":
+                    modelo.tocar_visemas(fala, inicio=t)
+            t += 1 / 60
+            inicio = time.perf_counter()
+            cena = modelo.passo(t)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+            if cena is not None:
+                gravador.desenhar(cena, w, h)
+        media, _, p95 = _resumo(tempos)
+        q = max(1, gravador.total_quadros)
+        print(f"{tema:<8} {gravador.total_quadros:8d} {media:9.3f} {p95:8.3f} "
+              f"{gravador.primitivas / q:8.1f} {gravador.alteradas / q:8.1f}")
+        if args.tipos:
+            for tipo, n in gravador.por_tipo.most_common():
+                print(f"    {tipo:<8} {n / q:8.1f}")
+
+
+def bench_fala(args):
+    """Estimativa da fala a cada fragmento: recontando a resposta x ContagemFala."""
+    from visemas import ContagemFala
+
+    fragmento = " ".join(["palavra"] * args.palavras)
+    print(f"{'método':<12} {'ms/resposta':>12} {'us/fragmento':>13}")
+
+    inicio = time.perf_counter()
+    for _ in range(args.respostas):
+        texto = ""
+        for i in range(args.fragmentos):
+            texto = fragmento if i == 0 else texto + "\n" + fragmento
+            palavras = len(texto.split())
+    total = (time.perf_counter() - inicio) * 1000
+    print(f"{'recontagem':<12} {total / args.respostas:12.3f} "
+          f"{total * 1000 / (args.respostas * args.fragmentos):13.2f}")
+    esperado = palavras
+
+    contagem = ContagemFala()
+    inicio = time.perf_counter()
+    for _ in range(args.respostas):
+        contagem.zerar()
+        for i in range(args.fragmentos):
+            contagem.acrescentar(fragmento)
+    total = (time.perf_counter() - inicio) * 1000
+    print(f"{'incremental':<12} {total / args.respostas:12.3f} "
+          f"{total * 1000 / (args.respostas * args.fragmentos):13.2f}")
+    assert contagem.palavras == esperado
+
+
+def bench_logs(args):
+    """Soak do BufferLogs: a memória deve ficar plana com milhões de linhas."""
+    import tracemalloc
+    from registro import BufferLogs
+
+    niveis = ("info", "warn", "error", "state")
+    tags = ("wifi", "audio", "WS", "SYSTEM")
+    buf = BufferLogs(args.capacidade, args.transbordo)
+    tracemalloc.start()
+    passo = max(1, args.linhas // 10)
+    print(f"{'linhas':>10} {'em uso KiB':>11} {'anel KiB':>9} {'us/linha':>9}")
+    inicio = time.perf_counter()
+    for i in range(1, args.linhas + 1):
+        buf.append((niveis[i % 4], tags[i % 4], f"I ({i}) evento {i} com alguns dados"))
+        if i % passo == 0:
+            atual, _pico = tracemalloc.get_traced_memory()
+            us = (time.perf_counter() - inicio) * 1e6 / passo
+            print(f"{i:10d} {atual / 1024:11.0f} {buf.memoria() / 1024:9.0f} {us:9.2f}")
+            inicio = time.perf_counter()
+    tracemalloc.stop()
+    buf.fechar()
+    print(buf.relatorio())
+
+
+def bench_compartilhar(args):
+    """Bytes (tracemalloc) que o BufferLogs guarda com e sem compartilhar tags e mensagens."""
+    import random
+    import tracemalloc
+    from registro import BufferLogs, parse_line
+
+    tags = ("wifi", "AudioCodec", "Application", "WS", "MQTT", "AFE", "I2S", "esp_netif")
+    fixas = [f"{acao} {alvo}" for acao in ("retry", "timeout", "ok", "buffer underrun", "reconnect")
+             for alvo in ("AP", "stream", "codec", "socket", "queue", "task", "dma", "ws", "mic", "spk")]
+    rnd = random.Random(7)
+    linhas = []
+    for i in range(args.linhas):
+        msg = f"rssi=-{rnd.randint(40, 90)} seq {i}" if rnd.random() < args.variaveis else rnd.choice(fixas)
+        linhas.append(f"{rnd.choice('IIIIWE')} ({i * 10}) {rnd.choice(tags)}: {msg}")
+
+    resultados = {}
+    for compartilhar in (False, True):
+        tracemalloc.start()
+        antes, _ = tracemalloc.get_traced_memory()
+        buf = BufferLogs(args.linhas, indexar=False, compartilhar=compartilhar)
+        inicio = time.perf_counter()
+        for linha in linhas:
+            p = parse_line(linha)
+            buf.append((p["type"], p["tag"], p["content"]))
+        us = (time.perf_counter() - inicio) * 1e6 / args.linhas
+        depois, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[compartilhar] = depois - antes
+        print(f"compartilhar={compartilhar!s:5}: {resultados[compartilhar] / 1024:8.0f} KiB "
+              f"({resultados[compartilhar] / args.linhas:5.1f} B/entrada), {us:.2f} us/linha")
+        del buf
+    economia = resultados[False] - resultados[True]
+    print(f"economia: {economia / 1024:.0f} KiB por {args.linhas} entradas "
+          f"({economia / resultados[False]:.0%}), {args.variaveis:.0%} de mensagens variáveis")
+
+
+def bench_telemetria(args):
+    """Custo de Telemetria.processar por linha, com e sem extrator para a tag."""
+    import random
+    from registro import parse_line
+    from telemetria import Telemetria
+
+    modelos = (
+        ("wifi", "connected to AP, rssi: -{n}"),
+        ("SystemInfo", "free sram: {n}000 minimal sram: {n}00"),
+        ("AudioService", "buffer level = {n}"),
+        ("Application", "STATE: listening"),
+        ("AFE", "feed task running {n}"),
+        ("WS", "sending audio frame {n}"),
+    )
+    rnd = random.Random(3)
+    linhas = []
+    for i in range(args.linhas):
+        tag, msg = rnd.choice(modelos)
+        p = parse_line(f"I ({i}) {tag}: {msg.format(n=rnd.randint(10, 99))}")
+        linhas.append((p["tag"], p["content"]))
+
+    telemetria = Telemetria()
+    inicio = time.perf_counter()
+    extraidos = 0
+    for tag, msg in linhas:
+        extraidos += len(telemetria.processar(tag, msg, inicio))
+    ns = (time.perf_counter() - inicio) * 1e9 / args.linhas
+    print(f"{ns:.0f} ns/linha, {extraidos} valores extraídos de {args.linhas} linhas")
+    for nome, serie in telemetria.series.items():
+        print(f"  {nome:13s} {len(serie):5d} pontos guardados")
+
+
+def bench_sessao(args):
+    """Custo de EscritorSessao.registrar (o que a UI paga) e vazão da thread."""
+    import glob
+    import gzip
+    import os
+    import tempfile
+    from sessao import EscritorSessao
+
+    pasta = tempfile.mkdtemp(prefix="sessao-")
+    caminho = os.path.join(pasta, "sessao.log")
+    escritor = EscritorSessao(caminho, tamanho=args.tamanho, descarga=0.05)
+    erros = []
+    escritor.iniciar(erro=erros.append)
+    custos = []
+    inicio_total = time.perf_counter()
+    for i in range(args.linhas):
+        msg = f"I ({i}) evento {i} com alguns dados"
+        inicio = time.perf_counter_ns()
+        escritor.registrar("info", "wifi", msg)
+        custos.append(time.perf_counter_ns() - inicio)
+    registro_s = time.perf_counter() - inicio_total
+    escritor.parar(espera=60)
+    total_s = time.perf_counter() - inicio_total
+    media, p50, p95 = _resumo(custos)
+    rotacionados = glob.glob(caminho + ".*.gz")
+    gravadas = sum(1 for _ in open(caminho, "rb"))
+    for arquivo in rotacionados:
+        with gzip.open(arquivo, "rb") as f:
+            gravadas += sum(1 for _ in f)
+    print(f"registrar: média {media:.0f} ns, p50 {p50:.0f} ns, p95 {p95:.0f} ns")
+    print(f"{args.linhas} linhas em {registro_s:.2f} s na UI, {gravadas} gravadas em {total_s:.2f} s; "
+          f"{len(rotacionados)} arquivos .gz, {escritor.perdidas} perdidas, erros {len(erros)}; pasta {pasta}")
+
+
+def bench_indice(args):
+    """Custo do índice no add_log e tempo das buscas do CONFIG com o buffer cheio."""
+    import random
+    from registro import LOGS_PAGINA, BufferLogs
+
+    niveis = ("info",) * 6 + ("warn", "error", "state")
+    tags = ("wifi", "audio", "WS", "SYSTEM", "MQTT", "AFE", "I2S", "app")
+    palavras = ("conectado", "retry", "buffer", "underrun", "timeout", "ok", "rssi", "ping")
+    rnd = random.Random(1)
+    linhas = [(rnd.choice(niveis), rnd.choice(tags),
+               f"I ({i}) {rnd.choice(palavras)} {rnd.choice(palavras)} {i % 997}")
+              for i in range(args.linhas)]
+
+    for indexar in (False, True):
+        buf = BufferLogs(args.linhas, indexar=indexar)
+        inicio = time.perf_counter()
+        for linha in linhas:
+            buf.append(linha)
+        us = (time.perf_counter() - inicio) * 1e6 / args.linhas
+        print(f"append {'com' if indexar else 'sem'} índice: {us:.2f} us/linha")
+
+    agora = time.time()
+    consultas = (
+        {"nivel": "error"},
+        {"tag": "audio"},
+        {"nivel": "warn", "tag": "wifi"},
+        {"texto": "underrun"},
+        {"texto": "i (999999)"},
+        {"nivel": "error", "texto": "timeout"},
+        {"desde": agora - 300, "texto": "ping 12"},
+    )
+    # página: o que o visor do CONFIG pede ao filtrar; completa: buscar inteiro
+    print(f"{'página':>11} {'completa':>11} {'entradas':>9}")
+    for criterios in consultas:
+        inicio = time.perf_counter()
+        pagina, _anteriores = buf.pagina(limite=LOGS_PAGINA, **criterios)
+        ms_pagina = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        achadas = buf.buscar(**criterios)
+        ms = (time.perf_counter() - inicio) * 1000
+        nomes = ", ".join(f"{k}={v!r}" for k, v in criterios.items() if k != "desde")
+        print(f"{ms_pagina:8.2f} ms {ms:8.2f} ms {len(achadas):9d}  {nomes}")
+
+
+def bench_limite(args):
+    """Custo por linha de spam no LimitadorLogs contra o caminho completo até o buffer."""
+    from registro import BufferLogs, LimitadorLogs
+
+    repetida = [("warn", "wifi", "retry connecting to AP")] * args.linhas
+    variada = [("warn", "I2S", f"buffer underrun {i}") for i in range(args.linhas)]
+    for nome, linhas in (("repetida", repetida), ("variada", variada)):
+        buf, limitador = BufferLogs(), LimitadorLogs()
+        inicio = time.perf_counter()
+        for linha in linhas:
+            buf.append(linha)
+        direto = (time.perf_counter() - inicio) * 1e9 / args.linhas
+        buf = BufferLogs()
+        inicio = time.perf_counter()
+        for linha in linhas:
+            for entrada in limitador.admitir(*linha):
+                buf.append(entrada)
+        limitado = (time.perf_counter() - inicio) * 1e9 / args.linhas
+        print(f"{nome:9s} direto {direto:7.0f} ns/linha   limitado {limitado:7.0f} ns/linha   "
+              f"{buf.total} entradas no buffer")
+
+
+def bench_gravacao(args):
+    """Abertura (índice novo e reaproveitado), busca por hora e página de um log de sessão grande."""
+    import os
+    import tempfile
+    from gravacoes import ArquivoSessao
+
+    pasta = tempfile.mkdtemp(prefix="gravacao-")
+    caminho = os.path.join(pasta, "jarvis-sessao.log")
+    t0 = time.time() - args.linhas * 0.01
+    with open(caminho, "w", encoding="utf-8") as f:
+        for i in range(args.linhas):
+            t = t0 + i * 0.01
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))}.{i % 100 * 10:03d}"
+                    f"\tinfo\twifi\tI ({i * 10}) retry {i} rssi=-{i % 90}\n")
+    megas = os.path.getsize(caminho) / 2**20
+
+    for rodada in ("índice novo", "índice reaproveitado"):
+        inicio = time.perf_counter()
+        arquivo = ArquivoSessao(caminho)
+        ms = (time.perf_counter() - inicio) * 1000
+        print(f"abrir ({rodada}): {ms:8.1f} ms  {arquivo.total} linhas, {megas:.0f} MiB")
+        arquivo.fechar()
+
+    arquivo = ArquivoSessao(caminho)
+    inicio = time.perf_counter()
+    for k in range(100):
+        arquivo.linha_do_tempo(t0 + args.linhas * 0.01 * k / 100)
+    print(f"ir para uma hora: {(time.perf_counter() - inicio) * 10:.2f} ms")
+    inicio = time.perf_counter()
+    for k in range(100):
+        arquivo.fatia(k * args.linhas // 100, k * args.linhas // 100 + 50)
+    print(f"página de 50 linhas: {(time.perf_counter() - inicio) * 10:.2f} ms")
+    arquivo.fechar()
+    print(f"pasta {pasta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks do painel")
+    sub = parser.add_subparsers(dest="alvo", required=True)
+
+    p = sub.add_parser("rosto", help="tempo por quadro de cada backend do rosto")
+    p.add_argument("--quadros", type=int, default=600)
+    p.add_argument("--tamanho", default="1280x720", help="geometria da janela (LxA)")
+    p.add_argument("--tema", default="jarvis", help="tema do rosto (temas.py)")
+    p.add_argument("--qualidade", default="alta", help="preset de rosto.QUALIDADES")
+    p.set_defaults(func=bench_rosto)
+
+    p = sub.add_parser("cena", help="lógica de desenho do rosto, sem display")
+    p.add_argument("--quadros", type=int, default=5000)
+    p.add_argument("--tamanho", default="1280x720", help="tamanho do rosto (LxA)")
+    p.add_argument("--sprites", action="store_true", help="olhos e boca como sprites")
+    p.add_argument("--tipos", action="store_true", help="primitivas por tipo")
+    p.add_argument("--qualidade", default="alta", help="preset de rosto.QUALIDADES")
+    p.set_defaults(func=bench_cena)
+
+    p = sub.add_parser("fala", help="estimativa de duração da fala por fragmento")
+    p.add_argument("--fragmentos", type=int, default=200, help="fragmentos por resposta")
+    p.add_argument("--palavras", type=int, default=12, help="palavras por fragmento")
+    p.add_argument("--respostas", type=int, default=50)
+    p.set_defaults(func=bench_fala)
+
+    p = sub.add_parser("logs", help="soak do buffer circular de logs")
+    p.add_argument("--linhas", type=int, default=2_000_000)
+    p.add_argument("--capacidade", type=int, default=5000)
+    p.add_argument("--transbordo", help="arquivo para os logs que saem do anel")
+    p.set_defaults(func=bench_logs)
+
+    p = sub.add_parser("sessao", help="custo de enfileirar no log da sessão")
+    p.add_argument("--linhas", type=int, default=500_000)
+    p.add_argument("--tamanho", type=int, default=1024 * 1024, help="bytes por arquivo antes de rotacionar")
+    p.set_defaults(func=bench_sessao)
+
+    p = sub.add_parser("indice", help="índice e buscas do visor de logs")
+    p.add_argument("--linhas", type=int, default=1_000_000)
+    p.set_defaults(func=bench_indice)
+
+    p = sub.add_parser("limite", help="linhas repetidas/rajadas no limitador de logs")
+    p.add_argument("--linhas", type=int, default=500_000)
+    p.set_defaults(func=bench_limite)
+
+    p = sub.add_parser("gravacao", help="índice e navegação de um log de sessão grande")
+    p.add_argument("--linhas", type=int, default=2_000_000)
+    p.set_defaults(func=bench_gravacao)
+
+    p = sub.add_parser("compartilhar", help="memória do BufferLogs com tags/mensagens compartilhadas")
+    p.add_argument("--linhas", type=int, default=100_000)
+    p.add_argument("--variaveis", type=float, default=0.3,
+                   help="fração de mensagens com números que mudam a cada linha")
+    p.set_defaults(func=bench_compartilhar)
+
+    p = sub.add_parser("telemetria", help="extratores de telemetria nas linhas do ESP-IDF")
+    p.add_argument("--linhas", type=int, default=500_000)
+    p.set_defaults(func=bench_telemetria)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
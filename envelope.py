@@ -0,0 +1,131 @@
+"""Envelope de áudio para a boca: lê PCM (WAV ou pipe) e alimenta set_mouth_level.
+
+Para quando o próprio PC toca o TTS do assistente. Uma thread lê o áudio em
+blocos, calcula com NumPy o RMS (ou o pico) de cada janela e entrega cada
+valor com o instante em que aquele trecho toca, para a boca seguir o som.
+
+    mkfifo /tmp/jarvis.pcm
+    python GuiaJarvis.py --audio /tmp/jarvis.pcm --audio-taxa 16000
+    # o player do TTS escreve PCM s16le mono no FIFO enquanto toca
+
+Um arquivo .wav também serve (lido no ritmo em que tocaria).
+"""
+import os
+import stat
+import threading
+import time
+import wave
+
+try:
+    import numpy as np  # pip install numpy
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+ENVELOPE_JANELA = 0.02        # s de áudio por nível (50 níveis por segundo)
+ENVELOPE_BLOCO = 0.2          # s de áudio por leitura
+ENVELOPE_ANTECEDENCIA = 0.5   # quanto um WAV pode ser lido à frente do relógio
+ENVELOPE_PORTAO = 0.01        # RMS abaixo disto é silêncio
+ENVELOPE_GANHO = 4.0          # fala fica em ~0,05–0,25 de RMS; nível 1 = boca toda aberta
+
+_DTYPES = {1: "u1", 2: "<i2", 4: "<i4"}
+
+
+def envelope(dados, largura, canais, por_janela, modo="rms"):
+    """Um valor em [0, 1] por janela de `por_janela` quadros de PCM intercalado."""
+    if largura not in _DTYPES:
+        raise ValueError(f"PCM de {8*largura} bits não suportado")
+    x = np.frombuffer(dados, dtype=_DTYPES[largura])
+    n = len(x) // (por_janela * canais)
+    x = x[:n * por_janela * canais].astype(np.float32)
+    if largura == 1:
+        x -= 128.0  # PCM de 8 bits é sem sinal
+    x = x.reshape(n, por_janela * canais) / float(1 << (8*largura - 1))
+    if modo == "pico":
+        return np.abs(x).max(axis=1)
+    return np.sqrt(np.einsum("ij,ij->i", x, x) / (por_janela * canais))
+
+
+class LeitorEnvelope:
+    """Thread que transforma um WAV ou um pipe de PCM em níveis da boca.
+
+    Para um FIFO o áudio é PCM cru no formato taxa/canais/largura; ao fim de
+    cada fala (o escritor fecha o pipe) ele é reaberto e espera a próxima.
+    """
+
+    def __init__(self, caminho, taxa=16000, canais=1, largura=2, modo="rms",
+                 latencia=0.0, ganho=ENVELOPE_GANHO):
+        self.caminho = caminho
+        self.taxa, self.canais, self.largura = taxa, canais, largura
+        self.modo = modo
+        self.latencia = latencia  # atraso entre ler o áudio e ele sair no alto-falante
+        self.ganho = ganho
+        self.destino = None
+        self.erro = None
+        self._parar = threading.Event()
+        self.thread = None
+
+    def iniciar(self, destino, erro=None):
+        """destino(nivel, t) recebe cada janela; erro(exc) é chamado se a leitura falhar.
+
+        Ambos rodam na thread do leitor.
+        """
+        self.destino, self.erro = destino, erro
+        self.thread = threading.Thread(target=self._rodar, daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _rodar(self):
+        try:
+            if stat.S_ISFIFO(os.stat(self.caminho).st_mode):
+                quadro = self.canais * self.largura
+                while not self._parar.is_set():
+                    with open(self.caminho, "rb") as f:  # bloqueia até haver escritor
+                        # read1: entrega o que já chegou, sem esperar o bloco inteiro
+                        self._consumir(lambda n: f.read1(n * quadro), self.taxa,
+                                       self.canais, self.largura, ritmo=False)
+            else:
+                with wave.open(self.caminho, "rb") as w:
+                    self._consumir(w.readframes, w.getframerate(),
+                                   w.getnchannels(), w.getsampwidth(), ritmo=True)
+        except (OSError, EOFError, ValueError, wave.Error) as e:
+            if self.erro:
+                self.erro(e)
+
+    def _consumir(self, ler, taxa, canais, largura, ritmo):
+        por_janela = max(1, int(taxa * ENVELOPE_JANELA))
+        janela_s = por_janela / taxa
+        bloco = por_janela * max(1, round(ENVELOPE_BLOCO / janela_s))
+        tam_janela = por_janela * canais * largura
+
+        inicio, k, resto = None, 0, b""
+        while not self._parar.is_set():
+            dados = ler(bloco)
+            if not dados:
+                return
+            agora = time.time()
+            dados = resto + dados
+            # num pipe o player escreve enquanto toca: o trecho lido começou a
+            # tocar quando começou a chegar, não agora
+            tocado = 0.0 if ritmo else len(dados) / (taxa * canais * largura)
+            chegada = agora - tocado + self.latencia
+            if inicio is None or inicio + k*janela_s < chegada - janela_s:
+                # começo da fala, ou o escritor atrasou: o próximo trecho toca na chegada
+                inicio = chegada - k*janela_s
+            usados = len(dados) - len(dados) % tam_janela
+            dados, resto = dados[:usados], dados[usados:]
+            if not dados:
+                continue
+
+            if ritmo:
+                # um WAV lê muito mais rápido do que toca: não passar do anel da boca
+                adiante = inicio + k*janela_s - agora - ENVELOPE_ANTECEDENCIA
+                if adiante > 0 and self._parar.wait(adiante):
+                    return
+            niveis = envelope(dados, largura, canais, por_janela, self.modo)
+            niveis = np.clip((niveis - ENVELOPE_PORTAO) * self.ganho, 0.0, 1.0)
+            for i, nivel in enumerate(niveis.tolist()):
+                self.destino(nivel, inicio + (k + i)*janela_s)
+            k += len(niveis)
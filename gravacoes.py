@@ -0,0 +1,355 @@
+"""Sessões gravadas em disco, abertas com mmap para navegar sem carregar o arquivo.
+
+Serve para o log da sessão (jarvis-sessao.log), os eventos em JSON Lines
+(jarvis-eventos.jsonl), o transbordo do painel e capturas cruas da serial.
+A primeira abertura varre o arquivo uma vez e guarda o deslocamento de uma
+linha a cada GRAVACAO_PASSO num índice ao lado dele (<arquivo>.idx); as
+seguintes reaproveitam o índice e, se o arquivo só cresceu (log ainda sendo
+gravado), varrem só o trecho novo. Só as linhas na tela são decodificadas e
+interpretadas.
+
+    python gravacoes.py jarvis-sessao.log
+    python gravacoes.py jarvis-eventos.jsonl --ir "2026-10-19 15:30"
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import tkinter as tk
+import zlib
+from array import array
+from itertools import accumulate
+from tkinter import ttk
+
+from registro import CORES_NIVEL, VisorLogs, parse_line
+
+GRAVACAO_PASSO = 64           # linhas por entrada do índice de deslocamentos
+GRAVACAO_CACHE = 8            # blocos de linhas mantidos já separados
+GRAVACAO_ASSINATURA = 4096    # bytes do começo do arquivo conferidos ao reaproveitar o índice
+GRAVACAO_PEDACO = 4 << 20     # bytes lidos do mmap por vez na varredura
+GRAVACAO_ACOMPANHAR = 2000    # ms entre verificações de crescimento no visor
+
+_CABECALHO = struct.Struct("<8sQQQI")  # magia, passo, linhas completas, bytes varridos, crc32
+_MAGIA = b"JVSIDX01"
+_DATA = re.compile(rb"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(\.\d+)?\t")
+_HOST_TS = re.compile(rb'"host_ts": ([0-9.]+)')
+_BOOT = re.compile(rb"[IWEDV]\s*\((\d+)\)")
+
+
+def interpretar(linha: bytes):
+    """(nivel, tag, msg) de uma linha gravada, em qualquer dos formatos acima."""
+    texto = linha.decode("utf-8", errors="replace").rstrip("\r")
+    if texto.startswith("{"):
+        try:
+            evento = json.loads(texto)
+        except ValueError:
+            evento = None
+        if isinstance(evento, dict):
+            return _de_evento(evento)
+    if _DATA.match(linha):
+        campos = texto.split("\t", 3)
+        if len(campos) == 4:  # jarvis-sessao.log
+            data, nivel, tag, msg = campos
+            return nivel, tag or None, f"{data[11:]}  {msg}"
+    campos = texto.split("\t", 2)
+    if len(campos) == 3 and campos[0] in CORES_NIVEL:  # transbordo do BufferLogs
+        nivel, tag, msg = campos
+        return nivel, tag or None, msg
+    parsed = parse_line(texto)  # captura crua da serial
+    tipo = parsed["type"]
+    return (tipo if tipo in CORES_NIVEL else "info"), parsed["tag"], parsed["content"]
+
+
+def _de_evento(evento):
+    tipo = evento.get("type")
+    if tipo == "transition":
+        msg = f"{evento.get('state_from')} → {evento.get('state_to')}"
+    else:
+        msg = evento.get("content") or ""
+    if isinstance(evento.get("value"), (int, float)):
+        msg = f"{msg} = {evento['value']:g}" if msg else f"{evento['value']:g}"
+    if evento.get("turn"):
+        msg = f"#{evento['turn']} {msg}"
+    host_ts = evento.get("host_ts")
+    if isinstance(host_ts, (int, float)):
+        msg = f"{time.strftime('%H:%M:%S', time.localtime(host_ts))}  {msg}"
+    nivel = tipo if tipo in CORES_NIVEL else ("state" if tipo == "transition" else "info")
+    return nivel, evento.get("tag") or tipo, msg
+
+
+def tempo(linha: bytes):
+    """Horário da linha em segundos, ou None se ela não tiver.
+
+    time.time() no log da sessão e nos eventos; segundos desde o boot do
+    ESP32 nas capturas cruas.
+    """
+    if linha.startswith(b"{"):
+        m = _HOST_TS.search(linha)
+        return float(m.group(1)) if m else None
+    m = _DATA.match(linha)
+    if m:
+        t = time.mktime(time.strptime(m.group(1).decode(), "%Y-%m-%d %H:%M:%S"))
+        return t + float(m.group(2) or 0)
+    m = _BOOT.match(linha)
+    return int(m.group(1)) / 1000.0 if m else None
+
+
+class ArquivoSessao:
+    """Linhas de um arquivo de sessão por número, lidas do mmap sob demanda.
+
+    Tem a interface de leitura do BufferLogs (`total`, len, [i] -> (nivel,
+    tag, msg)), então o VisorLogs pagina um arquivo de centenas de MB do
+    mesmo jeito que o buffer em memória.
+    """
+
+    def __init__(self, caminho, passo=GRAVACAO_PASSO, salvar_indice=True):
+        if caminho.endswith(".gz"):
+            raise ValueError(f"{caminho}: descomprima antes de abrir (mmap não lê gzip)")
+        self.caminho = caminho
+        self.passo = passo
+        self.salvar_indice = salvar_indice
+        self._arquivo = open(caminho, "rb")
+        self._mm = None
+        self._tamanho = 0
+        self._inicios = array("q")  # deslocamento da linha k*passo, para cada k
+        self._completas = 0         # linhas terminadas em "\n" já indexadas
+        self._varrido = 0           # deslocamento logo depois da última delas
+        self._blocos = {}           # bloco -> linhas (bytes), no máximo GRAVACAO_CACHE
+        self.total = 0
+        self.reaproveitado = self._carregar_indice()  # o índice veio do .idx
+        self.atualizar()
+
+    def atualizar(self):
+        """Remapeia o arquivo e indexa as linhas novas; devolve quantas chegaram."""
+        antes = self.total
+        tamanho = os.fstat(self._arquivo.fileno()).st_size
+        if tamanho == self._tamanho and self._mm is not None:
+            return 0
+        if tamanho < self._varrido:  # truncado ou trocado: recomeça
+            self._inicios, self._completas, self._varrido = array("q"), 0, 0
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._blocos.clear()
+        self._tamanho = tamanho
+        if tamanho:
+            self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        varrido = self._varrido
+        self._varrer()
+        if self.salvar_indice and self._varrido != varrido:
+            self._gravar_indice()
+        return self.total - antes
+
+    def fechar(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._arquivo.close()
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.total
+        if not 0 <= i < self.total:
+            raise IndexError(i)
+        bloco, k = divmod(i, self.passo)
+        return interpretar(self._bloco(bloco)[k])
+
+    def fatia(self, i, j):
+        return [self[k] for k in range(max(0, i), min(j, self.total))]
+
+    def linha(self, i):
+        """Bytes crus da linha i (sem o "\\n")."""
+        bloco, k = divmod(i, self.passo)
+        return self._bloco(bloco)[k]
+
+    def linha_do_tempo(self, t):
+        """Primeira linha com horário >= t (as sem horário contam como a anterior)."""
+        # busca binária sobre os blocos, olhando só o primeiro horário de cada um
+        lo, hi = 0, (self.total + self.passo - 1) // self.passo
+        while lo < hi:
+            meio = (lo + hi) // 2
+            inicio = self._tempo_do_bloco(meio)
+            if inicio is None or inicio < t:
+                lo = meio + 1
+            else:
+                hi = meio
+        primeira = max(0, lo - 1) * self.passo
+        for i in range(primeira, min(self.total, lo * self.passo)):
+            horario = tempo(self.linha(i))
+            if horario is not None and horario >= t:
+                return i
+        return min(self.total, lo * self.passo)
+
+    def _tempo_do_bloco(self, bloco):
+        for linha in self._bloco(bloco):
+            horario = tempo(linha)
+            if horario is not None:
+                return horario
+        return None
+
+    def _bloco(self, bloco):
+        linhas = self._blocos.get(bloco)
+        if linhas is None:
+            ini = self._inicios[bloco] if bloco < len(self._inicios) else self._varrido
+            fim = self._inicios[bloco + 1] if bloco + 1 < len(self._inicios) else self._tamanho
+            linhas = self._mm[ini:fim].split(b"\n")
+            if len(linhas) > self.passo:  # o "\n" final deixa um pedaço vazio
+                del linhas[self.passo:]
+            if len(self._blocos) >= GRAVACAO_CACHE:
+                del self._blocos[next(iter(self._blocos))]
+            self._blocos[bloco] = linhas
+        return linhas
+
+    def _varrer(self):
+        if self._mm is None:
+            self.total = 0
+            return
+        mm, inicios, passo = self._mm, self._inicios, self.passo
+        pos, n = self._varrido, self._completas
+        while pos < self._tamanho:
+            pedaco = mm[pos:pos + GRAVACAO_PEDACO]
+            ultimo = pedaco.rfind(b"\n")
+            if ultimo == -1:
+                # linha maior que o pedaço (ou a última, ainda sem "\n")
+                fim = mm.find(b"\n", pos + len(pedaco))
+                if fim == -1:
+                    break
+                if n % passo == 0:
+                    inicios.append(pos)
+                n += 1
+                pos = fim + 1
+                continue
+            # começo de cada linha do pedaço, somado em C: pos, pos+len0+1, ...
+            tamanhos = map(len, pedaco[:ultimo].split(b"\n"))
+            comecos = list(accumulate(map((1).__add__, tamanhos), initial=pos))
+            linhas = len(comecos) - 1
+            inicios.extend(comecos[(-n) % passo:linhas:passo])
+            n += linhas
+            pos += ultimo + 1
+        self._completas, self._varrido = n, pos
+        # uma última linha sem "\n" (o escritor ainda não terminou) também aparece
+        self.total = n + (self._tamanho > pos)
+
+    def _assinatura(self, ate):
+        return zlib.crc32(self._mm[:min(ate, GRAVACAO_ASSINATURA)]) if ate else 0
+
+    def _carregar_indice(self):
+        tamanho = os.fstat(self._arquivo.fileno()).st_size
+        if not tamanho:
+            return False
+        try:
+            with open(self.caminho + ".idx", "rb") as f:
+                dados = f.read()
+        except OSError:
+            return False
+        if len(dados) < _CABECALHO.size:
+            return False
+        magia, passo, completas, varrido, crc = _CABECALHO.unpack_from(dados)
+        if magia != _MAGIA or passo != self.passo or not 0 < varrido <= tamanho:
+            return False
+        with mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[varrido - 1:varrido] != b"\n" or zlib.crc32(mm[:min(varrido, GRAVACAO_ASSINATURA)]) != crc:
+                return False
+        inicios = array("q")
+        inicios.frombytes(dados[_CABECALHO.size:])
+        if len(inicios) != (completas + passo - 1) // passo:
+            return False
+        self._inicios, self._completas, self._varrido = inicios, completas, varrido
+        return True
+
+    def _gravar_indice(self):
+        destino = self.caminho + ".idx"
+        try:
+            with open(destino + ".tmp", "wb") as f:
+                f.write(_CABECALHO.pack(_MAGIA, self.passo, self._completas, self._varrido,
+                                        self._assinatura(self._varrido)))
+                f.write(self._inicios.tobytes())
+            os.replace(destino + ".tmp", destino)
+        except OSError:
+            pass  # pasta só de leitura: o índice fica só na memória
+
+
+def _quando(texto):
+    """Horário pedido em --ir ou no campo "Ir para": data/hora local ou segundos."""
+    texto = texto.strip()
+    for formato in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return time.mktime(time.strptime(texto, formato))
+        except ValueError:
+            pass
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Visor de sessões gravadas (log da sessão, eventos JSONL, captura da serial)")
+    parser.add_argument("arquivo")
+    parser.add_argument("--ir", metavar="QUANDO",
+                        help='abre nesta hora: "AAAA-MM-DD HH:MM[:SS]" ou segundos '
+                             "(time.time(), ou desde o boot numa captura crua)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    arquivo = ArquivoSessao(args.arquivo)
+    abertura = (f"{arquivo.total} linhas, índice {'reaproveitado' if arquivo.reaproveitado else 'criado'} "
+                f"em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    root = tk.Tk()
+    root.title(f"Sessão – {os.path.basename(args.arquivo)}")
+    root.configure(bg="#050509")
+    root.geometry("1100x700")
+
+    topo = tk.Frame(root, bg="#050509")
+    topo.pack(fill=tk.X, padx=10, pady=(10, 4))
+    tk.Label(topo, text="Ir para", bg="#050509", fg="#B0BEC5",
+             font=("Segoe UI", 10)).pack(side=tk.LEFT, padx=(0, 4))
+    campo = ttk.Entry(topo, width=22)
+    campo.pack(side=tk.LEFT)
+    lbl_info = tk.Label(topo, text=abertura, bg="#050509", fg="#B0BEC5", font=("Consolas", 10))
+    lbl_info.pack(side=tk.RIGHT)
+
+    corpo = tk.Frame(root, bg="#050509")
+    corpo.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+    text = tk.Text(corpo, bg="#0E1114", fg="#D8DEE9", font=("Consolas", 11), relief=tk.FLAT)
+    barra = ttk.Scrollbar(corpo, orient="vertical")
+    text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    barra.pack(side=tk.RIGHT, fill=tk.Y)
+    text.config(state=tk.DISABLED)
+    visor = VisorLogs(text, barra, arquivo)
+
+    def ir(_evento=None):
+        t = _quando(campo.get())
+        if t is None:
+            lbl_info.config(text="hora inválida")
+            return
+        linha = arquivo.linha_do_tempo(t)
+        lbl_info.config(text=f"linha {linha + 1} de {arquivo.total}")
+        visor.ir(linha)
+
+    def acompanhar():
+        # log ainda sendo gravado: indexa só o que chegou
+        if arquivo.atualizar():
+            visor.novo()
+        root.after(GRAVACAO_ACOMPANHAR, acompanhar)
+
+    campo.bind("<Return>", ir)
+    visor.mostrar()
+    if args.ir:
+        campo.insert(0, args.ir)
+        root.after(0, ir)
+    root.after(GRAVACAO_ACOMPANHAR, acompanhar)
+    root.protocol("WM_DELETE_WINDOW", lambda: (arquivo.fechar(), root.destroy()))
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 import re
 import threading
 import time
-import random
 import sys
 
 try:
@@ -24,10 +23,18 @@ except ImportError:
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+# rosto animado (compartilhado com GuiaJarvis.py; tema em temas.py)
+from rosto import FaceLayout, FaceWidget
+from texto_ia import TextoIA
+from registro import BufferLogs, FiltrosLogs, LimitadorLogs, VisorLogs
+from visemas import ContagemFala
+
 # parâmetros gerais
 BOT_TURN_TIMEOUT = 3.0          # janela para agrupar linhas da IA
 SLEEP_TIMEOUT = 20.0            # tempo parado até marcar como desconectada
 SIDE_CYCLE_INTERVAL = 100_000   # troca automática de aba (Projeto/Equipe/QR)
+REPOUSO_TIMEOUT = 15 * 60.0     # s em "sleep" até o repouso profundo (0 desliga)
+RESIZE_SETTLE_MS = 120          # rajadas de <Configure> viram um único passe de layout
 
 
 # -------------------- parse de linha do ESP --------------------
@@ -61,508 +68,13 @@ def parse_line(line: str):
     return {"type": "other", "tag": None, "content": line}
 
 
-# -------------------- rosto da Javis --------------------
-
-import tkinter as tk
-import time
-import random
-import math
-
-class FaceWidget:
-    """Versão Premium Futurista — Interface Jarvis / Neon super moderna."""
-
-    def __init__(self, parent):
-        self.canvas = tk.Canvas(parent, bg="#08092F", highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-
-        self.estado = "sleep"
-        self.boca_fase = 0.0
-        self.glow_fase = 0.0
-        self.piscando = False
-        self.ultimo_piscar = time.time()
-        self.intervalo_piscar = 3.2
-        self.intervalo_piscar_sono = 7.5
-
-        self.particulas = []
-        self._init_particulas()
-
-        self.fala_ate = 0.0
-
-        self.canvas.after(40, self._loop)  # animação mais suave e moderna
-
-    # =================== PARTICULAS HOLOGRÁFICAS MODERNAS ===================
-    def _init_particulas(self):
-        self.particulas.clear()
-        for _ in range(38):
-            cor = colorsys.hsv_to_rgb(random.random()*0.25+0.5, 0.75, random.uniform(0.3, 1.0))
-            self.particulas.append({
-                "x": random.random(),
-                "y": random.random(),
-                "vx": random.uniform(-0.0017, 0.0017),
-                "vy": random.uniform(0.003, 0.008),
-                "r": random.uniform(1.2, 3.8),
-                "color": "#%02x%02x%02x" % tuple(int(x*255) for x in cor),
-                "alpha": random.uniform(0.48, 1.00),
-            })
-
-    def set_estado(self, estado: str):
-        self.estado = estado
-        if estado == "speaking":
-            self.boca_fase = 0.0
-
-    def marcar_fala(self, segundos=2.0):
-        agora = time.time()
-        self.fala_ate = max(self.fala_ate, agora + segundos)
-
-    # =================== LOOP DE ANIMAÇÃO ===================
-    def _loop(self):
-        if self.estado == "speaking":
-            self.boca_fase += 1.2
-        else:
-            self.boca_fase = max(0.0, self.boca_fase - 0.30)
-
-        self.glow_fase += 0.31
-
-        self._desenhar()
-        self.canvas.after(40, self._loop)
-
-    # =================== DESENHO PRINCIPAL ===================
-    def _desenhar(self):
-        self.canvas.delete("all")
-        w = self.canvas.winfo_width() or 900
-        h = self.canvas.winfo_height() or 500
-        self._desenhar_fundo(w, h)
-        self._desenhar_face(w, h)
-
-    # =================== FUNDO HOLOGRÁFICO ===================
-    def _desenhar_fundo(self, w, h):
-        # gradiente vertical neon
-        for i in range(7):
-            cor = colorsys.hsv_to_rgb(0.65+i*0.025, 0.3, 0.16+i*0.10)
-            self.canvas.create_rectangle(
-                0, h*(i/7), w, h*((i+1)/7),
-                fill="#%02x%02x%02x" % tuple(int(x*255) for x in cor),
-                outline=""
-            )
-        # partículas neon translúcidas
-        for p in self.particulas:
-            p["x"] += p["vx"]
-            p["y"] -= p["vy"]
-            if p["y"] < 0:
-                p["y"] = 1
-                p["x"] = random.random()
-            x = p["x"] * w
-            y = p["y"] * h
-            r = p["r"]
-            self.canvas.create_oval(
-                x-r, y-r, x+r, y+r,
-                fill=p["color"], outline="")
-
-    # =================== ROSTO E ELEMENTOS DE INTERFACE ===================
-    def _desenhar_face(self, w, h):
-        cx, cy = w/2, h*0.47
-        raio_x, raio_y = w*0.26, h*0.39
-
-        # Halo de neon animado (glow externo)
-        for i in range(9):
-            bright = int(150+i*10+abs(math.sin(self.glow_fase/7)*55))
-            corglow = "#%02x%02x%02x" % (bright//2, bright, 255)
-            self.canvas.create_oval(
-                cx-raio_x-i*3, cy-raio_y-i*3, cx+raio_x+i*3, cy+raio_y+i*3,
-                outline=corglow, width=2
-            )
-
-        # Rosto principal — gradiente suave
-        grad = int(min(255, 100 + abs(math.cos(self.glow_fase/10))*120))
-        neon = "#%02x%02x%02x" % (grad//2, grad, 255)
-        self.canvas.create_oval(
-            cx-raio_x, cy-raio_y, cx+raio_x, cy+raio_y,
-            fill="#060E29", outline=neon, width=7
-        )
-
-        # Olhos modernos neon
-        self._desenhar_olhos(cx, cy, raio_x, raio_y, neon)
-        # Boca neon animada
-        self._desenhar_boca(cx, cy, raio_x, raio_y, neon)
-        # Nome
-        self.canvas.create_text(
-            cx, cy+raio_y*1.19,
-            text="Javis",
-            fill="#66E6FF",
-            font=("Segoe UI", int(h//17), "bold"),
-            justify="center"
-        )
-
-    # =================== OLHOS MODERNOS ===================
-    def _desenhar_olhos(self, cx, cy, raio_x, raio_y, neon):
-        dx = raio_x*0.52
-        r2 = raio_y*0.125
-        r1 = raio_y*0.097
-
-        agora = time.time()
-        intervalo = self.intervalo_piscar_sono if self.estado == "sleep" else self.intervalo_piscar
-        if not self.piscando and (agora - self.ultimo_piscar) > intervalo:
-            self.piscando = True
-            self.ultimo_piscar = agora
-        elif self.piscando and (agora - self.ultimo_piscar) > 0.13:
-            self.piscando = False
-
-        # Blink animado (olhos fecham suavamente)
-        if self.piscando:
-            for x in [cx-dx, cx+dx]:
-                self.canvas.create_line(
-                    x-r1, cy-raio_y*0.09, x+r1, cy-raio_y*0.09,
-                    fill=neon, width=int(r2), capstyle=tk.ROUND
-                )
-            return
-
-        # Olhos abertos — anéis concêntricos, pupila neon
-        for x in [cx-dx, cx+dx]:
-            # Halo sutil
-            self.canvas.create_oval(
-                x-r2*1.24, cy-raio_y*0.09-r2*1.05, x+r2*1.24, cy-raio_y*0.09+r2*1.05,
-                outline=neon, width=2
-            )
-            # Aro principal
-            self.canvas.create_oval(
-                x-r1, cy-raio_y*0.09-r1, x+r1, cy-raio_y*0.09+r1,
-                fill="#1C3A62", outline=neon, width=4
-            )
-            # Pupila reativa
-            pupil_r = r1*0.46 + abs(math.sin(self.glow_fase*1.17))*4
-            self.canvas.create_oval(
-                x-pupil_r, cy-raio_y*0.09-pupil_r, x+pupil_r, cy-raio_y*0.09+pupil_r,
-                fill="#67FFFF", outline=""
-            )
-
-    # =================== BOCA MODERNA NEON ===================
-    def _desenhar_boca(self, cx, cy, raio_x, raio_y, neon):
-        largura = raio_x*0.72
-        base_altura = raio_y*0.26
-
-        intensidade = 0.15
-        agora = time.time()
-        if self.estado == "speaking":
-            resto = self.fala_ate - agora
-            intensidade = 0.56 if resto > 0 else 0.33
-        elif self.estado == "listening":
-            intensidade = 0.18
-        elif self.estado == "sleep":
-            intensidade = 0.11
-
-        amp = base_altura * intensidade
-        altura = base_altura + amp * abs((self.boca_fase % 18) - 9) / 9
-
-        y_boca = cy + base_altura * 1.25
-
-        # Neon pink
-        cor_boca = "#FF53B7"
-        halo_boca = "#FFE1FB"
-
-        # Boca: oval bem iluminado + halo neon
-        self.canvas.create_oval(
-            cx-largura/2, y_boca-altura/2, cx+largura/2, y_boca+altura/2,
-            fill=cor_boca, outline=halo_boca, width=5
-        )
-        self.canvas.create_oval(
-            cx-largura/2-4, y_boca-altura/2-2,
-            cx+largura/2+4, y_boca+altura/2+2,
-            outline="#AAC0FF", width=2
-        )
-
-    # =================== UTIL — Retângulo arredondado ===================
-    def _round_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        pts = [
-            x1+radius, y1,
-            x2-radius, y1,
-            x2, y1,
-            x2, y1+radius,
-            x2, y2-radius,
-            x2, y2,
-            x2-radius, y2,
-            x1+radius, y2,
-            x1, y2,
-            x1, y2-radius,
-            x1, y1+radius,
-            x1, y1,
-        ]
-        self.canvas.create_polygon(pts, smooth=True, **kwargs)
-    """Versão Premium Futurista — Interface estilo Jarvis / Neon"""
-
-    def __init__(self, parent):
-        self.canvas = tk.Canvas(parent, bg="#010204", highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-
-        # Estados: idle | listening | speaking | sleep
-        self.estado = "sleep"
-        self.boca_fase = 0.0
-        self.glow_fase = 0.0
-
-        # Config animação
-        self.piscando = False
-        self.ultimo_piscar = time.time()
-        self.intervalo_piscar = 3.2
-        self.intervalo_piscar_sono = 7.5
-
-        # Efeitos holográficos de partículas
-        self.particulas = []
-        self._init_particulas()
-
-        # Boca
-        self.fala_ate = 0.0
-        
-        self.canvas.after(60, self._loop)
-
-    # ======================================================================
-    # PARTÍCULAS FUTURISTAS
-    # ======================================================================
-    def _init_particulas(self):
-        self.particulas.clear()
-        for _ in range(30):
-            self.particulas.append({
-                "x": random.random(),
-                "y": random.random(),
-                "vx": random.uniform(-0.0008, 0.0008),
-                "vy": random.uniform(0.001, 0.004),
-                "r": random.uniform(0.8, 2.2),
-                "alpha": random.uniform(0.4, 1.0),
-            })
-
-    # ======================================================================
-    # ESTADOS
-    # ======================================================================
-    def set_estado(self, estado: str):
-        self.estado = estado
-        if estado == "speaking":
-            self.boca_fase = 0.0
-
-    def marcar_fala(self, segundos=2.0):
-        agora = time.time()
-        self.fala_ate = max(self.fala_ate, agora + segundos)
-
-    # ======================================================================
-    # LOOP DE ANIMAÇÃO
-    # ======================================================================
-    def _loop(self):
-        if self.estado == "speaking":
-            self.boca_fase += 0.9
-        else:
-            self.boca_fase = max(0.0, self.boca_fase - 0.25)
-
-        self.glow_fase += 0.45
-
-        self._desenhar()
-        self.canvas.after(60, self._loop)
-
-    # ======================================================================
-    # DESENHO PRINCIPAL
-    # ======================================================================
-    def _desenhar(self):
-        self.canvas.delete("all")
-        w = self.canvas.winfo_width() or 800
-        h = self.canvas.winfo_height() or 450
-
-        self._desenhar_fundo(w, h)
-        self._desenhar_visor(w, h)
-
-    # ======================================================================
-    # FUNDO HOLOGRÁFICO
-    # ======================================================================
-    def _desenhar_fundo(self, w, h):
-        # gradiente suave
-        cores = ["#030608", "#060A12", "#0A101C", "#080C16", "#030509"]
-        for i, c in enumerate(cores):
-            self.canvas.create_rectangle(
-                0, (h/len(cores))*i, w, (h/len(cores))*(i+1),
-                fill=c, outline=""
-            )
-
-        # partículas energéticas
-        for p in self.particulas:
-            p["x"] += p["vx"]
-            p["y"] -= p["vy"]
-
-            if p["y"] < 0:
-                p["y"] = 1
-                p["x"] = random.random()
-
-            x = p["x"] * w
-            y = p["y"] * h
-            r = p["r"]
-
-            glow = f"#{int(40+p['alpha']*80):02x}{int(120+p['alpha']*80):02x}{255:02x}"
-
-            self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=glow, outline="")
-
-    # ======================================================================
-    # VISOR HOLOGRÁFICO FUTURISTA
-    # ======================================================================
-    def _desenhar_visor(self, w, h):
-        margem_x = w * 0.20
-        margem_y = h * 0.16
-        x1, y1 = margem_x, margem_y
-        x2, y2 = w - margem_x, h - margem_y
-        cx, cy = (x1+x2)/2, (y1+y2)/2
-
-        raio = min(w, h) * 0.06
-
-        # Borda neon varia conforme estado
-        if self.estado == "speaking":
-            base = 140
-        elif self.estado == "listening":
-            base = 110
-        else:
-            base = 70
-
-        brilho = base + int(40 * abs((self.glow_fase % 60) - 30)/30)
-        cor_neon = f"#{(brilho//2):02x}{brilho:02x}{255:02x}"
-
-        # halo externo
-        for halo in range(6):
-            self._round_rect(
-                x1-halo*2, y1-halo*2, x2+halo*2, y2+halo*2,
-                radius=raio+halo*1.6,
-                outline=cor_neon,
-                width=1,
-            )
-
-        # visor translúcido
-        self._round_rect(
-            x1, y1, x2, y2,
-            radius=raio,
-            fill="#05070D",
-            outline=cor_neon,
-            width=3
-        )
-
-        # visor interno leve glow
-        self._round_rect(
-            x1+6, y1+6, x2-6, y2-6,
-            radius=raio-5,
-            fill="#020307",
-            outline=""
-        )
-
-        self._desenhar_olhos(cx, cy, x1, x2, y1, y2, cor_neon)
-        self._desenhar_boca(cx, cy, x1, x2, y1, y2, cor_neon)
-
-        # Nome futurista
-        self.canvas.create_text(
-            cx, y2 + h*0.035,
-            text="Javis",
-            fill=cor_neon,
-            font=("Segoe UI", max(18, int(h*0.04)), "bold")
-        )
-
-    # ======================================================================
-    # OLHOS HOLOGRÁFICOS
-    # ======================================================================
-    def _desenhar_olhos(self, cx, cy, x1, x2, y1, y2, cor):
-        espacamento = (x2 - x1) * 0.36
-        r = min((x2-x1), (y2-y1)) * 0.12
-        olhos = [
-            (cx - espacamento/2, cy - r*0.25),
-            (cx + espacamento/2, cy - r*0.25),
-        ]
-
-        # piscando
-        agora = time.time()
-        intervalo = self.intervalo_piscar_sono if self.estado == "sleep" else self.intervalo_piscar
-        if not self.piscando and (agora - self.ultimo_piscar) > intervalo:
-            self.piscando = True
-            self.ultimo_piscar = agora
-        elif self.piscando and (agora - self.ultimo_piscar) > 0.16:
-            self.piscando = False
-
-        if self.piscando:
-            for x, y in olhos:
-                self.canvas.create_line(
-                    x-r, y, x+r, y,
-                    fill=cor, width=8, capstyle=tk.ROUND
-                )
-            return
-
-        # olhos abertos com glow
-        for x, y in olhos:
-            # halo
-            self.canvas.create_oval(
-                x-r*1.25, y-r*1.25, x+r*1.25, y+r*1.25,
-                outline=cor, width=2
-            )
-            # aro
-            self.canvas.create_oval(
-                x-r, y-r, x+r, y+r,
-                outline=cor, width=5
-            )
-            # linha do meio
-            self.canvas.create_line(
-                x - r*0.8, y, x + r*0.8, y,
-                fill=cor, width=5, capstyle=tk.ROUND
-            )
-
-    # ======================================================================
-    # BOCA — CURVA SUAVE FUTURISTA
-    # ======================================================================
-    def _desenhar_boca(self, cx, cy, x1, x2, y1, y2, cor):
-        largura = (x2 - x1) * 0.50
-        base_altura = (y2 - y1) * 0.20
-
-        intensidade = 0.15
-        agora = time.time()
-
-        if self.estado == "speaking":
-            resto = self.fala_ate - agora
-            intensidade = 0.55 if resto > 0 else 0.33
-        elif self.estado == "listening":
-            intensidade = 0.16
-        elif self.estado == "sleep":
-            intensidade = 0.08
-
-        amp = base_altura * intensidade
-        altura = base_altura + amp * abs((self.boca_fase % 20) - 10) / 10
-
-        y_boca = cy + base_altura * 1.4
-
-        # arco neon
-        self.canvas.create_arc(
-            cx - largura/2,
-            y_boca - altura/2,
-            cx + largura/2,
-            y_boca + altura/2,
-            start=200,
-            extent=140,
-            style=tk.ARC,
-            outline=cor,
-            width=6
-        )
-
-    # ======================================================================
-    # UTIL — Retângulo arredondado
-    # ======================================================================
-    def _round_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        pts = [
-            x1+radius, y1,
-            x2-radius, y1,
-            x2, y1,
-            x2, y1+radius,
-            x2, y2-radius,
-            x2, y2,
-            x2-radius, y2,
-            x1+radius, y2,
-            x1, y2,
-            x1, y2-radius,
-            x1, y1+radius,
-            x1, y1,
-        ]
-        self.canvas.create_polygon(pts, smooth=True, **kwargs)
-
-
 # -------------------- painel lateral --------------------
 
 class SidePanel:
     MODOS = ("PROJETO", "EQUIPE", "QR", "CONFIG")
 
-    def __init__(self, parent, exit_cb):
+    def __init__(self, parent, exit_cb, buffer_logs=None):
+        self.buffer_logs = buffer_logs if buffer_logs is not None else BufferLogs()
         self.frame = tk.Frame(parent, bg="#050509", width=440)
         self.frame.pack(side=tk.RIGHT, fill=tk.Y)
         self.frame.pack_propagate(False)
@@ -782,19 +294,23 @@ class SidePanel:
         scroll = ttk.Scrollbar(
             logs_container, orient="vertical", command=self.text_logs.yview
         )
-        self.text_logs.config(yscrollcommand=scroll.set)
 
         self.text_logs.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=(4, 0))
         scroll.pack(side=tk.RIGHT, fill=tk.Y, pady=(4, 0))
 
         self.text_logs.config(state=tk.DISABLED)
-        self.buffer_logs = []
+        # o visor liga a barra à janela que ele mostra do buffer, não ao Text
+        self.visor_logs = VisorLogs(self.text_logs, scroll, self.buffer_logs)
+        self.filtros_logs = FiltrosLogs(self.page_config, self.visor_logs)
+        self.filtros_logs.frame.pack(fill=tk.X, pady=(0, 4), before=logs_container)
 
     def set_modo(self, modo: str):
         if modo not in self.MODOS:
             return
         self.modo = modo
         self.auto = modo not in ("CONFIG",)
+        if modo != "CONFIG":
+            self.visor_logs.ocultar()
 
         if modo == "PROJETO":
             self._raise_page(self.page_projeto)
@@ -806,19 +322,14 @@ class SidePanel:
             if callable(self.on_enter_config):
                 self.on_enter_config()
             self._raise_page(self.page_config)
+            self.visor_logs.mostrar()
 
     def _raise_page(self, page):
         page.tkraise()
 
     def add_log(self, nivel, tag, msg):
         self.buffer_logs.append((nivel, tag, msg))
-        if self.modo == "CONFIG":
-            self.text_logs.config(state=tk.NORMAL)
-            pref = {"warn": "⚠️ ", "error": "❌ ", "state": "🎛 "}.get(nivel, "ℹ️ ")
-            tag_str = f"[{tag}] " if tag else ""
-            self.text_logs.insert(tk.END, f"{pref}{tag_str}{msg}\n")
-            self.text_logs.see(tk.END)
-            self.text_logs.config(state=tk.DISABLED)
+        self.visor_logs.novo()
 
     def ciclo_auto(self):
         if not self.auto:
@@ -856,7 +367,7 @@ class StatusBar:
 
         self.estado = "sleep"
         self.fase = 0
-        self.frame.after(350, self._loop)
+        self._after_id = self.frame.after(350, self._loop)
 
     def set_estado(self, estado: str):
         self.estado = estado
@@ -877,13 +388,22 @@ class StatusBar:
             dots = ""
         self.lbl_dots.config(text=dots)
         self.fase += 1
-        self.frame.after(350, self._loop)
+        self._after_id = self.frame.after(350, self._loop)
+
+    def repousar(self, ativo: bool):
+        """Repouso profundo: para a animação dos pontos até ser desligado."""
+        if ativo and self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+            self._after_id = None
+            self.lbl_dots.config(text="")
+        elif not ativo and self._after_id is None:
+            self._after_id = self.frame.after(350, self._loop)
 
 
 # -------------------- app principal --------------------
 
 class App:
-    def __init__(self, root):
+    def __init__(self, root, repouso=REPOUSO_TIMEOUT):
         self.root = root
         self.root.title("Javis – Assistente de voz (ESP32-S3 + Xiaozhi)")
         self.root.configure(bg="#000000")
@@ -893,6 +413,14 @@ class App:
         self.root.bind("<F11>", self.toggle_fullscreen)
         self.root.bind("<Escape>", self.sair_fullscreen)
         self.root.bind("<Configure>", self._on_resize)
+        self._resize_id = None
+
+        # Repouso profundo: depois de `repouso` s em sleep o rosto congela e os
+        # timers periódicos param; o primeiro byte da serial acorda tudo.
+        self.estado = "sleep"
+        self.repouso_timeout = repouso
+        self.em_repouso = False
+        self._repouso_id = None
 
         self.main = tk.Frame(self.root, bg="#000000")
         self.main.pack(fill=tk.BOTH, expand=True)
@@ -902,7 +430,8 @@ class App:
 
         self.face_frame = tk.Frame(self.left, bg="#020308")
         self.face_frame.pack(fill=tk.BOTH, expand=True)
-        self.face = FaceWidget(self.face_frame)
+        self.face = FaceWidget(self.face_frame, tema="javis")
+        self.face.ao_mudar_qualidade = self._qualidade_mudou
         self.face.set_estado("sleep")
 
         self.text_frame = tk.Frame(self.left, bg="#020308", height=260)
@@ -932,6 +461,11 @@ class App:
         )
         self.txt_ia.pack(fill=tk.BOTH, padx=44, pady=(0, 18))
         self.txt_ia.config(state=tk.DISABLED)
+        self.ia = TextoIA(self.txt_ia)
+
+        # Repetições e rajadas de log param aqui, antes do painel
+        self.limitador = LimitadorLogs()
+        self._limitador_id = None
 
         self.side_panel = SidePanel(self.main, exit_cb=self.on_close)
         self.side_panel.on_enter_config = self._atualizar_portas
@@ -941,6 +475,7 @@ class App:
         self._montar_serial_ui(self.side_panel.config_serial_host)
 
         self.texto_ia = ""
+        self.fala = ContagemFala()  # palavras/sílabas da resposta atual
         self.em_resposta = False
         self.ultimo_bot = 0.0
         self.ultimo_atividade = time.time()
@@ -950,7 +485,8 @@ class App:
         self.reader_running = False
         self.serial_lock = threading.Lock()
 
-        self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._set_estado("sleep")
 
     # --- UI de serial ---
 
@@ -1059,8 +595,7 @@ class App:
             except Exception as e:
                 messagebox.showerror("Serial", f"Erro ao abrir {port}: {e}")
                 self._log("error", "SYSTEM", f"Erro ao abrir {port}: {e}")
-                self.face.set_estado("sleep")
-                self.status_bar.set_estado("sleep")
+                self._set_estado("sleep")
                 self._sync_serial_buttons(False)
                 return
 
@@ -1072,8 +607,7 @@ class App:
             self.reader_thread.start()
 
         self._sync_serial_buttons(True)
-        self.face.set_estado("idle")
-        self.status_bar.set_estado("idle")
+        self._set_estado("idle")
         self.ultimo_atividade = time.time()
 
     def desconectar_serial(self):
@@ -1088,17 +622,24 @@ class App:
 
         self._log("info", "SYSTEM", "Serial desconectada.")
         self._sync_serial_buttons(False)
-        self.face.set_estado("sleep")
-        self.status_bar.set_estado("sleep")
+        self._set_estado("sleep")
 
     def _serial_loop(self):
         while self.reader_running and self.ser is not None:
             try:
-                raw = self.ser.readline()
+                if self.em_repouso:
+                    # acorda no primeiro byte, sem esperar a linha inteira
+                    primeiro = self.ser.read(1)
+                    if not primeiro:
+                        continue
+                    self.root.after(0, self._sair_repouso)
+                    raw = primeiro + self.ser.readline()
+                else:
+                    raw = self.ser.readline()
                 if not raw:
-                    if time.time() - self.ultimo_atividade > SLEEP_TIMEOUT:
-                        self.face.set_estado("sleep")
-                        self.status_bar.set_estado("sleep")
+                    if (self.estado != "sleep"
+                            and time.time() - self.ultimo_atividade > SLEEP_TIMEOUT):
+                        self.root.after(0, self._set_estado, "sleep")
                     time.sleep(0.01)
                     continue
 
@@ -1128,18 +669,15 @@ class App:
 
     def _serial_down(self):
         self._sync_serial_buttons(False)
-        self.face.set_estado("sleep")
-        self.status_bar.set_estado("sleep")
+        self._set_estado("sleep")
 
     # --- tratamento de linha ---
 
-    def _estimate_speech_from_text(self, txt: str):
-        """Estima duração (s) e intensidade (multiplicador) a partir do texto."""
-        words = len(txt.split())
-        duration = max(0.6, words / 2.5)  # ~2.5 words/sec
+    def _estimar_fala(self, contagem):
+        """Estima duração (s) e intensidade (multiplicador) a partir da contagem da resposta."""
+        duration = max(0.6, contagem.palavras / 2.5)  # ~2.5 words/sec
         # intensidade aproximada: mais palavras -> maior amplitude
-        syll_est = words * 1.4
-        intensity = min(2.0, 0.6 + (syll_est / 12.0))
+        intensity = min(2.0, 0.6 + (contagem.silabas / 12.0))
         return duration, intensity
 
     def _handle_line(self, line: str):
@@ -1149,8 +687,6 @@ class App:
             try:
                 lvl = float(m.group(1))
                 self.face.set_mouth_level(lvl)
-                # limpar override após 300ms se não houver atualização contínua
-                self.root.after(300, self.face.clear_mouth_override)
             except Exception:
                 pass
             return
@@ -1159,8 +695,7 @@ class App:
         if m2:
             try:
                 dur = float(m2.group(1))
-                self.face.set_estado("speaking")
-                self.status_bar.set_estado("speaking")
+                self._set_estado("speaking")
                 self.face.marcar_fala(dur)
             except Exception:
                 pass
@@ -1184,12 +719,11 @@ class App:
         if is_user:
             self.lbl_user.config(text=f"Você: {txt}")
             self.texto_ia = ""
-            self._set_ia("")
+            self.ia.limpar()
             self.em_resposta = False
             self.ultimo_bot = 0.0
 
-            self.face.set_estado("listening")
-            self.status_bar.set_estado("listening")
+            self._set_estado("listening")
             self._log("info", tag or "APP", f"Usuário: {txt}")
             return
 
@@ -1197,16 +731,18 @@ class App:
             if (not self.em_resposta) or (agora - self.ultimo_bot) > BOT_TURN_TIMEOUT:
                 self.texto_ia = txt
                 self.em_resposta = True
+                self.ia.definir(txt)
+                self.fala.zerar()
             else:
                 self.texto_ia += "\n" + txt
+                self.ia.acrescentar("\n" + txt)
+            self.fala.acrescentar(txt)
             self.ultimo_bot = agora
-            self._set_ia(self.texto_ia)
 
             # estimar duração e intensidade a partir do texto para uma fala mais realista
-            duration, intensity = self._estimate_speech_from_text(self.texto_ia)
+            duration, intensity = self._estimar_fala(self.fala)
 
-            self.face.set_estado("speaking")
-            self.status_bar.set_estado("speaking")
+            self._set_estado("speaking")
             self.face.marcar_fala(duration, intensity)
 
             self._log("info", tag or "APP", f"Javis: {txt}")
@@ -1216,16 +752,13 @@ class App:
             self._log("state", tag, msg)
             low = msg.lower()
             if "listening" in low:
-                self.face.set_estado("listening")
-                self.status_bar.set_estado("listening")
+                self._set_estado("listening")
                 self.em_resposta = False
             elif "speaking" in low:
-                self.face.set_estado("speaking")
-                self.status_bar.set_estado("speaking")
+                self._set_estado("speaking")
                 self.face.marcar_fala(1.5)
             else:
-                self.face.set_estado("idle")
-                self.status_bar.set_estado("idle")
+                self._set_estado("idle")
         elif tipo in ("info", "warn", "error"):
             self._log(tipo, tag, msg)
         else:
@@ -1233,24 +766,74 @@ class App:
 
     # --- helpers GUI ---
 
-    def _set_ia(self, txt: str):
-        self.txt_ia.config(state=tk.NORMAL)
-        self.txt_ia.delete("1.0", tk.END)
-        self.txt_ia.insert(tk.END, txt)
-        self.txt_ia.config(state=tk.DISABLED)
-
     def _log(self, nivel, tag, msg):
-        self.side_panel.add_log(nivel, tag, msg)
+        for entrada in self.limitador.admitir(nivel, tag, msg):
+            self.side_panel.add_log(*entrada)
+        if self._limitador_id is None and self.limitador.pendente:
+            self._limitador_id = self.root.after(int(self.limitador.resumo * 1000),
+                                                 self._resumir_limitador)
+
+    def _resumir_limitador(self):
+        self._limitador_id = None
+        for entrada in self.limitador.pendentes():
+            self.side_panel.add_log(*entrada)
+
+    def _qualidade_mudou(self, qualidade):
+        self._log("info", "PERF", f"Qualidade do rosto: {qualidade['nome']}")
 
     def _ciclo_painel(self):
         self.side_panel.ciclo_auto()
-        self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+
+    def _set_estado(self, estado: str):
+        self.estado = estado
+        self.face.set_estado(estado)
+        self.status_bar.set_estado(estado)
+        if estado == "sleep":
+            if self.repouso_timeout > 0 and self._repouso_id is None and not self.em_repouso:
+                self._repouso_id = self.root.after(int(self.repouso_timeout * 1000),
+                                                   self._entrar_repouso)
+            return
+        if self._repouso_id is not None:
+            self.root.after_cancel(self._repouso_id)
+            self._repouso_id = None
+        self._sair_repouso()
+
+    def _entrar_repouso(self):
+        self._repouso_id = None
+        self.em_repouso = True
+        self.face.repousar(True)
+        self.status_bar.repousar(True)
+        self.root.after_cancel(self._ciclo_id)
+        self._log("info", "SYSTEM", "Repouso profundo: rosto congelado até chegar dado na serial.")
+
+    def _sair_repouso(self):
+        if not self.em_repouso:
+            return
+        self.em_repouso = False
+        self.face.repousar(False)
+        self.status_bar.repousar(False)
+        self._ciclo_id = self.root.after(SIDE_CYCLE_INTERVAL, self._ciclo_painel)
+        self._log("info", "SYSTEM", "Saindo do repouso profundo.")
+        if self.estado == "sleep":
+            self._set_estado("sleep")  # rearma o timer caso a linha não mude o estado
 
     def _on_resize(self, _event):
+        # <Configure> chega de cada widget da árvore: só reagenda o passe
+        if self._resize_id is not None:
+            self.root.after_cancel(self._resize_id)
+        self._resize_id = self.root.after(RESIZE_SETTLE_MS, self._aplicar_layout)
+
+    def _aplicar_layout(self):
+        self._resize_id = None
         try:
-            w = self.left.winfo_width()
-            self.wrap_len = max(600, w - 180)
-            self.lbl_user.config(wraplength=self.wrap_len)
+            wrap_len = max(600, self.left.winfo_width() - 180)
+            if wrap_len != self.wrap_len:
+                self.wrap_len = wrap_len
+                self.lbl_user.config(wraplength=self.wrap_len)
+            canvas = self.face.canvas
+            self.face.set_layout(FaceLayout(canvas.winfo_width() or 800,
+                                            canvas.winfo_height() or 450, self.face.tema))
         except Exception:
             pass
 
@@ -1264,6 +847,9 @@ class App:
 
     def on_close(self):
         self.reader_running = False
+        for entrada in self.limitador.pendentes():
+            self.side_panel.add_log(*entrada)
+        self.side_panel.buffer_logs.fechar()
         if self.ser:
             try:
                 self.ser.close()
@@ -0,0 +1,750 @@
+"""Logs do painel lateral: limitador de entrada, buffer circular em memória e o
+visor da página CONFIG.
+
+Os quiosques ficam semanas ligados recebendo logs do ESP-IDF; o buffer guarda
+só as LOGS_CAPACIDADE entradas mais recentes. Com um arquivo de transbordo,
+as que saem do anel são anexadas a ele (uma linha "nivel<TAB>tag<TAB>msg",
+gravada em lote pela thread do sessao.TransbordoLogs) em vez de descartadas.
+Antes do buffer e do disco, o LimitadorLogs junta linhas repetidas e segura
+as tags que disparam logs demais.
+"""
+import re
+import sys
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import accumulate, repeat
+from operator import add
+from tkinter import ttk
+
+from sessao import TransbordoLogs
+
+LOGS_CAPACIDADE = 5000    # entradas (nivel, tag, msg) mantidas em memória
+LOGS_INTERVALO = 100      # ms: no máximo um redesenho do visor por tick
+LOGS_RODA = 3             # entradas por passo da roda do mouse
+INDICE_BLOCO = 4096       # entradas por bloco de texto da busca por substring
+INDICE_ESPARSO = 100      # acertos por bloco até os quais a linha sai por bisect
+INDICE_BALDE = 60         # s por balde de tempo do índice
+LOGS_TAXA = 20.0          # entradas/s por tag no balde de fichas (0 desliga o limite)
+LOGS_RAJADA = 60          # fichas por tag: rajada aceita antes de limitar
+LOGS_RESUMO = 5.0         # s até publicar repetições e descartes pendentes
+LOGS_PAGINA = 1000        # acertos por página da busca por texto no visor (as antigas ao rolar)
+LOGS_COMUNS = 8192        # entradas distintas lembradas (no máximo a capacidade do anel)
+
+PREFIXOS = {"warn": "⚠️ ", "error": "❌ ", "state": "🎛 "}  # demais níveis: "ℹ️ "
+CORES_NIVEL = {"info": "#D8DEE9", "warn": "#FFCB6B", "error": "#FF7A7A", "state": "#82AAFF"}
+
+
+# Linhas do ESP-IDF, "I (12345) tag: msg": ts em ms desde o boot do ESP32
+regex_info = re.compile(r"^I\s*\((\d+)\)\s+(.+?):\s*(.*)")
+regex_warn = re.compile(r"^W\s*\((\d+)\)\s+(.+?):\s*(.*)")
+regex_error = re.compile(r"^E\s*\((\d+)\)\s+(.+?):\s*(.*)")
+
+
+def parse_line(line: str):
+    line = line.strip("\r\n")
+
+    m = regex_info.match(line)
+    if m:
+        ts, tag, msg = m.groups()
+        return {"type": "info", "tag": tag, "content": msg, "ts": int(ts)}
+
+    m = regex_warn.match(line)
+    if m:
+        ts, tag, msg = m.groups()
+        return {"type": "warn", "tag": tag, "content": msg, "ts": int(ts)}
+
+    m = regex_error.match(line)
+    if m:
+        ts, tag, msg = m.groups()
+        return {"type": "error", "tag": tag, "content": msg, "ts": int(ts)}
+
+    if "STATE:" in line:
+        return {"type": "state", "tag": "STATE", "content": line, "ts": None}
+
+    return {"type": "other", "tag": None, "content": line, "ts": None}
+
+
+def formatar(nivel, tag, msg):
+    tag_str = f"[{tag}] " if tag else ""
+    return f"{PREFIXOS.get(nivel, 'ℹ️ ')}{tag_str}{msg}\n"
+
+
+def _trechos(entradas):
+    """Argumentos de um único Text.insert: texto, tag, texto, tag...
+
+    Entradas seguidas do mesmo nível viram um só trecho com a tag de cor.
+    """
+    trechos = []
+    atual, partes = None, []
+    for nivel, tag, msg in entradas:
+        nivel = nivel if nivel in CORES_NIVEL else "info"
+        if nivel != atual and partes:
+            trechos += ("".join(partes), atual)
+            partes = []
+        atual = nivel
+        partes.append(formatar(nivel, tag, msg))
+    if partes:
+        trechos += ("".join(partes), atual)
+    return trechos
+
+
+class LimitadorLogs:
+    """Porta de entrada dos logs: junta repetições seguidas e limita a taxa por tag.
+
+    Componentes do ESP-IDF repetem linhas em rajadas (retentativas do Wi-Fi,
+    avisos do buffer de áudio). `admitir` roda antes do painel e do disco:
+    uma entrada igual à anterior só incrementa um contador, e cada tag tem um
+    balde de fichas (`taxa` por segundo, até `rajada`); sem ficha, a entrada
+    é só contada. As contagens viram entradas de resumo ("repetida N vezes",
+    "N entradas suprimidas") na próxima entrada admitida da mesma linha/tag
+    ou em `pendentes`, que o app chama LOGS_RESUMO depois.
+    """
+
+    def __init__(self, taxa=LOGS_TAXA, rajada=LOGS_RAJADA, por_tag=None, resumo=LOGS_RESUMO):
+        self.taxa = taxa
+        self.rajada = rajada
+        self.por_tag = dict(por_tag or {})  # tag -> taxa própria (0 = sem limite)
+        self.resumo = resumo
+        self._ultima = None     # última entrada admitida
+        self._repetidas = 0     # cópias dela absorvidas e ainda não publicadas
+        self._baldes = {}       # tag -> [fichas, horário da última recarga]
+        self._suprimidas = {}   # tag -> entradas descartadas e ainda não publicadas
+        self.absorvidas = 0     # totais desde o início, para o relatório
+        self.descartadas = 0
+
+    @property
+    def pendente(self):
+        return bool(self._repetidas or self._suprimidas)
+
+    def admitir(self, nivel, tag, msg):
+        """Entradas a registrar no lugar de (nivel, tag, msg); vazia se ela foi absorvida."""
+        entrada = (nivel, tag, msg)
+        if entrada == self._ultima:
+            self._repetidas += 1
+            self.absorvidas += 1
+            return ()
+        saida = [self._resumo_repetidas()] if self._repetidas else []
+        self._ultima = None
+        if not self._ficha(tag, time.monotonic()):
+            self._suprimidas[tag] = self._suprimidas.get(tag, 0) + 1
+            self.descartadas += 1
+            return saida
+        if tag in self._suprimidas:
+            saida.append(self._resumo_suprimidas(tag))
+        saida.append(entrada)
+        self._ultima = entrada
+        return saida
+
+    def pendentes(self):
+        """Resumos das contagens em aberto (repetição em curso, tags limitadas)."""
+        saida = [self._resumo_repetidas()] if self._repetidas else []
+        for tag in list(self._suprimidas):
+            saida.append(self._resumo_suprimidas(tag))
+        return saida
+
+    def relatorio(self):
+        return (f"limitador: {self.absorvidas} repetidas absorvidas, "
+                f"{self.descartadas} descartadas pelo limite de {self.taxa:g}/s por tag")
+
+    def _ficha(self, tag, agora):
+        taxa = self.por_tag.get(tag, self.taxa)
+        if not taxa:
+            return True
+        balde = self._baldes.get(tag)
+        if balde is None:
+            balde = self._baldes[tag] = [self.rajada, agora]
+        else:
+            fichas = balde[0] + (agora - balde[1]) * taxa
+            balde[0] = fichas if fichas < self.rajada else self.rajada
+            balde[1] = agora
+        if balde[0] < 1:
+            return False
+        balde[0] -= 1
+        return True
+
+    def _resumo_repetidas(self):
+        nivel, tag, _msg = self._ultima
+        n, self._repetidas = self._repetidas, 0
+        return (nivel, tag, f"↑ repetida {n} {'vez' if n == 1 else 'vezes'}")
+
+    def _resumo_suprimidas(self, tag):
+        n = self._suprimidas.pop(tag)
+        taxa = self.por_tag.get(tag, self.taxa)
+        return ("warn", tag, f"{n} entradas suprimidas (limite de {taxa:g}/s)")
+
+
+class _Posicoes:
+    """Números de sequência crescentes de um nível ou tag, com descarte barato do começo."""
+
+    __slots__ = ("seqs", "ini")
+
+    def __init__(self):
+        self.seqs = array("q")
+        self.ini = 0  # seqs[:ini] já saíram do buffer
+
+    def __len__(self):
+        return len(self.seqs) - self.ini
+
+    def podar(self, primeiro):
+        self.ini = bisect_left(self.seqs, primeiro, self.ini)
+        if self.ini > INDICE_BLOCO and self.ini * 2 > len(self.seqs):
+            del self.seqs[:self.ini]
+            self.ini = 0
+
+    def intervalo(self, lo, hi):
+        a = bisect_left(self.seqs, lo, self.ini)
+        return self.seqs[a:bisect_left(self.seqs, hi, a)]
+
+
+class IndiceLogs:
+    """Índice incremental das entradas do BufferLogs, por número de sequência.
+
+    Por nível, por tag e por par (nível, tag) guarda as sequências em
+    ordem; por balde de tempo (INDICE_BALDE) a primeira sequência do balde;
+    para a busca por texto, as mensagens em minúsculas coladas em blocos de
+    INDICE_BLOCO linhas, com o início de cada linha no bloco. Nos blocos
+    com poucos acertos, bisect nos inícios dá a linha de cada um; nos
+    densos, split/count/accumulate fazem isso em C, sem um passo de Python
+    por acerto.
+    """
+
+    def __init__(self):
+        self.niveis = {}
+        self.tags = {}
+        self.pares = {}          # (nivel, tag) -> _Posicoes: nível e tag sem cruzar listas
+        self._baldes = []        # início de cada balde de tempo, em ordem
+        self._baldes_seq = []    # primeira sequência de cada balde
+        self._blocos = deque()   # (primeira sequência, mensagens em minúsculas unidas por "\n",
+                                 #  início de cada linha no texto)
+        self._atual = []         # bloco em formação
+        self._atual_ini = 0
+
+    def adicionar(self, seq, entrada, t):
+        nivel, tag, msg = entrada
+        posicoes = self.niveis.get(nivel)
+        if posicoes is None:
+            posicoes = self.niveis[nivel] = _Posicoes()
+        posicoes.seqs.append(seq)
+        if tag:
+            posicoes = self.tags.get(tag)
+            if posicoes is None:
+                posicoes = self.tags[tag] = _Posicoes()
+            posicoes.seqs.append(seq)
+            posicoes = self.pares.get((nivel, tag))
+            if posicoes is None:
+                posicoes = self.pares[(nivel, tag)] = _Posicoes()
+            posicoes.seqs.append(seq)
+        balde = int(t // INDICE_BALDE) * INDICE_BALDE
+        if not self._baldes or self._baldes[-1] != balde:
+            self._baldes.append(balde)
+            self._baldes_seq.append(seq)
+        if not self._atual:
+            self._atual_ini = seq
+        self._atual.append(msg.lower().replace("\n", " "))
+        if len(self._atual) == INDICE_BLOCO:
+            self._blocos.append(self._bloco_atual())
+            self._atual = []
+
+    def _bloco_atual(self):
+        # início da linha i = tamanhos das anteriores + i separadores
+        linhas = self._atual
+        inicios = array("i", map(add, accumulate(map(len, linhas), initial=0),
+                                 range(len(linhas))))
+        return self._atual_ini, "\n".join(linhas), inicios
+
+    def podar(self, primeiro):
+        """Esquece as sequências anteriores a `primeiro` (saíram do buffer)."""
+        for grupo in (self.niveis, self.tags, self.pares):
+            for chave in list(grupo):
+                grupo[chave].podar(primeiro)
+                if not len(grupo[chave]):
+                    del grupo[chave]
+        i = max(0, bisect_right(self._baldes_seq, primeiro) - 1)
+        del self._baldes[:i], self._baldes_seq[:i]
+        while self._blocos and self._blocos[0][0] + INDICE_BLOCO <= primeiro:
+            self._blocos.popleft()
+
+    def seq_do_tempo(self, t, fim):
+        """Primeira sequência do balde de `t`, ou do primeiro balde depois dele (`fim` se nenhum)."""
+        i = bisect_right(self._baldes, t)
+        if i == 0:
+            return self._baldes_seq[0] if self._baldes else fim
+        if t >= self._baldes[i - 1] + INDICE_BALDE:
+            # depois do fim do balde i-1: o próximo com entradas, se houver
+            return self._baldes_seq[i] if i < len(self._baldes) else fim
+        return self._baldes_seq[i - 1]
+
+    def memoria(self):
+        """Bytes das listas de sequências, dos baldes e dos blocos de texto."""
+        total = sys.getsizeof(self.niveis) + sys.getsizeof(self.tags) + sys.getsizeof(self.pares)
+        for grupo in (self.niveis, self.tags, self.pares):
+            for posicoes in grupo.values():
+                total += sys.getsizeof(posicoes) + sys.getsizeof(posicoes.seqs)
+        total += sys.getsizeof(self._baldes) + sys.getsizeof(self._baldes_seq)
+        total += sum(map(sys.getsizeof, self._baldes)) + sum(map(sys.getsizeof, self._baldes_seq))
+        total += sys.getsizeof(self._blocos) + sys.getsizeof(self._atual)
+        total += sum(sys.getsizeof(bloco) + sys.getsizeof(inicios)
+                     for _ini, bloco, inicios in self._blocos)
+        total += sum(map(sys.getsizeof, self._atual))
+        return total
+
+    def com_texto(self, texto, lo, hi, entre=None, limite=None):
+        """(sequências, início): as sequências em [lo, hi) cuja mensagem contém
+        `texto` (sem diferenciar caixa), cruzadas com o array ordenado `entre`
+        se dado. Os blocos são varridos do mais novo ao mais antigo; com
+        `limite`, a varredura para no bloco em que os acertos passam de
+        `limite`. [início, hi) é o trecho varrido (início == lo: tudo).
+        """
+        agulha = texto.lower()
+        blocos = list(self._blocos)
+        if self._atual:
+            blocos.append(self._bloco_atual())
+        partes, n, inicio = [], 0, lo
+        for ini, bloco, inicios in reversed(blocos):
+            if ini >= hi:
+                continue
+            if ini + INDICE_BLOCO <= lo:
+                break
+            if limite is not None and n >= limite:
+                inicio = ini + INDICE_BLOCO
+                break
+            if agulha not in bloco:
+                continue
+            # cada pedaço termina num acerto; fromkeys junta os acertos da mesma linha
+            pedacos = bloco.split(agulha)
+            del pedacos[-1]
+            if len(pedacos) <= INDICE_ESPARSO:
+                # o acerto j começa na soma dos pedaços 0..j mais j agulhas
+                tam = len(agulha)
+                posicoes = map(add, accumulate(map(len, pedacos)),
+                               range(0, tam * len(pedacos), tam))
+                linhas = dict.fromkeys(map(bisect_right, repeat(inicios), posicoes))
+                achadas = array("q", map(add, linhas, repeat(ini - 1)))
+            else:
+                # a linha do acerto j é o total de "\n" nos pedaços 0..j
+                linhas = dict.fromkeys(accumulate(map(str.count, pedacos, repeat("\n"))))
+                achadas = array("q", map(add, linhas, repeat(ini)))
+            if ini < lo or ini + INDICE_BLOCO > hi:
+                achadas = achadas[bisect_left(achadas, lo):bisect_left(achadas, hi)]
+            if entre is not None:
+                a = bisect_left(entre, achadas[0]) if achadas else 0
+                b = bisect_right(entre, achadas[-1]) if achadas else 0
+                achadas = array("q", sorted(set(entre[a:b]).intersection(achadas)))
+            partes.append(achadas)
+            n += len(achadas)
+        resultado = array("q")
+        for achadas in reversed(partes):
+            resultado.extend(achadas)
+        return resultado, inicio
+
+
+class BufferLogs:
+    """Anel de capacidade fixa com as entradas (nivel, tag, msg) mais recentes.
+
+    Indexável em O(1) (0 = a mais antiga ainda em memória), para o visor
+    buscar só a janela que mostra. `total - len(buffer)` é o número de
+    sequência da entrada 0. Com `indexar`, um IndiceLogs acompanha cada
+    entrada e `buscar` filtra por nível, tag, tempo e texto.
+
+    Com `compartilhar`, nível e tag passam por sys.intern e uma entrada
+    igual a uma das LOGS_COMUNS mais recentes vira referência à tupla já
+    guardada: a mesma linha repetida milhares de vezes ocupa uma vez só.
+    A tabela não passa da capacidade, para não segurar em memória muito
+    mais entradas do que as que já saíram do anel.
+    """
+
+    def __init__(self, capacidade=LOGS_CAPACIDADE, transbordo=None, indexar=True,
+                 compartilhar=True):
+        self.capacidade = capacidade
+        self.indice = IndiceLogs() if indexar else None
+        self._comuns = {} if compartilhar else None  # entrada -> a cópia guardada
+        self._comuns_max = min(LOGS_COMUNS, capacidade)
+        self._itens = [None] * capacidade
+        self._inicio = 0  # posição da entrada mais antiga em _itens
+        self._n = 0
+        self.total = 0        # entradas recebidas desde o início
+        self.descartadas = 0  # entradas que saíram do anel (para o disco ou perdidas)
+        # transbordo: caminho do arquivo, ou None para descartar. O arquivo é
+        # aberto aqui (OSError de caminho inválido sai para quem cria o buffer);
+        # se o disco falhar depois, o transbordo é desligado e ao_falhar avisa.
+        self.transbordo = None
+        self.erro_transbordo = None
+        self.ao_falhar = None  # ao_falhar(escritor, exc), chamado na thread do escritor
+        if transbordo:
+            escritor = TransbordoLogs(transbordo)
+            escritor.verificar()
+            escritor.iniciar(erro=self._transbordo_falhou)
+            self.transbordo = escritor
+
+    def append(self, entrada):
+        if self._comuns is not None:
+            entrada = self._compartilhada(entrada)
+        if self._n == self.capacidade:
+            self.descartadas += 1
+            if self.transbordo is not None:
+                self.transbordo.registrar(*self._itens[self._inicio])
+            self._itens[self._inicio] = entrada
+            self._inicio = (self._inicio + 1) % self.capacidade
+        else:
+            self._itens[(self._inicio + self._n) % self.capacidade] = entrada
+            self._n += 1
+        if self.indice is not None:
+            self.indice.adicionar(self.total, entrada, time.time())
+            if self.descartadas and self.total % INDICE_BLOCO == 0:
+                self.indice.podar(self.total - self._n + 1)
+        self.total += 1
+
+    def _compartilhada(self, entrada):
+        comum = self._comuns.get(entrada)
+        if comum is None:
+            nivel, tag, msg = entrada
+            comum = (sys.intern(nivel), sys.intern(tag) if tag else tag, msg)
+            if len(self._comuns) >= self._comuns_max:
+                self._comuns.clear()  # recomeça; as linhas frequentes voltam logo
+            self._comuns[comum] = comum
+        return comum
+
+    def buscar(self, nivel=None, tag=None, desde=None, ate=None, texto=None, a_partir=None):
+        """Sequências (crescentes) das entradas em memória que passam em todos os filtros.
+
+        `desde`/`ate` são horários do time.time(), com a precisão do balde
+        de tempo; `texto` é substring da mensagem, sem diferenciar caixa.
+        `a_partir` limita a busca às sequências dali em diante (as novas).
+        """
+        return self.pagina(nivel, tag, desde, ate, texto, a_partir)[0]
+
+    def pagina(self, nivel=None, tag=None, desde=None, ate=None, texto=None, a_partir=None,
+               antes=None, limite=None):
+        """Como buscar, só até `antes` e, com `limite`, só os ~`limite` acertos
+        mais novos da busca por texto: (sequências, continuação), onde a
+        continuação é o `antes` da página anterior, ou None se não há mais.
+        """
+        primeiro, fim = self.total - self._n, self.total
+        lo = primeiro if a_partir is None else max(primeiro, a_partir)
+        hi = fim if antes is None else min(fim, antes)
+        indice = self.indice
+        if desde is not None:
+            lo = max(lo, indice.seq_do_tempo(desde, fim))
+        if ate is not None:
+            hi = min(hi, indice.seq_do_tempo(ate + INDICE_BALDE, fim))
+        if lo >= hi:
+            return range(0), None
+        candidatas = None
+        if nivel is not None or tag is not None:
+            if nivel is not None and tag is not None:
+                posicoes = indice.pares.get((nivel, tag))
+            else:
+                posicoes = indice.niveis.get(nivel) if nivel is not None else indice.tags.get(tag)
+            if posicoes is None:
+                return range(0), None
+            candidatas = posicoes.intervalo(lo, hi)
+            if not texto or not candidatas:
+                return candidatas, None
+        elif not texto:
+            return range(lo, hi), None
+        achadas, inicio = indice.com_texto(texto, lo, hi, candidatas, limite)
+        return achadas, (inicio if inicio > lo else None)
+
+    def _transbordo_falhou(self, erro):
+        escritor, self.transbordo = self.transbordo, None
+        self.erro_transbordo = erro
+        if escritor is not None and self.ao_falhar is not None:
+            self.ao_falhar(escritor, erro)
+
+    def fechar(self):
+        """Grava o que falta do transbordo e encerra a thread dele."""
+        if self.transbordo is not None:
+            self.transbordo.parar()
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return self._itens[(self._inicio + i) % self.capacidade]
+
+    def __iter__(self):
+        return iter(self.fatia(0, self._n))
+
+    def fatia(self, i, j):
+        """Entradas i..j-1 (limitadas ao que está em memória), da mais antiga à mais nova."""
+        i, j = max(0, i), min(j, self._n)
+        if i >= j:
+            return []
+        a, b = self._inicio + i, self._inicio + j
+        if b <= self.capacidade:
+            return self._itens[a:b]
+        if a >= self.capacidade:
+            return self._itens[a - self.capacidade:b - self.capacidade]
+        return self._itens[a:] + self._itens[:b - self.capacidade]
+
+    def memoria(self):
+        """Bytes do anel, das entradas (tuplas e strings, cada objeto uma vez), da
+        tabela de entradas comuns e do índice."""
+        total = sys.getsizeof(self._itens)
+        entradas = iter(self)
+        if self._comuns is not None:
+            # as comuns que já saíram do anel também ficam vivas
+            total += sys.getsizeof(self._comuns)
+            entradas = (*entradas, *self._comuns)
+        vistos = set()
+        for entrada in entradas:
+            for objeto in (entrada, *entrada):
+                if id(objeto) not in vistos:
+                    vistos.add(id(objeto))
+                    total += sys.getsizeof(objeto)
+        if self.indice is not None:
+            total += self.indice.memoria()
+        return total
+
+    def relatorio(self):
+        texto = (f"logs: {self._n}/{self.capacidade} em memória "
+                 f"(~{self.memoria() / 1024:.0f} KiB), {self.total} recebidos, "
+                 f"{self.descartadas} fora do anel")
+        if self.transbordo is not None:
+            texto += f" -> {self.transbordo.caminho}"
+        elif self.erro_transbordo is not None:
+            texto += f" (transbordo desligado: {self.erro_transbordo})"
+        return texto
+
+
+class VisorLogs:
+    """Visor virtualizado do BufferLogs no Text da página CONFIG.
+
+    O Text só contém as entradas da janela visível; a barra de rolagem e a
+    roda do mouse trocam a janela. Abrir o CONFIG ou percorrer centenas de
+    milhares de entradas custa o mesmo que desenhar uma tela. Parado no fim,
+    o visor segue as entradas novas, redesenhando no máximo uma vez por
+    LOGS_INTERVALO; fora do CONFIG ele não desenha nada. Com `filtrar`, a
+    janela anda sobre o resultado de BufferLogs.pagina em vez do buffer todo;
+    a busca por texto traz as LOGS_PAGINA mais novas e as anteriores quando
+    a janela chega perto do começo.
+    """
+
+    def __init__(self, text, barra, buffer, intervalo=LOGS_INTERVALO):
+        self.text = text
+        self.barra = barra
+        self.buffer = buffer
+        self.intervalo = intervalo
+        self.visivel = False
+        self.seguir = True  # preso ao fim: mostra sempre as entradas mais novas
+        self._topo = 0      # número de sequência da primeira entrada mostrada
+        self._after_id = None
+        self.criterios = None  # filtros de BufferLogs.buscar, ou None para tudo
+        self._selecao = None   # sequências do último buscar
+        self._buscado = 0      # buffer.total no último buscar: dali em diante é novo
+        self._anteriores = None  # continuação da busca paginada (None: nada mais antigo)
+        self._refazer = False  # chegaram entradas desde o último buscar
+        self._linha_px = tkfont.Font(font=text.cget("font")).metrics("linespace")
+        for nivel, cor in CORES_NIVEL.items():
+            text.tag_configure(nivel, foreground=cor)
+        barra.config(command=self._rolar)
+        text.bind("<Configure>", lambda _e: self.novo())
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            text.bind(evento, self._roda)
+
+    def mostrar(self):
+        self.visivel = True
+        self._desenhar()
+
+    def ocultar(self):
+        self.visivel = False
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+
+    def novo(self):
+        """Avisa que o buffer mudou; o redesenho fica para o próximo tick."""
+        self._refazer = True
+        if self.visivel and self._after_id is None:
+            self._after_id = self.text.after(self.intervalo, self._desenhar)
+
+    def ir(self, seq):
+        """Põe a entrada `seq` no topo da janela e para de seguir o fim."""
+        self.seguir = False
+        self._topo = seq
+        if self.visivel:
+            self._desenhar()
+
+    def filtrar(self, criterios):
+        """Troca os filtros (dict para BufferLogs.buscar, ou None) e volta ao fim."""
+        self.criterios = criterios or None
+        self._selecao = None
+        self.seguir = True
+        if self.visivel:
+            self._desenhar()
+
+    @property
+    def parcial(self):
+        """A seleção ainda não tem as páginas mais antigas da busca."""
+        return self.criterios is not None and self._anteriores is not None
+
+    def selecao(self):
+        """Sequências que o visor percorre (todo o buffer, sem filtros)."""
+        buf = self.buffer
+        if self.criterios is None:
+            return range(buf.total - len(buf), buf.total)
+        # com a janela parada no meio, não acompanha as entradas novas; no fim,
+        # busca só nas novas e junta à seleção, sem percorrer o buffer de novo
+        if self._selecao is None:
+            self._selecao, self._anteriores = buf.pagina(limite=LOGS_PAGINA, **self.criterios)
+        elif self._refazer and self.seguir:
+            primeiro = buf.total - len(buf)
+            novas = buf.buscar(a_partir=self._buscado, **self.criterios)
+            self._selecao = self._juntar(self._selecao, novas, primeiro)
+            if self._anteriores is not None and self._anteriores <= primeiro:
+                self._anteriores = None
+        else:
+            return self._selecao
+        self._buscado = buf.total
+        self._refazer = False
+        return self._selecao
+
+    @staticmethod
+    def _juntar(selecao, novas, primeiro):
+        """`selecao` sem as sequências que saíram do buffer, seguida de `novas`."""
+        saiu = bisect_left(selecao, primeiro)
+        if isinstance(selecao, range):
+            selecao = selecao[saiu:]
+            if not novas:
+                return selecao
+            if isinstance(novas, range) and (not selecao or selecao.stop == novas.start):
+                return range(selecao.start if selecao else novas.start, novas.stop)
+            selecao = array("q", selecao)
+        elif saiu:
+            del selecao[:saiu]
+        selecao.extend(novas)
+        return selecao
+
+    def _carregar_anteriores(self):
+        velhas, self._anteriores = self.buffer.pagina(antes=self._anteriores, limite=LOGS_PAGINA,
+                                                      **self.criterios)
+        selecao = array("q", velhas)
+        selecao.extend(self._selecao)
+        self._selecao = selecao
+
+    def _linhas(self):
+        return max(1, self.text.winfo_height() // self._linha_px)
+
+    def _desenhar(self):
+        self._after_id = None
+        buf = self.buffer
+        selecao = self.selecao()
+        linhas = self._linhas()
+        if not self.seguir:
+            # perto do começo de uma busca paginada: traz a página anterior antes
+            while self._anteriores is not None and bisect_left(selecao, self._topo) < linhas:
+                self._carregar_anteriores()
+                selecao = self._selecao
+        n = len(selecao)
+        maximo = max(0, n - linhas)
+        inicio = maximo if self.seguir else min(bisect_left(selecao, self._topo), maximo)
+        self._topo = selecao[inicio] if n else buf.total
+        primeiro = buf.total - len(buf)
+        entradas = [buf[seq - primeiro] for seq in selecao[inicio:inicio + linhas]
+                    if seq >= primeiro]
+
+        t = self.text
+        t.config(state=tk.NORMAL)
+        t.delete("1.0", tk.END)
+        if entradas:
+            t.insert(tk.END, *_trechos(entradas))
+        if self.seguir:
+            t.see(tk.END)  # linhas longas quebram: garante a mais nova à vista
+        else:
+            t.yview_moveto(0)
+        t.config(state=tk.DISABLED)
+        if n:
+            self.barra.set(inicio / n, (inicio + len(entradas)) / n)
+        else:
+            self.barra.set(0, 1)
+
+    def _rolar(self, acao, valor, unidade=None):
+        selecao = self.selecao()
+        n, linhas = len(selecao), self._linhas()
+        maximo = max(0, n - linhas)
+        inicio = bisect_left(selecao, self._topo)
+        if acao == "moveto":
+            inicio = int(float(valor) * n)
+        else:
+            inicio += int(valor) * (linhas if unidade == "pages" else 1)
+        inicio = min(max(0, inicio), maximo)
+        self.seguir = inicio >= maximo
+        self._topo = selecao[inicio] if n else self.buffer.total
+        self._desenhar()
+
+    def _roda(self, evento):
+        para_cima = evento.num == 4 or getattr(evento, "delta", 0) > 0
+        self._rolar("scroll", -LOGS_RODA if para_cima else LOGS_RODA, "units")
+        return "break"
+
+
+class FiltrosLogs:
+    """Filtros do visor de logs: nível, tag, período e busca por texto."""
+
+    PERIODOS = (("tudo", None), ("5 min", 300), ("1 h", 3600), ("24 h", 86400))
+
+    def __init__(self, parent, visor, bg="#050509"):
+        self.visor = visor
+        self._after_id = None
+        self.frame = tk.Frame(parent, bg=bg)
+        linha1 = tk.Frame(self.frame, bg=bg)
+        linha1.pack(fill=tk.X)
+        linha2 = tk.Frame(self.frame, bg=bg)
+        linha2.pack(fill=tk.X, pady=(4, 0))
+
+        self.nivel = ttk.Combobox(linha1, values=("todos",) + tuple(CORES_NIVEL),
+                                  width=6, state="readonly")
+        self.nivel.set("todos")
+        self.periodo = ttk.Combobox(linha1, values=[p[0] for p in self.PERIODOS],
+                                    width=6, state="readonly")
+        self.periodo.set("tudo")
+        self.tag = ttk.Entry(linha1, width=12)
+        for rotulo, widget in (("Nível", self.nivel), ("Período", self.periodo), ("Tag", self.tag)):
+            tk.Label(linha1, text=rotulo, bg=bg, fg="#B0BEC5",
+                     font=("Segoe UI", 10)).pack(side=tk.LEFT, padx=(0, 4))
+            widget.pack(side=tk.LEFT, padx=(0, 8))
+
+        tk.Label(linha2, text="Busca", bg=bg, fg="#B0BEC5",
+                 font=("Segoe UI", 10)).pack(side=tk.LEFT, padx=(0, 4))
+        self.texto = ttk.Entry(linha2)
+        self.texto.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.lbl_total = tk.Label(linha2, text="", bg=bg, fg="#B0BEC5", font=("Consolas", 10))
+        self.lbl_total.pack(side=tk.LEFT, padx=(8, 0))
+
+        for combo in (self.nivel, self.periodo):
+            combo.bind("<<ComboboxSelected>>", self._aplicar)
+        for entrada in (self.tag, self.texto):
+            entrada.bind("<KeyRelease>", self._adiar)
+
+    def _adiar(self, _event=None):
+        # digitação: filtra quando o teclado para por um instante
+        if self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+        self._after_id = self.frame.after(LOGS_INTERVALO * 2, self._aplicar)
+
+    def _aplicar(self, _event=None):
+        self._after_id = None
+        criterios = {}
+        if self.nivel.get() != "todos":
+            criterios["nivel"] = self.nivel.get()
+        if self.tag.get().strip():
+            criterios["tag"] = self.tag.get().strip()
+        periodo = dict(self.PERIODOS)[self.periodo.get()]
+        if periodo:
+            criterios["desde"] = time.time() - periodo
+        if self.texto.get():
+            criterios["texto"] = self.texto.get()
+        self.visor.filtrar(criterios)
+        if criterios:
+            mais = "+" if self.visor.parcial else ""
+            self.lbl_total.config(text=f"{len(self.visor.selecao())}{mais}/{len(self.visor.buffer)}")
+        else:
+            self.lbl_total.config(text="")
@@ -0,0 +1,1298 @@
+"""Rosto animado dos painéis (Jarvis, Alicia, Javis).
+
+Um único FaceWidget desenha qualquer tema de temas.py: o quadro vira uma
+cena de primitivas, entregue a um backend (itens retidos no canvas ou
+composição Pillow). Otimizações feitas aqui valem para todos os rostos.
+"""
+import bisect
+import colorsys
+import math
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+import tkinter as tk
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageTk  # pip install pillow
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+from temas import TEMAS
+
+# Taxa de quadros do rosto. Cada estado tem seu teto; ao chamar set_estado,
+# marcar_fala ou set_mouth_level o rosto volta a FPS_MAX enquanto houver mudança.
+FPS_MAX = 60
+FPS_ESTADO = {"speaking": 60, "listening": 30, "idle": 20, "sleep": 5}
+FPS_RAPIDO_JANELA = 1.0  # segundos em FPS_MAX após um evento
+FPS_REPOUSO = 1          # repouso profundo: quadro estático, o tick só atende pedidos
+TICK_BASE = 0.06         # passo em que as velocidades de animação foram calibradas
+
+# Nível da boca vindo de fora (MOUTH:, envelope de áudio), com horário
+BOCA_AMOSTRAS = 128      # capacidade do anel de (timestamp, nível)
+BOCA_ATRASO = 0.06       # lê o anel no passado, para ter duas amostras a interpolar
+BOCA_VALIDADE = 0.3      # sem amostra por este tempo, a boca volta à animação do estado
+BOCA_SUAVIZACAO = 0.05   # constante de tempo (s) do EMA aplicado no quadro
+
+# Sprites (Pillow) de olhos e boca
+SPRITE_CAPACIDADE = 256  # entradas no LRU; esvaziado a cada redimensionamento
+SPRITE_PASSO_COR = 4     # brilho em degraus, para reaproveitar sprites entre quadros
+SPRITE_PASSO_BOCA = 2    # altura da boca em degraus de 2 px
+SPRITE_SUPERAMOSTRA = 3  # desenha ampliado e reduz (antisserrilhado)
+
+# Governador de qualidade: do nível 0 (tudo) ao último, cada preset corta
+# efeitos do tema. halos/particulas são frações das do tema, degrade=False
+# troca as faixas do fundo por uma só e fps multiplica a taxa de cada estado.
+QUALIDADES = (
+    {"nome": "alta", "halos": 1.0, "particulas": 1.0, "degrade": True, "fps": 1.0},
+    {"nome": "media", "halos": 0.5, "particulas": 0.5, "degrade": True, "fps": 1.0},
+    {"nome": "baixa", "halos": 0.25, "particulas": 0.25, "degrade": False, "fps": 0.5},
+    {"nome": "minima", "halos": 0.0, "particulas": 0.0, "degrade": False, "fps": 0.4},
+)
+GOVERNADOR_ORCAMENTO_MS = 12.0  # p90 do custo por quadro acima disto desce um nível
+GOVERNADOR_FOLGA = 0.4          # p90 abaixo de orçamento*folga conta como folga
+GOVERNADOR_AMOSTRAS = 90        # quadros desenhados por avaliação
+GOVERNADOR_SUBIDA = 3           # avaliações com folga seguidas para subir um nível
+GOVERNADOR_PARTIDA_MS = 4.0     # medição da partida: ms por quadro montado, aplicado e pintado
+GOVERNADOR_TIMER_MS = 16.0      # atraso do after() tolerado além do período (timer do SO: ~15.6 ms no Windows)
+
+# Métricas por quadro (overlay em F12 e log periódico do App)
+METRICAS_JANELA = 300    # ticks guardados nas janelas móveis
+OVERLAY_INTERVALO = 500  # ms entre atualizações do overlay
+
+
+# -------------------- Sprites do rosto --------------------
+
+def _hex_rgb(cor):
+    return tuple(int(cor[i:i+2], 16) for i in (1, 3, 5))
+
+
+def _linha_redonda(draw, x1, y1, x2, y2, cor, largura):
+    # ImageDraw não tem capstyle; as pontas redondas são dois círculos
+    draw.line((x1, y1, x2, y2), fill=cor, width=int(largura))
+    r = largura / 2
+    for x, y in ((x1, y1), (x2, y2)):
+        draw.ellipse((x-r, y-r, x+r, y+r), fill=cor)
+
+
+def _oval_contorno(draw, cx, cy, rx, ry, cor, largura):
+    # Tk centraliza o traço no contorno; o Pillow desenha para dentro
+    mx, my = rx + largura / 2, ry + largura / 2
+    draw.ellipse((cx-mx, cy-my, cx+mx, cy+my), outline=cor, width=int(largura))
+
+
+def _render_sprite(w, h, desenho):
+    """Desenha em escala SPRITE_SUPERAMOSTRA e reduz para (w, h)."""
+    s = SPRITE_SUPERAMOSTRA
+    w, h = max(1, int(math.ceil(w))), max(1, int(math.ceil(h)))
+    img = Image.new("RGBA", (w*s, h*s), (0, 0, 0, 0))
+    desenho(ImageDraw.Draw(img), s)
+    return img.resize((w, h), Image.LANCZOS)
+
+
+def sprite_olho(r, cor, halo, aro, linha):
+    """Aro de largura `aro`, halo opcional (fatores rx, ry de r) e linha do meio."""
+    rgb = _hex_rgb(cor)
+    hx, hy = halo or (1, 1)
+    w, h = r*2*max(1, hx) + 8, r*2*max(1, hy) + 8
+
+    def desenho(d, s):
+        cx, cy = w*s/2, h*s/2
+        if halo:
+            _oval_contorno(d, cx, cy, r*hx*s, r*hy*s, rgb, 2*s)
+        _oval_contorno(d, cx, cy, r*s, r*s, rgb, aro*s)
+        _linha_redonda(d, cx - r*linha*s, cy, cx + r*linha*s, cy, rgb, aro*s)
+    return _render_sprite(w, h, desenho)
+
+
+def sprite_piscar(r, cor, largura):
+    rgb = _hex_rgb(cor)
+    m = largura/2 + 2
+    w, h = r*2 + 2*m, 2*m
+
+    def desenho(d, s):
+        _linha_redonda(d, m*s, h*s/2, (w-m)*s, h*s/2, rgb, largura*s)
+    return _render_sprite(w, h, desenho)
+
+
+def sprite_boca(largura, altura, cor):
+    rgb = _hex_rgb(cor)
+    w, h = largura + 10, altura + 10
+
+    def desenho(d, s):
+        m = 2  # folga de 5 px menos meio traço (o Pillow desenha para dentro)
+        # Tk: start=200, extent=140 (anti-horário) == Pillow: 20° a 160° (horário)
+        d.arc((m*s, m*s, (w-m)*s, (h-m)*s), start=20, end=160, fill=rgb, width=6*s)
+    return _render_sprite(w, h, desenho)
+
+
+RENDER_SPRITE = {"olho": sprite_olho, "piscar": sprite_piscar, "boca": sprite_boca}
+
+
+class SpriteCache:
+    """LRU de sprites do rosto, válido para um tamanho de canvas.
+
+    A chave é (forma, *parâmetros) e a forma escolhe a função em RENDER_SPRITE.
+    Guarda a imagem Pillow e, quando pedida, a PhotoImage correspondente.
+    """
+
+    def __init__(self, capacidade=SPRITE_CAPACIDADE):
+        self.capacidade = capacidade
+        self.tamanho = None
+        self._itens = OrderedDict()
+
+    def _entrada(self, tamanho, chave):
+        if tamanho != self.tamanho:
+            self._itens.clear()
+            self.tamanho = tamanho
+        entrada = self._itens.get(chave)
+        if entrada is not None:
+            self._itens.move_to_end(chave)
+            return entrada
+        entrada = [RENDER_SPRITE[chave[0]](*chave[1:]), None]
+        self._itens[chave] = entrada
+        if len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+        return entrada
+
+    def obter(self, tamanho, chave):
+        return self._entrada(tamanho, chave)[0]
+
+    def foto(self, tamanho, chave):
+        entrada = self._entrada(tamanho, chave)
+        if entrada[1] is None:
+            entrada[1] = ImageTk.PhotoImage(entrada[0])
+        return entrada[1]
+
+
+# -------------------- Backends do rosto --------------------
+#
+# O RostoModelo descreve cada quadro como uma "cena": uma lista de primitivas
+# (chave, tipo, coords, opcoes) no vocabulário do canvas do Tk ("oval",
+# "polygon", "arc"... e "image" para sprites). A chave identifica o mesmo
+# elemento de um quadro para o outro.
+
+def suavizar(pts, passos=4):
+    """Achata um polígono smooth=True do Tk (spline quadrática) em pontos."""
+    n = len(pts) // 2
+    P = [(pts[2*i], pts[2*i+1]) for i in range(n)]
+    saida = []
+    for i in range(n):
+        (ax, ay), (bx, by), (cx, cy) = P[i-1], P[i], P[(i+1) % n]
+        m0x, m0y = (ax+bx)/2, (ay+by)/2
+        m1x, m1y = (bx+cx)/2, (by+cy)/2
+        for k in range(passos):
+            t = k / passos
+            a, b, c = (1-t)*(1-t), 2*(1-t)*t, t*t
+            saida.append((a*m0x + b*bx + c*m1x, a*m0y + b*by + c*m1y))
+    return saida
+
+
+def _corridas(valores):
+    """[1, 2, 3, 7, 8] -> [(1, 3), (7, 8)] (valores ordenados)."""
+    corridas = []
+    inicio = anterior = valores[0]
+    for v in valores[1:]:
+        if v != anterior + 1:
+            corridas.append((inicio, anterior))
+            inicio = v
+        anterior = v
+    corridas.append((inicio, anterior))
+    return corridas
+
+
+def _so_contorno_mudou(a, b):
+    return a.keys() == b.keys() and all(a[k] == b[k] for k in a if k != "outline")
+
+
+class CanvasBackend:
+    """Desenha a cena com itens do canvas retidos entre quadros.
+
+    Cada chave da cena mantém o seu item: as coordenadas só são reenviadas
+    quando mudam (o visor, só no resize) e das opções só vão as que mudaram
+    (tipicamente a cor do neon), então o Tk não refaz os polígonos suavizados.
+    """
+
+    nome = "canvas"
+
+    def __init__(self, canvas, sprites):
+        self.canvas = canvas
+        self.sprites = sprites
+        self._itens = {}  # chave -> (id, tipo, coords, opcoes)
+        self.criados = 0  # itens criados no canvas desde o início (métricas)
+
+    def desenhar(self, cena, w, h):
+        c = self.canvas
+        itens = {}
+        abaixo = None
+        for chave, tipo, coords, opcoes in cena:
+            if tipo == "image":
+                opcoes = {"image": self.sprites.foto((w, h), opcoes["sprite"])}
+            item = self._itens.pop(chave, None)
+            if item is not None and (item[1] != tipo or item[3].keys() != opcoes.keys()):
+                c.delete(item[0])
+                item = None
+            if item is None:
+                iid = getattr(c, "create_" + tipo)(*coords, **opcoes)
+                self.criados += 1
+                # itens novos entram logo acima do elemento anterior da cena
+                if abaixo is None:
+                    c.tag_lower(iid)
+                else:
+                    c.tag_raise(iid, abaixo)
+            else:
+                iid, _tipo, coords_ant, opcoes_ant = item
+                if coords != coords_ant:
+                    c.coords(iid, *coords)
+                mudou = {k: v for k, v in opcoes.items() if opcoes_ant[k] != v}
+                if mudou:
+                    c.itemconfigure(iid, **mudou)
+            itens[chave] = (iid, tipo, coords, opcoes)
+            abaixo = iid
+        for item in self._itens.values():
+            c.delete(item[0])
+        self._itens = itens
+
+
+class ImagemBackend:
+    """Compõe a cena num buffer Pillow exibido como uma única PhotoImage.
+
+    O buffer é reaproveitado entre quadros: só os blocos de TILE px tocados
+    por primitivas que mudaram são repintados. Quando só a cor do contorno de
+    um polígono/oval muda (o brilho do neon), só os blocos sobre o traço contam.
+    """
+
+    nome = "imagem"
+    TILE = 32
+
+    def __init__(self, canvas, sprites):
+        self.canvas = canvas
+        self.sprites = sprites
+        self.fundo = canvas.cget("bg")
+        self._buffer = None
+        self._foto = None
+        self._item = None
+        self.criados = 0
+        self._anterior = {}
+        self._fontes = {}
+        self._poligonos = {}
+
+    def desenhar(self, cena, w, h):
+        atual = {p[0]: p for p in cena}
+        if self._buffer is None or self._buffer.size != (w, h):
+            self._poligonos.clear()
+            self._buffer = Image.new("RGB", (w, h), self.fundo)
+            self._foto = ImageTk.PhotoImage(self._buffer)
+            if self._item is not None:
+                self.canvas.delete(self._item)
+            self._item = self.canvas.create_image(0, 0, image=self._foto, anchor="nw")
+            self.canvas.tag_lower(self._item)
+            self.criados += 1
+            regioes = [(0, 0, w, h)]
+        else:
+            blocos = set()
+            for chave, prim in atual.items():
+                antigo = self._anterior.get(chave)
+                if antigo != prim:
+                    self._marcar(blocos, antigo, prim, w, h)
+            for chave, antigo in self._anterior.items():
+                if chave not in atual:
+                    self._marcar(blocos, antigo, None, w, h)
+            regioes = self._regioes(blocos, w, h)
+        self._anterior = atual
+        if not regioes:
+            return
+        caixas = [(p, self._caixa(p, w, h)) for p in cena]
+        for regiao in regioes:
+            self._pintar_regiao(regiao, caixas, w, h)
+        self._foto.paste(self._buffer)
+
+    # --- regiões sujas ---
+
+    def _marcar(self, blocos, antigo, novo, w, h):
+        T = self.TILE
+        if (antigo is not None and novo is not None and antigo[1] == novo[1]
+                and antigo[1] in ("polygon", "oval") and antigo[2] == novo[2]
+                and _so_contorno_mudou(antigo[3], novo[3])):
+            # cada trecho entre dois pontos do caminho, com a folga do traço
+            m = novo[3].get("width", 1) / 2 + 2
+            pts = self._caminho(novo)
+            for (xa, ya), (xb, yb) in zip(pts, pts[1:] + pts[:1]):
+                for tx in range(int(max(0, min(xa, xb) - m)) // T, int(max(0, max(xa, xb) + m)) // T + 1):
+                    for ty in range(int(max(0, min(ya, yb) - m)) // T, int(max(0, max(ya, yb) + m)) // T + 1):
+                        blocos.add((tx, ty))
+            return
+        for prim in (antigo, novo):
+            if prim is None:
+                continue
+            x1, y1, x2, y2 = self._caixa(prim, w, h)
+            for tx in range(int(max(0, x1)) // T, int(max(0, min(w - 1, x2))) // T + 1):
+                for ty in range(int(max(0, y1)) // T, int(max(0, min(h - 1, y2))) // T + 1):
+                    blocos.add((tx, ty))
+
+    def _caminho(self, prim):
+        """Pontos ao longo do traço, espaçados de no máximo TILE/2."""
+        _chave, tipo, coords, op = prim
+        if tipo == "oval":
+            x1, y1, x2, y2 = coords
+            cx, cy, rx, ry = (x1+x2)/2, (y1+y2)/2, (x2-x1)/2, (y2-y1)/2
+            n = max(8, int(math.pi * (rx + ry) / (self.TILE / 2)))
+            return [(cx + rx*math.cos(2*math.pi*k/n), cy + ry*math.sin(2*math.pi*k/n))
+                    for k in range(n)]
+        if op.get("smooth"):
+            pts = suavizar(coords)
+        else:
+            pts = list(zip(coords[0::2], coords[1::2]))
+        pontos = []
+        passo = self.TILE / 2
+        for (xa, ya), (xb, yb) in zip(pts, pts[1:] + pts[:1]):
+            n = max(1, int(math.hypot(xb - xa, yb - ya) / passo) + 1)
+            pontos.extend((xa + (xb-xa)*k/n, ya + (yb-ya)*k/n) for k in range(n))
+        return pontos
+
+    def _regioes(self, blocos, w, h):
+        """Une os blocos em retângulos: corridas por linha, empilhadas se iguais."""
+        if not blocos:
+            return []
+        T = self.TILE
+        linhas = {}
+        for tx, ty in blocos:
+            linhas.setdefault(ty, []).append(tx)
+        fechadas, abertas = [], {}
+        for ty in sorted(linhas):
+            novas = {}
+            for corrida in _corridas(sorted(linhas[ty])):
+                faixa = abertas.pop(corrida, None)
+                if faixa is not None and faixa[1] == ty - 1:
+                    faixa[1] = ty
+                else:
+                    if faixa is not None:
+                        fechadas.append((corrida, faixa))
+                    faixa = [ty, ty]
+                novas[corrida] = faixa
+            fechadas.extend(abertas.items())
+            abertas = novas
+        fechadas.extend(abertas.items())
+        return [(tx0*T, ty0*T, min(w, (tx1+1)*T), min(h, (ty1+1)*T))
+                for (tx0, tx1), (ty0, ty1) in fechadas]
+
+    # --- pintura ---
+
+    def _fonte(self, fonte):
+        pil = self._fontes.get(fonte)
+        if pil is None:
+            px = int(fonte[1] * 96 / 72)  # pontos do Tk -> pixels
+            for arquivo in ("segoeuib.ttf", "DejaVuSans-Bold.ttf"):
+                try:
+                    pil = ImageFont.truetype(arquivo, px)
+                    break
+                except OSError:
+                    continue
+            else:
+                pil = ImageFont.load_default()
+            self._fontes[fonte] = pil
+        return pil
+
+    def _poligono(self, coords, smooth):
+        """Pontos (já arredondados) do polígono; os do visor só mudam no resize."""
+        chave = (coords, smooth)
+        pts = self._poligonos.get(chave)
+        if pts is None:
+            pts = suavizar(coords) if smooth else zip(coords[0::2], coords[1::2])
+            pts = [(round(x), round(y)) for x, y in pts]
+            if len(self._poligonos) > 64:
+                self._poligonos.clear()
+            self._poligonos[chave] = pts
+        return pts
+
+    def _caixa(self, prim, w, h):
+        _chave, tipo, coords, op = prim
+        if tipo == "image":
+            sprite = self.sprites.obter((w, h), op["sprite"])
+            x, y = coords
+            return (x - sprite.width/2, y - sprite.height/2,
+                    x + sprite.width/2, y + sprite.height/2)
+        if tipo == "text":
+            x1, y1, x2, y2 = self._fonte(op["font"]).getbbox(op["text"])
+            x, y = coords
+            return (x - (x2-x1)/2 - 2, y - (y2-y1)/2 - 2, x + (x2-x1)/2 + 2, y + (y2-y1)/2 + 2)
+        m = op.get("width", 1) / 2 + 2
+        xs, ys = coords[0::2], coords[1::2]
+        return (min(xs) - m, min(ys) - m, max(xs) + m, max(ys) + m)
+
+    def _pintar_regiao(self, regiao, caixas, w, h):
+        rx1, ry1, rx2, ry2 = regiao
+        bloco = Image.new("RGB", (rx2 - rx1, ry2 - ry1), self.fundo)
+        d = ImageDraw.Draw(bloco)
+        for prim, (x1, y1, x2, y2) in caixas:
+            if x2 < rx1 or x1 > rx2 or y2 < ry1 or y1 > ry2:
+                continue
+            self._pintar(bloco, d, prim, -rx1, -ry1, w, h)
+        self._buffer.paste(bloco, (rx1, ry1))
+
+    def _pintar(self, img, d, prim, ox, oy, w, h):
+        _chave, tipo, coords, op = prim
+
+        def P(x, y):
+            # arredonda no espaço do quadro e só então desloca: o resultado não
+            # depende do bloco em que a primitiva é pintada
+            return (round(x) + ox, round(y) + oy)
+
+        def caixa(x1, y1, x2, y2, m=0):
+            return P(x1 - m, y1 - m) + P(x2 + m, y2 + m)
+
+        fill = op.get("fill") or None
+        outline = op.get("outline") or None
+        largura = op.get("width", 1)
+        if tipo == "rectangle":
+            d.rectangle(caixa(*coords), fill=fill, outline=outline)
+        elif tipo == "oval":
+            m = largura / 2 if outline else 0
+            d.ellipse(caixa(*coords, m), fill=fill, outline=outline, width=int(largura))
+        elif tipo == "polygon":
+            pts = [(x + ox, y + oy) for x, y in self._poligono(coords, op.get("smooth"))]
+            if fill:
+                d.polygon(pts, fill=fill)
+            if outline:
+                d.line(pts + pts[:1], fill=outline, width=int(largura), joint="curve")
+        elif tipo == "line":
+            x1, y1, x2, y2 = coords
+            d.line(P(x1, y1) + P(x2, y2), fill=fill, width=int(largura))
+            if op.get("capstyle") == tk.ROUND:
+                for x, y in ((x1, y1), (x2, y2)):
+                    d.ellipse(caixa(x, y, x, y, largura / 2), fill=fill)
+        elif tipo == "arc":
+            inicio, extensao = op.get("start", 0), op.get("extent", 90)
+            d.arc(caixa(*coords, largura / 2), start=-(inicio + extensao) % 360,
+                  end=-inicio % 360, fill=outline, width=int(largura))
+        elif tipo == "text":
+            fonte = self._fonte(op["font"])
+            x1, y1, x2, y2 = fonte.getbbox(op["text"])
+            x, y = coords
+            d.text(P(x - (x1+x2)/2, y - (y1+y2)/2), op["text"], font=fonte, fill=fill)
+        elif tipo == "image":
+            sprite = self.sprites.obter((w, h), op["sprite"])
+            x, y = coords
+            img.paste(sprite, P(x - sprite.width/2, y - sprite.height/2), sprite)
+
+
+BACKENDS = {"canvas": CanvasBackend, "imagem": ImagemBackend}
+
+
+def diferenca(anterior, atual):
+    """Chaves novas, removidas e alteradas entre duas cenas {chave: primitiva}."""
+    novas = [k for k in atual if k not in anterior]
+    removidas = [k for k in anterior if k not in atual]
+    mudadas = [k for k, p in atual.items() if k in anterior and anterior[k] != p]
+    return novas, removidas, mudadas
+
+
+class GravadorBackend:
+    """Sink sem display: grava as cenas em vez de desenhá-las (benchmarks, CI).
+
+    Conta primitivas por tipo e, a cada quadro, quantas entraram, saíram ou
+    mudaram em relação ao anterior. Com guardar=True mantém todos os quadros
+    como (w, h, cena); fora isso só o último fica em memória.
+    """
+
+    nome = "gravador"
+
+    def __init__(self, canvas=None, sprites=None, guardar=False):
+        self.quadros = [] if guardar else None
+        self.ultima = {}
+        self.total_quadros = 0
+        self.primitivas = 0
+        self.por_tipo = Counter()
+        self.alteradas = 0  # novas + removidas + mudadas, somadas nos quadros
+        self.criados = 0
+
+    def desenhar(self, cena, w, h):
+        atual = {p[0]: p for p in cena}
+        novas, removidas, mudadas = diferenca(self.ultima, atual)
+        self.criados += len(novas)
+        self.alteradas += len(novas) + len(removidas) + len(mudadas)
+        self.primitivas += len(cena)
+        self.por_tipo.update(p[1] for p in cena)
+        self.total_quadros += 1
+        self.ultima = atual
+        if self.quadros is not None:
+            self.quadros.append((w, h, cena))
+
+
+# -------------------- Rosto --------------------
+
+def _cor_particula(spec):
+    """Cor sorteada uma vez por partícula ("particulas"/"cor" em temas.py)."""
+    if isinstance(spec, str):
+        return spec
+    if "h" in spec:
+        rgb = colorsys.hsv_to_rgb(*(random.uniform(*spec[k]) for k in "hsv"))
+        return "#%02x%02x%02x" % tuple(int(c*255) for c in rgb)
+    t = random.uniform(*spec["t"])
+    de, ate = _hex_rgb(spec["de"]), _hex_rgb(spec["ate"])
+    return "#%02x%02x%02x" % tuple(int(a + (b - a)*t) for a, b in zip(de, ate))
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+class MetricasQuadro:
+    """Janelas móveis dos últimos ticks do rosto.
+
+    Por tick: tempo de CPU montando e aplicando a cena (ms), atraso do after
+    em relação ao horário pedido (ms), itens criados no canvas e se houve
+    desenho (ticks sem mudança são pulados pela assinatura).
+    """
+
+    def __init__(self, janela=METRICAS_JANELA):
+        self.desenho = deque(maxlen=janela)
+        self.atraso = deque(maxlen=janela)
+        self.criados = deque(maxlen=janela)
+        self.quadros = deque(maxlen=janela)  # horários dos ticks que desenharam
+
+    def registrar(self, agora, desenho_ms, atraso_ms, criados, desenhou):
+        self.atraso.append(atraso_ms)
+        self.criados.append(criados)
+        if desenhou:
+            self.desenho.append(desenho_ms)
+            self.quadros.append(agora)
+
+    def fps(self, agora, janela=2.0):
+        recentes = sum(1 for t in self.quadros if agora - t <= janela)
+        return recentes / janela
+
+    def resumo(self, agora):
+        return {
+            "fps": self.fps(agora),
+            "desenho_p50": _percentil(self.desenho, 0.50),
+            "desenho_p95": _percentil(self.desenho, 0.95),
+            "atraso_p95": _percentil(self.atraso, 0.95),
+            "criados": sum(self.criados),
+        }
+
+    def texto(self, agora, fila=None):
+        r = self.resumo(agora)
+        linha = (f"{r['fps']:4.1f} fps | quadro p50 {r['desenho_p50']:.1f} ms, p95 {r['desenho_p95']:.1f} ms"
+                 f" | atraso p95 {r['atraso_p95']:.1f} ms | itens criados {r['criados']}")
+        if fila is not None:
+            linha += f" | fila {fila}"
+        return linha
+
+
+class NiveisBoca:
+    """Anel de amostras (timestamp, nível) da boca.
+
+    Escrito por quem recebe os níveis (serial, thread de áudio) e lido pelo
+    rosto na hora do quadro: amostrar(t) interpola entre as duas amostras em
+    volta de t, então rajadas e atrasos não viram saltos na boca.
+    """
+
+    def __init__(self, capacidade=BOCA_AMOSTRAS):
+        self.capacidade = capacidade
+        self._tempos = []
+        self._niveis = []
+        self._lock = threading.Lock()
+
+    def adicionar(self, t, nivel):
+        with self._lock:
+            if self._tempos and t < self._tempos[-1]:
+                i = bisect.bisect(self._tempos, t)
+                self._tempos.insert(i, t)
+                self._niveis.insert(i, nivel)
+            else:
+                self._tempos.append(t)
+                self._niveis.append(nivel)
+            if len(self._tempos) > self.capacidade:
+                del self._tempos[0]
+                del self._niveis[0]
+
+    def amostrar(self, t):
+        """Nível em t, ou None se não há amostra válida (antes da primeira ou expirada)."""
+        with self._lock:
+            i = bisect.bisect(self._tempos, t)
+            if i == 0:
+                return None
+            t0, v0 = self._tempos[i-1], self._niveis[i-1]
+            if i == len(self._tempos) or self._tempos[i] - t0 > BOCA_VALIDADE:
+                # depois da última amostra (ou num buraco): segura o último nível
+                return v0 if t - t0 <= BOCA_VALIDADE else None
+            t1, v1 = self._tempos[i], self._niveis[i]
+            return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+
+    def limpar(self):
+        with self._lock:
+            self._tempos.clear()
+            self._niveis.clear()
+
+
+class Governador:
+    """Escolhe o nível de QUALIDADES pelo custo medido dos quadros.
+
+    O custo de um quadro é o tempo montando, aplicando e pintando a cena
+    (update_idletasks) mais o atraso do tick que passa do período do quadro
+    e de GOVERNADOR_TIMER_MS: a granularidade do timer do SO e um trabalho
+    avulso do Tk não derrubam a qualidade. A cada GOVERNADOR_AMOSTRAS
+    quadros o p90 é comparado ao orçamento: estourou, desce um nível; com
+    folga por GOVERNADOR_SUBIDA avaliações, sobe um.
+    """
+
+    def __init__(self, nivel=0, orcamento_ms=GOVERNADOR_ORCAMENTO_MS):
+        self.nivel = nivel
+        self.orcamento_ms = orcamento_ms
+        self._custos = []
+        self._folgas = 0
+
+    def observar(self, custo_ms):
+        """Registra um quadro desenhado; devolve o novo nível quando ele muda."""
+        self._custos.append(custo_ms)
+        if len(self._custos) < GOVERNADOR_AMOSTRAS:
+            return None
+        p90 = _percentil(self._custos, 0.90)
+        self._custos.clear()
+        if p90 > self.orcamento_ms and self.nivel < len(QUALIDADES) - 1:
+            self.nivel += 1
+            self._folgas = 0
+            return self.nivel
+        if p90 < self.orcamento_ms * GOVERNADOR_FOLGA and self.nivel > 0:
+            self._folgas += 1
+            if self._folgas >= GOVERNADOR_SUBIDA:
+                self.nivel -= 1
+                self._folgas = 0
+                return self.nivel
+        else:
+            self._folgas = 0
+        return None
+
+
+class FaceLayout:
+    """Geometria do rosto de um tema para um tamanho de canvas, calculada uma vez por resize."""
+
+    def __init__(self, w, h, tema):
+        self.w, self.h = w, h
+        rosto, olhos, boca, nome = tema["rosto"], tema["olhos"], tema["boca"], tema["nome"]
+        fx1, fy1, fx2, fy2 = rosto["caixa"]
+        self.x1, self.y1, self.x2, self.y2 = w*fx1, h*fy1, w*fx2, h*fy2
+        self.cx, self.cy = (self.x1+self.x2)/2, (self.y1+self.y2)/2
+        self.raio = min(w, h) * rosto["raio"]
+        largura, altura = self.x2 - self.x1, self.y2 - self.y1
+
+        px, fr = rosto["painel_margem"]
+        self.painel_margem = max(px, int(min(w, h) * fr))
+        recuo, minimo = rosto["painel_raio"]
+        self.painel_raio = max(minimo, self.raio - recuo)
+        if rosto["barras"]:
+            fr, px = rosto["barras"]["largura"]
+            self.barra_largura = max(px, int(altura * fr))
+            self.barra_comprimento = altura * rosto["barras"]["comprimento"]
+
+        espacamento = largura * olhos["espacamento"]
+        self.r_olho = min(largura, altura) * olhos["raio"]
+        y_olho = self.cy - self.r_olho * olhos["subida"]
+        self.olhos = ((self.cx - espacamento/2, y_olho), (self.cx + espacamento/2, y_olho))
+        px, fr = olhos["piscar"]
+        self.piscar_largura = px + self.r_olho * fr
+
+        self.boca_largura = largura * boca["largura"]
+        self.boca_base = altura * boca["altura"]
+        self.boca_y = self.cy + altura * boca["desce"]
+
+        self.nome_y = self.y2 + h * nome["desce"]
+        fr, minimo = nome["fonte"]
+        self.nome_fonte = ("Segoe UI", max(minimo, int(h * fr)), "bold")
+
+
+class RostoModelo:
+    """Estado e animação do rosto, sem Tk: cada passo devolve a cena do quadro.
+
+    A cena é a lista de primitivas descrita em "Backends do rosto"; quem a
+    aplica é um backend (FaceWidget) ou o GravadorBackend, sem display.
+    `usar_sprites` troca olhos e boca por primitivas "image" (exige Pillow
+    no backend que for pintá-las).
+    """
+
+    def __init__(self, tema="jarvis", usar_sprites=False):
+        self.tema = TEMAS[tema]
+        self.usar_sprites = usar_sprites
+
+        self.estado = "sleep"  # idle | listening | speaking | sleep
+        self.boca_fase = 0.0
+        self.glow_fase = 0.0
+
+        self.piscando = False
+        self.ultimo_piscar = None  # marcado no primeiro passo, com o relógio de quem chama
+        self.intervalo_piscar = self.tema["piscar"]["intervalo"]
+        self.intervalo_piscar_sono = self.tema["piscar"]["sono"]
+
+        self.particulas = []
+        self._init_particulas()
+
+        self.fala_ate = 0.0
+        self.boca_intensidade = self.tema["boca"]["fala"]
+
+        self.niveis_boca = NiveisBoca()
+        self._visemas = deque()  # (inicio, fim, escala, Visemas) na ordem em que tocam
+        self._nivel_boca = None  # nível suavizado; None = animação do estado
+
+        self.layout = None
+        self._geometria = {}  # pontos de _round_rect para o layout atual
+        self._cena = []
+        self._assinatura = None
+        self._ultimo_tick = None
+        self.congelado = False
+        self.qualidade = QUALIDADES[0]
+
+    def _init_particulas(self):
+        spec = self.tema["particulas"]
+        self.particulas.clear()
+        for _ in range(spec["quantidade"]):
+            self.particulas.append({
+                "x": random.random(),
+                "y": random.random(),
+                "vx": random.uniform(-spec["vx"], spec["vx"]),
+                "vy": random.uniform(*spec["vy"]),
+                "r": random.uniform(*spec["r"]),
+                "cor": _cor_particula(spec["cor"]),
+            })
+
+    def set_estado(self, estado: str):
+        self.estado = estado
+        if estado == "speaking":
+            self.boca_fase = 0.0
+
+    def marcar_fala(self, segundos=2.0, intensidade=None, agora=None):
+        if agora is None:
+            agora = time.time()
+        self.fala_ate = max(self.fala_ate, agora + segundos)
+        if intensidade is None:
+            intensidade = self.tema["boca"]["fala"]
+        self.boca_intensidade = max(0.2, min(0.9, intensidade))
+
+    def set_mouth_level(self, level: float, t=None):
+        self.niveis_boca.adicionar(time.time() if t is None else t, max(0.0, float(level)))
+
+    def tocar_visemas(self, linha, inicio=None, duracao=None, agora=None):
+        """Enfileira uma linha do tempo de visemas (visemas.py).
+
+        Sem `inicio`, toca logo depois da anterior (ou em `agora`, padrão o
+        relógio de parede). `duracao` estica
+        ou encolhe a linha para caber no tempo dado, como o de um SPEAK_START.
+        Níveis de set_mouth_level, quando houver, têm prioridade.
+        """
+        if linha.duracao <= 0:
+            return
+        if inicio is None:
+            if agora is None:
+                agora = time.time()
+            inicio = max(agora, self._visemas[-1][1] if self._visemas else 0.0)
+        escala = duracao / linha.duracao if duracao else 1.0
+        self._visemas.append((inicio, inicio + linha.duracao*escala, escala, linha))
+
+    def parar_visemas(self):
+        self._visemas.clear()
+
+    def set_layout(self, layout):
+        """Troca o layout; devolve False se o tamanho não mudou."""
+        if self.layout is not None and (layout.w, layout.h) == (self.layout.w, self.layout.h):
+            return False
+        self.layout = layout
+        self._geometria.clear()
+        self._assinatura = None
+        return True
+
+    def set_qualidade(self, qualidade):
+        """Troca o preset de QUALIDADES; o próximo passo já desenha com ele."""
+        self.qualidade = qualidade
+        self._assinatura = None
+
+    def _n_particulas(self):
+        return int(len(self.particulas) * self.qualidade["particulas"])
+
+    def congelar(self, congelado=True):
+        """Fixa partículas, brilho, boca e piscar: os passos só redesenham se invalidados."""
+        self.congelado = congelado
+        self.piscando = False
+        self._assinatura = None
+
+    def invalidar(self):
+        """Faz o próximo passo devolver a cena mesmo sem mudança visível."""
+        self._assinatura = None
+
+    def _assinatura_quadro(self, agora):
+        """Resumo, em pixels, do que o quadro mostraria; igual ao anterior = pular."""
+        L = self.layout
+        particulas = tuple((int(p["x"] * L.w), int(p["y"] * L.h))
+                           for p in self.particulas[:self._n_particulas()])
+        return (L.w, L.h, self.estado, self._brilho(), self._brilho_halo(), self.piscando, self._pupila(),
+                int(L.boca_base * self._fator_boca(agora)), particulas)
+
+    def passo(self, agora):
+        """Avança a animação até `agora`; devolve a cena, ou None se nada mudou."""
+        # As fases avançam pelo tempo decorrido, não por quadro, para que a
+        # velocidade da animação não dependa da taxa escolhida.
+        dt = 0.0 if self._ultimo_tick is None else min(agora - self._ultimo_tick, 0.25)
+        passo = dt / TICK_BASE
+        self._ultimo_tick = agora
+        if self.congelado:
+            if self._assinatura is not None:
+                return None
+            self._assinatura = self._assinatura_quadro(agora)
+            return self._montar_cena(agora)
+
+        ritmo = self.tema["ritmo"]
+        if self.estado == "speaking":
+            self.boca_fase += ritmo["boca"] * passo
+        else:
+            self.boca_fase = max(0.0, self.boca_fase - ritmo["boca_recuo"] * passo)
+        self.glow_fase += ritmo["glow"] * passo
+        self._mover_particulas(passo)
+        self._atualizar_piscar(agora)
+        self._suavizar_nivel(agora, dt)
+
+        assinatura = self._assinatura_quadro(agora)
+        if assinatura == self._assinatura:
+            return None
+        self._assinatura = assinatura
+        return self._montar_cena(agora)
+
+    def _mover_particulas(self, passo):
+        if self.estado == "sleep":
+            passo *= self.tema["particulas"]["sono"]
+        for p in self.particulas:
+            p["x"] += p["vx"] * passo
+            p["y"] -= p["vy"] * passo
+            if p["y"] < 0:
+                p["y"] = 1
+                p["x"] = random.random()
+
+    def _nivel_visemas(self, agora):
+        while self._visemas and agora >= self._visemas[0][1]:
+            self._visemas.popleft()
+        if not self._visemas or agora < self._visemas[0][0]:
+            return None
+        inicio, _fim, escala, linha = self._visemas[0]
+        return linha.nivel((agora - inicio) / escala)
+
+    def _suavizar_nivel(self, agora, dt):
+        nivel = self.niveis_boca.amostrar(agora - BOCA_ATRASO)
+        if nivel is None:
+            nivel = self._nivel_visemas(agora)
+        if nivel is None or self._nivel_boca is None:
+            self._nivel_boca = nivel
+        else:
+            self._nivel_boca += (nivel - self._nivel_boca) * (1 - math.exp(-dt / BOCA_SUAVIZACAO))
+
+    def _atualizar_piscar(self, agora):
+        if self.ultimo_piscar is None:
+            self.ultimo_piscar = agora
+        intervalo = self.intervalo_piscar_sono if self.estado == "sleep" else self.intervalo_piscar
+        if not self.piscando and (agora - self.ultimo_piscar) > intervalo:
+            self.piscando = True
+            self.ultimo_piscar = agora
+        elif self.piscando and (agora - self.ultimo_piscar) > self.tema["piscar"]["duracao"]:
+            self.piscando = False
+
+    def _onda(self, b):
+        """Brilho de um descritor {"base", "padrao", "amplitude", "periodo", "onda"}, sem teto."""
+        base = b["base"].get(self.estado, b["padrao"])
+        periodo = b["periodo"]
+        if b["onda"] == "cosseno":
+            onda = abs(math.cos(self.glow_fase / periodo))
+        elif b["onda"] == "seno":
+            onda = abs(math.sin(self.glow_fase / periodo))
+        else:
+            onda = abs((self.glow_fase % periodo) - periodo/2) / (periodo/2)
+        return base + int(b["amplitude"] * onda)
+
+    def _brilho(self):
+        return min(255, self._onda(self.tema["brilho"]))
+
+    def _brilho_halo(self):
+        """Pulso próprio dos halos, ou None quando seguem a borda do rosto."""
+        halo = self.tema["rosto"]["halo_brilho"]
+        return self._onda(halo) if halo else None
+
+    def _cor_neon(self, brilho):
+        return "#%02x%02x%02x" % tuple(min(255, int(k*brilho + c)) for k, c in self.tema["neon"])
+
+    def _cor(self, spec, neon):
+        """Resolve uma cor do tema: "brilho", "olhos", {estado: hex} ou hex."""
+        if spec == "brilho":
+            return neon
+        if spec == "olhos":
+            return self._cor(self.tema["olhos"]["cor"], neon)
+        if isinstance(spec, dict):
+            return spec[self.estado]
+        return spec
+
+    def _pupila(self):
+        pupila = self.tema["olhos"]["pupila"]
+        if pupila is None:
+            return 0
+        pulso = abs(math.sin(self.glow_fase * pupila["frequencia"])) * pupila["pulso"]
+        return int(self.layout.r_olho * pupila["raio"] + pulso)
+
+    def _fator_boca(self, agora):
+        boca = self.tema["boca"]
+        if self._nivel_boca is not None:
+            # nível externo: a abertura segue o nível, sem a oscilação do estado
+            return 1 + min(1.0, self._nivel_boca)
+        if self.estado == "speaking":
+            intensidade = self.boca_intensidade if (self.fala_ate - agora) > 0 else boca["fala_fim"]
+        else:
+            intensidade = boca["intensidade"].get(self.estado, boca["padrao"])
+        meio = self.tema["ritmo"]["boca_periodo"] / 2
+        return 1 + intensidade * abs((self.boca_fase % (2*meio)) - meio) / meio
+
+    # --- cena ---
+
+    def _montar_cena(self, agora):
+        L = self.layout
+        self._cena = []
+        self._desenhar_fundo(L)
+        self._desenhar_rosto(L, agora)
+        return self._cena
+
+    def _prim(self, chave, tipo, *coords, **opcoes):
+        self._cena.append((chave, tipo, coords, opcoes))
+
+    def _desenhar_fundo(self, L):
+        w, h = L.w, L.h
+        cores = self.tema["fundo"]
+        if not self.qualidade["degrade"]:
+            cores = (cores[len(cores) // 2],)
+        for i, c in enumerate(cores):
+            self._prim(
+                f"fundo{i}", "rectangle",
+                0, (h/len(cores))*i, w, (h/len(cores))*(i+1),
+                fill=c, outline=""
+            )
+        for i, p in enumerate(self.particulas[:self._n_particulas()]):
+            x = p["x"] * w
+            y = p["y"] * h
+            r = p["r"]
+            self._prim(f"particula{i}", "oval", x-r, y-r, x+r, y+r, fill=p["cor"], outline="")
+
+    def _desenhar_rosto(self, L, agora):
+        rosto = self.tema["rosto"]
+        x1, y1, x2, y2, raio = L.x1, L.y1, L.x2, L.y2, L.raio
+
+        brilho = self._brilho()
+        cor_neon = self._cor_neon(brilho)
+        cor_borda = self._cor(rosto["cor"], cor_neon)
+
+        passo = rosto["halo_passo"]
+        brilho_halo = self._brilho_halo()
+        if brilho_halo is None:
+            brilho_halo = brilho
+        for i in range(round(rosto["halos"] * self.qualidade["halos"])):
+            cor = cor_borda
+            if rosto["halo_brilho"] or rosto["halo_degrau"]:
+                cor = self._cor_neon(brilho_halo + i*rosto["halo_degrau"])
+            caixa = (x1-i*passo, y1-i*passo, x2+i*passo, y2+i*passo)
+            if rosto["forma"] == "oval":
+                self._prim(f"halo{i}", "oval", *caixa, outline=cor, width=rosto["halo_largura"])
+            else:
+                self._round_rect(f"halo{i}", *caixa, radius=raio+i*rosto["halo_raio"],
+                                 outline=cor, width=rosto["halo_largura"])
+        if rosto["forma"] == "oval":
+            self._prim("visor", "oval", x1, y1, x2, y2, fill=rosto["fill"], outline=cor_borda, width=rosto["borda"])
+        else:
+            self._round_rect("visor", x1, y1, x2, y2, radius=raio, fill=rosto["fill"], outline=cor_borda, width=rosto["borda"])
+        if rosto["painel"]:
+            m = L.painel_margem
+            self._round_rect("painel", x1+m, y1+m, x2-m, y2-m, radius=L.painel_raio, fill=rosto["painel"], outline="")
+
+        cor_rosto = cor_neon
+        if self.usar_sprites:
+            cor_rosto = self._cor_neon(brilho - brilho % SPRITE_PASSO_COR)
+        self._desenhar_olhos(L, self._cor(self.tema["olhos"]["cor"], cor_rosto))
+        self._desenhar_boca(L, self._cor(self.tema["boca"]["cor"], cor_rosto), agora)
+        if rosto["barras"]:
+            self._desenhar_barras(L, rosto["barras"], self._cor("olhos", cor_rosto))
+
+        nome = self.tema["nome"]
+        self._prim("nome", "text", L.cx, L.nome_y, text=nome["texto"],
+                   fill=self._cor(nome["cor"], cor_neon), font=L.nome_fonte)
+
+    def _desenhar_olhos(self, L, cor):
+        olhos = self.tema["olhos"]
+        r = L.r_olho
+        sono = olhos["sono"] if self.estado == "sleep" else None
+        if sono or self.piscando:
+            # olho fechado é uma linha; o de sono é mais curto, fino e 1 px abaixo
+            rl, largura, dy = (r*sono[0], sono[1], 1) if sono else (r, L.piscar_largura, 0)
+            if self.usar_sprites:
+                sprite = ("piscar", int(rl), cor, int(largura))
+                for i, (x, y) in enumerate(L.olhos):
+                    self._prim(f"olho{i}", "image", x, y+dy, sprite=sprite)
+                return
+            for i, (x, y) in enumerate(L.olhos):
+                self._prim(f"olho{i}_piscar", "line", x-rl, y+dy, x+rl, y+dy,
+                           fill=cor, width=largura, capstyle=tk.ROUND)
+            return
+
+        halo, linha, pupila = olhos["halo"], olhos["linha"], olhos["pupila"]
+        if self.usar_sprites and linha and not pupila and not olhos["fill"]:
+            sprite = ("olho", int(r), cor, halo, olhos["aro"], linha)
+            for i, (x, y) in enumerate(L.olhos):
+                self._prim(f"olho{i}", "image", x, y, sprite=sprite)
+            return
+        for i, (x, y) in enumerate(L.olhos):
+            if halo:
+                hx, hy = r*halo[0], r*halo[1]
+                self._prim(f"olho{i}_halo", "oval", x-hx, y-hy, x+hx, y+hy, outline=cor, width=2)
+            self._prim(f"olho{i}_aro", "oval", x-r, y-r, x+r, y+r,
+                       fill=olhos["fill"], outline=cor, width=olhos["aro"])
+            if linha:
+                self._prim(f"olho{i}_linha", "line", x - r*linha, y, x + r*linha, y,
+                           fill=cor, width=olhos["aro"], capstyle=tk.ROUND)
+            if pupila:
+                pr = self._pupila()
+                self._prim(f"olho{i}_pupila", "oval", x-pr, y-pr, x+pr, y+pr, fill=pupila["cor"], outline="")
+
+    def _desenhar_boca(self, L, cor, agora):
+        boca = self.tema["boca"]
+        cx, y, largura = L.cx, L.boca_y, L.boca_largura
+        altura = L.boca_base * self._fator_boca(agora)
+        if boca["forma"] == "oval":
+            self._prim("boca", "oval", cx - largura/2, y - altura/2, cx + largura/2, y + altura/2,
+                       fill=cor, outline=boca["contorno"], width=5)
+            self._prim("boca_aura", "oval", cx - largura/2 - 4, y - altura/2 - 2, cx + largura/2 + 4, y + altura/2 + 2,
+                       outline=boca["aura"], width=2)
+            return
+        if self.usar_sprites:
+            ai = int(altura) - int(altura) % SPRITE_PASSO_BOCA
+            self._prim("boca", "image", cx, y, sprite=("boca", int(largura), ai, cor))
+            return
+        self._prim(
+            "boca", "arc",
+            cx - largura/2, y - altura/2, cx + largura/2, y + altura/2,
+            start=200, extent=140, style=tk.ARC, outline=cor, width=6
+        )
+
+    def _desenhar_barras(self, L, barras, cor):
+        meio = L.barra_comprimento / 2
+        for i, x in enumerate((L.x1 + barras["recuo"], L.x2 - barras["recuo"])):
+            self._prim(f"barra{i}", "line", x, L.cy - meio, x, L.cy + meio, fill=cor, width=L.barra_largura)
+
+    def _round_rect(self, chave, x1, y1, x2, y2, radius=25, **kwargs):
+        # Halos e visor só mudam de geometria junto com o layout: a lista de
+        # pontos é a mesma tupla de um quadro para o outro.
+        pts = self._geometria.get((x1, y1, x2, y2, radius))
+        if pts is None:
+            pts = (x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius,
+                   x2, y2, x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius,
+                   x1, y1+radius, x1, y1)
+            self._geometria[(x1, y1, x2, y2, radius)] = pts
+        self._cena.append((chave, "polygon", pts, dict(smooth=True, **kwargs)))
+
+
+def medir_qualidade(tema, canvas, sprites=None, backend="canvas", quadros=20, w=1280, h=720):
+    """Medição da partida: o primeiro nível cujos quadros cabem em GOVERNADOR_PARTIDA_MS.
+
+    Cada quadro é montado, aplicado no `canvas` por um backend descartável e
+    pintado (update_idletasks), como no FaceWidget; um primeiro quadro por
+    nível aquece o cache e não entra na média. Os itens são apagados no fim.
+    O Governador corrige a escolha com o custo real dos quadros.
+    """
+    for nivel, qualidade in enumerate(QUALIDADES):
+        modelo = RostoModelo(tema, usar_sprites=sprites is not None)
+        modelo.set_qualidade(qualidade)
+        modelo.set_layout(FaceLayout(w, h, modelo.tema))
+        aplicar = BACKENDS[backend](canvas, sprites)
+        t = time.time()
+        # quadro de aquecimento fora da conta: enche o SpriteCache e cria os
+        # itens, que nos quadros medidos (como na execução) só são atualizados
+        aplicar.desenhar(modelo.passo(t), w, h)
+        canvas.update_idletasks()
+        inicio = time.perf_counter()
+        for i in range(1, quadros + 1):
+            modelo.invalidar()
+            aplicar.desenhar(modelo.passo(t + i / 60), w, h)
+            canvas.update_idletasks()
+        custo_ms = (time.perf_counter() - inicio) * 1000 / quadros
+        canvas.delete("all")
+        if custo_ms <= GOVERNADOR_PARTIDA_MS:
+            return nivel
+    return len(QUALIDADES) - 1
+
+
+class FaceWidget:
+    """Rosto animado num canvas Tk; `tema` escolhe o descritor em temas.TEMAS.
+
+    O RostoModelo monta as cenas; aqui ficam o canvas, o backend que as
+    aplica, o agendamento adaptativo e a instrumentação. `qualidade` fixa um
+    preset de QUALIDADES pelo nome; None mede a máquina na partida e deixa o
+    Governador ajustar o nível durante a execução.
+    """
+
+    def __init__(self, parent, backend="canvas", tema="jarvis", qualidade=None):
+        self.modelo = RostoModelo(tema, usar_sprites=PIL_AVAILABLE)
+        self.tema = self.modelo.tema
+        self.canvas = tk.Canvas(parent, bg=self.tema["bg"], highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        # Olhos e boca viram imagens cacheadas quando o Pillow está disponível
+        self.sprites = SpriteCache() if PIL_AVAILABLE else None
+        if not PIL_AVAILABLE:
+            backend = "canvas"  # o backend de imagem depende do Pillow
+
+        if qualidade is None:
+            self.governador = Governador(medir_qualidade(tema, self.canvas, self.sprites, backend))
+            nivel = self.governador.nivel
+        else:
+            self.governador = None
+            nivel = [q["nome"] for q in QUALIDADES].index(qualidade)
+        self.modelo.set_qualidade(QUALIDADES[nivel])
+        self.ao_mudar_qualidade = None  # callable do App: recebe o preset novo
+
+        # Agendamento adaptativo: guarda o after pendente para poder antecipá-lo
+        self._after_id = None
+        self._proximo_tick = 0.0
+        self._periodo_ms = 0  # intervalo pedido no último _agendar
+        self._rapido_ate = 0.0
+        self.repouso = False
+
+        # Instrumentação: janelas móveis por tick e overlay ligado em F12
+        self.metricas = MetricasQuadro()
+        self.profundidade_fila = None  # callable do App: linhas da serial ainda não tratadas
+        self._overlay_id = None
+        self._overlay_after = None
+
+        self.backend = BACKENDS[backend](self.canvas, self.sprites)
+
+        self._agendar(60)
+
+    @property
+    def estado(self):
+        return self.modelo.estado
+
+    @property
+    def layout(self):
+        return self.modelo.layout
+
+    def set_estado(self, estado: str):
+        self.modelo.set_estado(estado)
+        self._acordar()
+
+    def marcar_fala(self, segundos=2.0, intensidade=None):
+        self.modelo.marcar_fala(segundos, intensidade)
+        self._acordar()
+
+    def set_mouth_level(self, level: float, t=None):
+        """Registra o nível da boca no instante t (padrão: agora); pode vir de outra thread."""
+        self.modelo.set_mouth_level(level, t)
+        self._acordar()
+
+    def tocar_visemas(self, linha, inicio=None, duracao=None):
+        self.modelo.tocar_visemas(linha, inicio, duracao)
+        self._acordar()
+
+    def parar_visemas(self):
+        self.modelo.parar_visemas()
+
+    def set_layout(self, layout):
+        """Recebe o layout do passe de resize do App; os quadros só leem dele."""
+        if self.modelo.set_layout(layout):
+            self._acordar()
+
+    def repousar(self, ativo: bool):
+        """Repouso profundo: congela o rosto e cai para FPS_REPOUSO até ser desligado."""
+        self.repouso = ativo
+        self.modelo.congelar(ativo)
+        if self._overlay_id is not None:
+            # o overlay ligado em F12 fica parado no repouso e volta ao acordar
+            if self._overlay_after is not None:
+                self.canvas.after_cancel(self._overlay_after)
+                self._overlay_after = None
+            if not ativo:
+                self._atualizar_overlay()
+        self._acordar()
+
+    # --- agendamento adaptativo ---
+
+    def _agendar(self, ms):
+        self._proximo_tick = time.time() + ms / 1000.0
+        self._periodo_ms = ms
+        self._after_id = self.canvas.after(ms, self._loop)
+
+    def _acordar(self):
+        """Volta à taxa máxima; antecipa o próximo quadro se ele estiver longe."""
+        agora = time.time()
+        self._rapido_ate = agora + FPS_RAPIDO_JANELA
+        self.modelo.invalidar()
+        # set_estado também é chamado pela thread da serial: lá só marcamos o
+        # pedido e o tick seguinte (no máximo 1/FPS_ESTADO depois) já o atende.
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if self._after_id is None or self._proximo_tick - agora <= 1.0 / FPS_MAX:
+            return
+        self.canvas.after_cancel(self._after_id)
+        self._agendar(0)
+
+    def _intervalo_ms(self, agora, mudou):
+        if self.repouso:
+            return int(1000 / FPS_REPOUSO)
+        fps = FPS_ESTADO.get(self.modelo.estado, FPS_MAX)
+        if mudou and agora < self._rapido_ate:
+            fps = FPS_MAX
+        return int(1000 / (fps * self.modelo.qualidade["fps"]))
+
+    def _loop(self):
+        self._after_id = None
+        agora = time.time()
+        atraso = agora - self._proximo_tick
+        criados = self.backend.criados
+        inicio = time.perf_counter()
+        mudou = self._passo(agora)
+        if mudou:
+            self.canvas.update_idletasks()  # o Tk pinta aqui, dentro da medição
+        desenho_ms = (time.perf_counter() - inicio) * 1000
+        self.metricas.registrar(agora, desenho_ms, atraso * 1000,
+                                self.backend.criados - criados, mudou)
+        if mudou and self.governador is not None:
+            tolerado_ms = max(self._periodo_ms, GOVERNADOR_TIMER_MS)
+            nivel = self.governador.observar(desenho_ms + max(0.0, atraso * 1000 - tolerado_ms))
+            if nivel is not None:
+                self.modelo.set_qualidade(QUALIDADES[nivel])
+                if self.ao_mudar_qualidade:
+                    self.ao_mudar_qualidade(QUALIDADES[nivel])
+        self._agendar(self._intervalo_ms(agora, mudou))
+
+    def _passo(self, agora):
+        """Avança o modelo até `agora` e aplica a cena se o quadro mudou."""
+        if self.modelo.layout is None:
+            # sem o App (ex.: benchmarks) ninguém chama set_layout: mede uma vez
+            self.modelo.set_layout(FaceLayout(self.canvas.winfo_width() or 800,
+                                              self.canvas.winfo_height() or 450, self.tema))
+        cena = self.modelo.passo(agora)
+        if cena is None:
+            return False
+        self.backend.desenhar(cena, self.modelo.layout.w, self.modelo.layout.h)
+        return True
+
+    # --- overlay de desempenho ---
+
+    def alternar_overlay(self, _event=None):
+        if self._overlay_id is None:
+            self._overlay_id = self.canvas.create_text(
+                10, 8, anchor="nw", text="", fill="#9CFF9C", font=("Consolas", 11))
+            self._atualizar_overlay()
+        else:
+            if self._overlay_after is not None:
+                self.canvas.after_cancel(self._overlay_after)
+            self.canvas.delete(self._overlay_id)
+            self._overlay_id = self._overlay_after = None
+
+    def _atualizar_overlay(self):
+        fila = self.profundidade_fila() if self.profundidade_fila else None
+        self.canvas.itemconfigure(self._overlay_id, text=self.metricas.texto(time.time(), fila))
+        self.canvas.tag_raise(self._overlay_id)
+        if not self.repouso:
+            self._overlay_after = self.canvas.after(OVERLAY_INTERVALO, self._atualizar_overlay)
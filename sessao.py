@@ -0,0 +1,224 @@
+"""Log da sessão em disco: uma thread grava, em lotes, tudo que passa por App._log.
+
+Quem registra (thread da UI ou da serial) só põe a entrada numa fila em
+memória; formatar, abrir, escrever, rotacionar e comprimir arquivos é tudo da
+thread do escritor, que acorda a cada SESSAO_DESCARGA e grava o lote numa
+escrita só.
+
+    jarvis-sessao.log                   arquivo atual, uma linha por evento:
+                                        "data hora<TAB>nivel<TAB>tag<TAB>msg"
+    jarvis-sessao.log.20261019-153000-000.gz  rotacionados (por tamanho ou idade);
+                                        o sufixo conta as rotações do mesmo
+                                        segundo, e a ordem dos nomes é a idade
+    jarvis-eventos.jsonl                eventos classificados para análise
+                                        (EventosSessao, mesmo esquema de rotação)
+    --logs-transbordo ARQUIVO           entradas que saem do anel do painel
+                                        (TransbordoLogs, idem)
+"""
+import glob
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+
+SESSAO_ARQUIVO = "jarvis-sessao.log"
+SESSAO_DESCARGA = 1.0              # s entre escritas em lote
+SESSAO_TAMANHO = 5 * 1024 * 1024   # bytes do arquivo atual antes de rotacionar
+SESSAO_IDADE = 24 * 3600.0         # s de vida do arquivo atual antes de rotacionar
+SESSAO_MANTER = 10                 # arquivos rotacionados (.gz) guardados
+SESSAO_FILA = 100_000              # entradas à espera; se o disco travar, as antigas saem
+EVENTOS_ARQUIVO = "jarvis-eventos.jsonl"
+EVENTOS_VERSAO = 3                 # sobe quando o esquema das linhas JSON mudar
+
+
+class EscritorSessao:
+    """Thread que grava o log da sessão com rotação por tamanho/idade e gzip."""
+
+    desistir = False  # True: a primeira falha do disco encerra o escritor
+
+    def __init__(self, caminho=SESSAO_ARQUIVO, tamanho=SESSAO_TAMANHO, idade=SESSAO_IDADE,
+                 manter=SESSAO_MANTER, descarga=SESSAO_DESCARGA):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.idade = idade
+        self.manter = manter
+        self.descarga = descarga
+        self.erro = None
+        # deque.append/popleft são atômicos no CPython: registrar não pega lock
+        self._fila = deque(maxlen=SESSAO_FILA)
+        self.perdidas = 0  # entradas que saíram da fila cheia sem chegar ao disco
+        self._avisadas = 0
+        self._parar = threading.Event()
+        self._arquivo = None
+        self._bytes = 0
+        self._aberto_em = 0.0
+        self._segundo = (None, "")  # (segundo, texto): data/hora formatada uma vez por segundo
+        self.thread = None
+
+    def iniciar(self, erro=None):
+        """erro(exc) é chamado, na thread do escritor, se o disco falhar."""
+        self.erro = erro
+        self.thread = threading.Thread(target=self._rodar, daemon=True)
+        self.thread.start()
+
+    def verificar(self):
+        """Abre o arquivo já, na thread de quem chama: OSError de caminho inválido sai aqui."""
+        self._abrir()
+
+    def registrar(self, nivel, tag, msg):
+        if len(self._fila) == SESSAO_FILA:
+            self.perdidas += 1
+        self._fila.append((time.time(), nivel, tag, msg))
+
+    def parar(self, espera=2.0):
+        """Pede a última descarga e espera a thread terminar (no máximo `espera` s)."""
+        self._parar.set()
+        if self.thread is not None:
+            self.thread.join(espera)
+
+    def _rodar(self):
+        while not self._parar.wait(self.descarga):
+            self._descarregar()
+        self._descarregar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+    def _descarregar(self):
+        if not self._fila:
+            return
+        linhas = []
+        fila, formatar = self._fila, self._formatar
+        while fila:
+            linhas.append(formatar(fila.popleft()))
+        if self.perdidas != self._avisadas:
+            linhas.append(self._aviso_perdas(self.perdidas - self._avisadas))
+            self._avisadas = self.perdidas
+        try:
+            if self._arquivo is None:
+                self._abrir()
+            dados = "".join(linhas).encode("utf-8")
+            self._arquivo.write(dados)
+            self._arquivo.flush()
+            self._bytes += len(dados)
+            if self._bytes >= self.tamanho or time.time() - self._aberto_em >= self.idade:
+                self._rotacionar()
+        except OSError as e:
+            # o lote se perde; a próxima descarga tenta reabrir o arquivo
+            self._fechar()
+            if self.desistir:
+                self._parar.set()
+                self._fila.clear()
+            if self.erro:
+                self.erro(e)
+
+    def _formatar(self, entrada):
+        t, nivel, tag, msg = entrada
+        return f"{self._data(t)}\t{nivel}\t{tag or ''}\t{msg}\n"
+
+    def _aviso_perdas(self, n):
+        return f"{self._data(time.time())}\twarn\tSESSAO\t{n} entradas perdidas (fila cheia)\n"
+
+    def _data(self, t):
+        s = int(t)
+        if self._segundo[0] != s:
+            self._segundo = (s, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(s)))
+        return f"{self._segundo[1]}.{int((t - s) * 1000):03d}"
+
+    def _abrir(self):
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._arquivo = open(self.caminho, "ab")
+        self._bytes = self._arquivo.tell()
+        self._aberto_em = time.time()
+
+    def _fechar(self):
+        if self._arquivo is not None:
+            try:
+                self._arquivo.close()
+            except OSError:
+                pass
+            self._arquivo = None
+
+    def _rotacionar(self):
+        self._fechar()
+        # sufixo de largura fixa, um acima do maior do mesmo segundo (não
+        # reaproveita os apagados): a ordem alfabética dos nomes é a da idade
+        base = f"{self.caminho}.{time.strftime('%Y%m%d-%H%M%S')}"
+        mesmos = glob.glob(glob.escape(base) + "-*.gz")
+        n = max((int(nome[len(base) + 1:-3]) for nome in mesmos), default=-1) + 1
+        rotacionado = f"{base}-{n:03d}"
+        os.replace(self.caminho, rotacionado)
+        with open(rotacionado, "rb") as origem, gzip.open(rotacionado + ".gz", "wb") as destino:
+            shutil.copyfileobj(origem, destino)
+        os.remove(rotacionado)
+        antigos = sorted(glob.glob(glob.escape(self.caminho) + ".*.gz"))
+        for velho in antigos[:-self.manter] if self.manter else antigos:
+            os.remove(velho)
+        self._abrir()
+
+
+class EventosSessao(EscritorSessao):
+    """Eventos classificados da sessão em JSON Lines, pelo mesmo escritor em lote.
+
+    Cada linha é um objeto com todas as chaves abaixo, sempre nesta ordem
+    (null quando não se aplica), para carregar sessões em ferramentas de
+    análise sem reinterpretar o texto do ESP-IDF:
+
+        v           EVENTOS_VERSAO
+        host_ts     time.time() do PC ao registrar, em segundos
+        device_ts   ms desde o boot do ESP32, o "(12345)" das linhas do ESP-IDF
+        type        user, bot, state, info, warn, error, other, mouth,
+                    speak_start, transition, metric ou lost
+        tag         tag do ESP-IDF
+        content     texto do evento (sem os prefixos >> e <<); nome da série
+                    nos eventos metric; null nos mouth e speak_start
+        state_from  estado do rosto antes, nos eventos transition
+        state_to    estado do rosto depois, nos eventos transition
+        turn        interação em curso (sobe a cada fala do usuário)
+        value       número do evento: valor extraído pela telemetria nos
+                    eventos metric (v2); nível da boca nos mouth e duração
+                    em s nos speak_start (v3, antes iam como texto em content)
+    """
+
+    def __init__(self, caminho=EVENTOS_ARQUIVO, **kwargs):
+        super().__init__(caminho, **kwargs)
+
+    def registrar(self, tipo, tag, conteudo, device_ts=None, de=None, para=None, turno=None,
+                  valor=None):
+        if len(self._fila) == SESSAO_FILA:
+            self.perdidas += 1
+        self._fila.append((time.time(), device_ts, tipo, tag, conteudo, de, para, turno, valor))
+
+    def _formatar(self, entrada):
+        t, device_ts, tipo, tag, conteudo, de, para, turno, valor = entrada
+        return json.dumps({
+            "v": EVENTOS_VERSAO, "host_ts": round(t, 3), "device_ts": device_ts,
+            "type": tipo, "tag": tag, "content": conteudo,
+            "state_from": de, "state_to": para, "turn": turno, "value": valor,
+        }, ensure_ascii=False) + "\n"
+
+    def _aviso_perdas(self, n):
+        return self._formatar((time.time(), None, "lost", "SESSAO",
+                               f"{n} eventos perdidos (fila cheia)", None, None, None, None))
+
+
+class TransbordoLogs(EscritorSessao):
+    """Entradas que saem do anel do BufferLogs, uma linha "nivel<TAB>tag<TAB>msg".
+
+    Mesma fila e thread do log da sessão, então o painel não espera o disco,
+    e a mesma rotação, então o arquivo não cresce sem limite. Ao contrário
+    da sessão, desiste na primeira falha: o BufferLogs segue sem transbordo.
+    """
+
+    desistir = True
+
+    def _formatar(self, entrada):
+        _t, nivel, tag, msg = entrada
+        return f"{nivel}\t{tag or ''}\t{msg}\n"
+
+    def _aviso_perdas(self, n):
+        return f"warn\tSESSAO\t{n} entradas perdidas (fila cheia)\n"
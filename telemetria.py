@@ -0,0 +1,142 @@
+"""Telemetria tirada das linhas de log do ESP-IDF: números viram séries no tempo.
+
+O firmware escreve heap livre, RSSI do Wi-Fi, nível do buffer de áudio etc.
+como texto em linhas "I (...) TAG: ...". Cada Extrator é um padrão
+pré-compilado ligado a uma tag; o primeiro grupo do padrão é o valor. Cada
+série guarda os últimos TELEMETRIA_PONTOS (horário, valor) em arrays de
+double, num anel de tamanho fixo. Para as linhas de tags sem extrator (a
+maioria), `Telemetria.processar` custa uma consulta num dict.
+
+    python GuiaJarvis.py --telemetria "heap_livre:SystemInfo:free sram: (\\d+)"
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+TELEMETRIA_PONTOS = 3600   # pontos guardados por série (1 h a uma linha por segundo)
+TELEMETRIA_INTERVALO = 1000  # ms: no máximo uma atualização do resumo na tela
+
+# (nome da série, tag, padrão) usados quando nada é configurado
+EXTRATORES_PADRAO = (
+    ("heap_livre", "SystemInfo", r"free sram: (\d+)"),
+    ("heap_minimo", "SystemInfo", r"minimal sram: (\d+)"),
+    ("heap_livre", "MAIN", r"free heap:? (\d+)"),
+    ("rssi", "wifi", r"rssi[:=\s]+(-?\d+)"),
+    ("rssi", "WifiStation", r"rssi[:=\s]+(-?\d+)"),
+    ("buffer_audio", "AudioService", r"(?:buffer|queue)[^:=\d]*[:=\s]+(\d+)"),
+    ("buffer_audio", "I2S", r"(?:buffer|queue)[^:=\d]*[:=\s]+(\d+)"),
+)
+
+
+class SerieTempo:
+    """Anel de (horário, valor) com capacidade fixa, em dois array('d')."""
+
+    __slots__ = ("tempos", "valores", "capacidade", "_prox", "_n")
+
+    def __init__(self, capacidade=TELEMETRIA_PONTOS):
+        self.capacidade = capacidade
+        self.tempos = array("d", bytes(8 * capacidade))
+        self.valores = array("d", bytes(8 * capacidade))
+        self._prox = 0  # posição do próximo ponto
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def adicionar(self, t, valor):
+        i = self._prox
+        self.tempos[i] = t
+        self.valores[i] = valor
+        self._prox = (i + 1) % self.capacidade
+        if self._n < self.capacidade:
+            self._n += 1
+
+    def ultimo(self):
+        """(horário, valor) do ponto mais recente, ou None."""
+        if not self._n:
+            return None
+        i = self._prox - 1
+        return self.tempos[i], self.valores[i]
+
+    def pontos(self, desde=None):
+        """Lista de (horário, valor) do mais antigo ao mais novo, só os de `desde` em diante."""
+        if self._n < self.capacidade:
+            tempos, valores = self.tempos[:self._n], self.valores[:self._n]
+        else:
+            i = self._prox
+            tempos = self.tempos[i:] + self.tempos[:i]
+            valores = self.valores[i:] + self.valores[:i]
+        ini = bisect_left(tempos, desde) if desde is not None else 0
+        return list(zip(tempos[ini:], valores[ini:]))
+
+    def resumo(self, desde=None):
+        """(mínimo, média, máximo, pontos) no período, ou None se vazio."""
+        valores = [v for _t, v in self.pontos(desde)]
+        if not valores:
+            return None
+        return min(valores), sum(valores) / len(valores), max(valores), len(valores)
+
+
+class Extrator:
+    __slots__ = ("nome", "tag", "padrao")
+
+    def __init__(self, nome, tag, padrao):
+        self.nome = nome
+        self.tag = tag
+        self.padrao = re.compile(padrao, re.IGNORECASE)
+        if self.padrao.groups < 1:
+            raise ValueError(f"padrão de {nome!r} precisa de um grupo com o número: {padrao!r}")
+
+
+def ler_extrator(texto):
+    """Extrator de "NOME:TAG:PADRÃO" (opção --telemetria); ValueError se malformado."""
+    nome, _, resto = texto.partition(":")
+    tag, _, padrao = resto.partition(":")
+    if not (nome and tag and padrao):
+        raise ValueError(f"esperava NOME:TAG:PADRÃO, recebeu {texto!r}")
+    try:
+        return Extrator(nome, tag, padrao)
+    except re.error as e:
+        raise ValueError(f"padrão inválido em {texto!r}: {e}") from None
+
+
+class Telemetria:
+    """Extratores por tag e as séries que eles alimentam."""
+
+    def __init__(self, extratores=None, pontos=TELEMETRIA_PONTOS):
+        if extratores is None:
+            extratores = [Extrator(*e) for e in EXTRATORES_PADRAO]
+        self.por_tag = {}
+        self.series = {}
+        for extrator in extratores:
+            self.por_tag.setdefault(extrator.tag, []).append(extrator)
+            if extrator.nome not in self.series:
+                self.series[extrator.nome] = SerieTempo(pontos)
+
+    def processar(self, tag, msg, t):
+        """Alimenta as séries com os números da linha; devolve os (nome, valor) extraídos."""
+        extratores = self.por_tag.get(tag)
+        if extratores is None:
+            return ()
+        achados = []
+        for extrator in extratores:
+            m = extrator.padrao.search(msg)
+            if m:
+                try:
+                    valor = float(m.group(1))
+                except (TypeError, ValueError):
+                    continue
+                self.series[extrator.nome].adicionar(t, valor)
+                achados.append((extrator.nome, valor))
+        return achados
+
+    def resumo(self, desde=None):
+        """Uma linha por série com pontos: último valor e mínimo/máximo no período."""
+        linhas = []
+        for nome, serie in self.series.items():
+            estatisticas = serie.resumo(desde)
+            if estatisticas is None:
+                continue
+            minimo, _media, maximo, _n = estatisticas
+            linhas.append(f"{nome}: {serie.ultimo()[1]:g} (mín {minimo:g}, máx {maximo:g})")
+        return "\n".join(linhas)
@@ -0,0 +1,142 @@
+"""Temas do rosto: descritores de dados lidos pelo FaceWidget (rosto.py).
+
+Cada tema diz o que desenhar; o como (cena, sprites, backends, taxa de
+quadros) é único para todos. Proporções são frações da caixa do rosto
+(x1, y1, x2, y2), salvo indicação; ritmos são por TICK_BASE (60 ms).
+
+Cores podem ser um hex fixo, um dict {estado: hex}, "brilho" — a cor neon
+animada, calculada a partir de "brilho" e "neon" — ou "olhos" (a dos olhos).
+"halo_brilho", no mesmo formato de "brilho", dá aos halos um pulso próprio;
+None faz os halos seguirem a borda.
+"""
+import colorsys
+
+
+def _hsv_hex(h, s, v):
+    return "#%02x%02x%02x" % tuple(int(c*255) for c in colorsys.hsv_to_rgb(h, s, v))
+
+
+def _degrade(topo, meio, base, passos):
+    """Faixas de fundo indo de topo a meio e de meio a base."""
+    cores = []
+    for i in range(passos):
+        t = i / (passos - 1)
+        de, ate, a = (topo, meio, t*2) if t < 0.5 else (meio, base, (t - 0.5)*2)
+        cores.append("#%02x%02x%02x" % tuple(int(c0 + (c1 - c0)*a) for c0, c1 in zip(de, ate)))
+    return tuple(cores)
+
+
+TEMAS = {
+    # Visor retangular com halos neon (GuiaJarvis.py)
+    "jarvis": {
+        "nome": {"texto": "Jarvis", "cor": "brilho", "desce": 0.035, "fonte": (0.04, 18)},
+        "bg": "#010204",
+        "fundo": ("#030608", "#060A12", "#0A101C", "#080C16", "#030509"),
+        "particulas": {
+            "quantidade": 30, "vx": 0.0008, "vy": (0.001, 0.004), "r": (0.8, 2.2),
+            "cor": {"de": "#2878FF", "ate": "#78C8FF", "t": (0.4, 1.0)},
+            "sono": 1.0,
+        },
+        "ritmo": {"boca": 0.9, "boca_recuo": 0.25, "glow": 0.45, "boca_periodo": 20},
+        "piscar": {"intervalo": 3.2, "sono": 7.5, "duracao": 0.16},
+        "brilho": {"base": {"speaking": 140, "listening": 110}, "padrao": 70,
+                   "amplitude": 40, "periodo": 60, "onda": "triangulo"},
+        "neon": ((0.5, 0), (1, 0), (0, 255)),
+        "rosto": {
+            "forma": "visor", "caixa": (0.20, 0.16, 0.80, 0.84), "raio": 0.06,
+            "halos": 6, "halo_passo": 2, "halo_raio": 1.6, "halo_largura": 1,
+            "halo_brilho": None, "halo_degrau": 0,
+            "borda": 3, "cor": "brilho", "fill": "#05070D",
+            "painel": "#020307", "painel_margem": (6, 0), "painel_raio": (5, 0),
+            "barras": None,
+        },
+        "olhos": {
+            "cor": "brilho", "espacamento": 0.36, "raio": 0.12, "subida": 0.25,
+            "halo": (1.25, 1.25), "aro": 5, "fill": "", "linha": 0.8, "pupila": None,
+            "piscar": (8, 0), "sono": None,
+        },
+        "boca": {
+            "forma": "arco", "cor": "brilho", "largura": 0.50, "altura": 0.20, "desce": 0.28,
+            "fala": 0.35, "fala_fim": 0.33,
+            "intensidade": {"listening": 0.16, "sleep": 0.08}, "padrao": 0.15,
+        },
+    },
+
+    # Variante do visor, sem halos, cores por estado (AliciaGUI.py)
+    "alicia": {
+        "nome": {"texto": "Alicia", "cor": "#FFFFFF", "desce": 0.03, "fonte": (0.04, 20)},
+        "bg": "#020308",
+        "fundo": _degrade((4, 9, 24), (9, 10, 32), (6, 5, 16), 7),
+        "particulas": {
+            "quantidade": 18, "vx": 0.0, "vy": (0.001, 0.003), "r": (1.5, 3.5),
+            "cor": "#1B2B33",
+            "sono": 0.25,
+        },
+        "ritmo": {"boca": 1.0, "boca_recuo": 0.5, "glow": 0.6, "boca_periodo": 18},
+        "piscar": {"intervalo": 4.0, "sono": 10.0, "duracao": 0.18},
+        "brilho": {"base": {"speaking": 78, "listening": 68}, "padrao": 52,
+                   "amplitude": 24, "periodo": 40, "onda": "triangulo"},
+        "neon": ((1, 0), (1, 30), (1, 70)),
+        "rosto": {
+            "forma": "visor", "caixa": (0.20, 0.18, 0.80, 0.82), "raio": 0.05,
+            "halos": 0, "halo_passo": 0, "halo_raio": 0, "halo_largura": 1,
+            "halo_brilho": None, "halo_degrau": 0,
+            "borda": 5, "cor": "brilho", "fill": "#050508",
+            "painel": "#020307", "painel_margem": (6, 0.01), "painel_raio": (6, 8),
+            "barras": {"largura": (0.03, 4), "comprimento": 0.34, "recuo": 14},
+        },
+        "olhos": {
+            "cor": {"speaking": "#7CFF2F", "listening": "#00E5FF", "sleep": "#4E656F",
+                    "idle": "#4FFFB2"},
+            "espacamento": 0.34, "raio": 0.11, "subida": 0.25,
+            "halo": None, "aro": 5, "fill": "", "linha": 0.78, "pupila": None,
+            "piscar": (6, 0), "sono": (0.9, 5),
+        },
+        "boca": {
+            "forma": "arco", "cor": "olhos", "largura": 0.48, "altura": 0.22, "desce": 0.154,
+            "fala": 0.65, "fala_fim": 0.35,
+            "intensidade": {"listening": 0.12, "sleep": 0.05}, "padrao": 0.22,
+        },
+    },
+
+    # Oval neon com pupilas e boca rosa (novo.py). O original rodava a 40 ms
+    # por tick: ritmos e velocidades abaixo já estão multiplicados por 1,5.
+    "javis": {
+        "nome": {"texto": "Javis", "cor": "#66E6FF", "desce": 0.074, "fonte": (1/17, 0)},
+        "bg": "#08092F",
+        "fundo": tuple(_hsv_hex(0.65 + i*0.025, 0.3, 0.16 + i*0.10) for i in range(7)),
+        "particulas": {
+            "quantidade": 38, "vx": 0.00255, "vy": (0.0045, 0.012), "r": (1.2, 3.8),
+            "cor": {"h": (0.5, 0.75), "s": (0.75, 0.75), "v": (0.3, 1.0)},
+            "sono": 1.0,
+        },
+        "ritmo": {"boca": 1.8, "boca_recuo": 0.45, "glow": 0.465, "boca_periodo": 18},
+        "piscar": {"intervalo": 3.2, "sono": 7.5, "duracao": 0.13},
+        "brilho": {"base": {}, "padrao": 100,
+                   "amplitude": 120, "periodo": 10, "onda": "cosseno"},
+        "neon": ((0.5, 0), (1, 0), (0, 255)),
+        "rosto": {
+            "forma": "oval", "caixa": (0.24, 0.08, 0.76, 0.86), "raio": 0,
+            "halos": 9, "halo_passo": 3, "halo_raio": 0, "halo_largura": 2,
+            # o halo pulsa em seno próprio, fora de fase com a borda (cosseno)
+            "halo_brilho": {"base": {}, "padrao": 150, "amplitude": 55, "periodo": 7,
+                            "onda": "seno"},
+            "halo_degrau": 10,
+            "borda": 7, "cor": "brilho", "fill": "#060E29",
+            "painel": None, "painel_margem": (0, 0), "painel_raio": (0, 0),
+            "barras": None,
+        },
+        "olhos": {
+            "cor": "brilho", "espacamento": 0.52, "raio": 0.0485, "subida": 0.93,
+            "halo": (1.6, 1.35), "aro": 4, "fill": "#1C3A62", "linha": None,
+            "pupila": {"raio": 0.46, "pulso": 4, "frequencia": 1.17, "cor": "#67FFFF"},
+            "piscar": (0, 1.29), "sono": None,
+        },
+        "boca": {
+            "forma": "oval", "cor": "#FF53B7", "contorno": "#FFE1FB", "aura": "#AAC0FF",
+            "largura": 0.36, "altura": 0.13, "desce": 0.1625,
+            "fala": 0.56, "fala_fim": 0.33,
+            "intensidade": {"listening": 0.18, "sleep": 0.11}, "padrao": 0.15,
+        },
+    },
+}
@@ -0,0 +1,34 @@
+import glob
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import sessao
+from sessao import EscritorSessao
+
+
+class RotacaoTest(unittest.TestCase):
+    def test_varias_rotacoes_no_mesmo_segundo_mantem_as_mais_novas(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "sessao.log")
+            # tamanho=1: cada descarga rotaciona; o relógio parado força o mesmo segundo
+            escritor = EscritorSessao(caminho, tamanho=1, manter=3)
+            with mock.patch.object(sessao.time, "strftime", return_value="20261019-153000"):
+                for i in range(12):
+                    escritor.registrar("info", "TESTE", f"lote {i}")
+                    escritor._descarregar()
+            escritor._fechar()
+
+            guardados = sorted(glob.glob(caminho + ".*.gz"))
+            self.assertEqual(len(guardados), 3)
+            lotes = []
+            for nome in guardados:
+                with gzip.open(nome, "rt", encoding="utf-8") as f:
+                    lotes.append(f.read().rsplit("\t", 1)[1].strip())
+            self.assertEqual(lotes, ["lote 9", "lote 10", "lote 11"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Texto da resposta do assistente num tk.Text, atualizado por incrementos.
+
+Cada fragmento "<<" entra com `acrescentar`, que insere só o pedaço novo no
+fim do widget em vez de apagar e reinserir a resposta inteira. Fragmentos
+que chegam com menos de TEXTO_IA_INTERVALO entre si são juntados numa única
+inserção, e as linhas além de TEXTO_IA_LINHAS saem do topo, para o widget
+não crescer sem limite numa resposta longa.
+"""
+import time
+import tkinter as tk
+
+TEXTO_IA_INTERVALO = 50  # ms: no máximo uma inserção no widget por intervalo
+TEXTO_IA_LINHAS = 200    # linhas mantidas no widget; as mais antigas saem
+
+
+class TextoIA:
+    def __init__(self, text, intervalo=TEXTO_IA_INTERVALO, linhas=TEXTO_IA_LINHAS):
+        self.text = text
+        self.intervalo = intervalo
+        self.linhas = linhas
+        self._pendente = []
+        self._after_id = None
+        self._ultimo = 0.0  # horário da última inserção
+
+    def definir(self, txt: str):
+        """Troca todo o conteúdo (começo de uma resposta nova)."""
+        self.limpar()
+        self.acrescentar(txt)
+
+    def limpar(self):
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+        self._pendente.clear()
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def acrescentar(self, fragmento: str):
+        if not fragmento:
+            return
+        self._pendente.append(fragmento)
+        if self._after_id is not None:
+            return  # já há uma inserção marcada: o fragmento vai junto
+        espera = self._ultimo + self.intervalo / 1000.0 - time.time()
+        if espera <= 0:
+            self._aplicar()
+        else:
+            self._after_id = self.text.after(int(espera * 1000) + 1, self._aplicar)
+
+    def _aplicar(self):
+        self._after_id = None
+        self._ultimo = time.time()
+        t = self.text
+        t.config(state=tk.NORMAL)
+        t.insert(tk.END, "".join(self._pendente))
+        self._pendente.clear()
+        excesso = int(t.index("end-1c").split(".")[0]) - self.linhas
+        if excesso > 0:
+            t.delete("1.0", f"{excesso + 1}.0")
+        t.see(tk.END)
+        t.config(state=tk.DISABLED)
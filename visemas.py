@@ -0,0 +1,116 @@
+"""Linha do tempo de visemas (abertura da boca) a partir de texto em português.
+
+Aproximação barata, sem dicionário: cada grupo de vogais é o núcleo de uma
+sílaba, a vogal mais aberta do grupo dá a abertura, consoante bilabial
+(m, b, p) ou labiodental (f, v) logo antes fecha a boca no começo da sílaba,
+vogal acentuada alonga a sílaba e pontuação vira pausa. O resultado são
+quadros-chave (tempo, nível) que o FaceWidget interpola na hora do quadro.
+"""
+import bisect
+import re
+from functools import lru_cache
+
+VISEMA_SILABA = 0.16      # s por sílaba (≈ 6 sílabas/s, fala de TTS)
+VISEMA_TONICA = 1.3       # vogal acentuada dura isso a mais
+VISEMA_PAUSA_CURTA = 0.22  # , ; :
+VISEMA_PAUSA_LONGA = 0.45  # . ! ? e quebra de linha
+VISEMA_CACHE = 256        # linhas do tempo memorizadas (por texto)
+SILABAS_POR_PALAVRA = 1.4  # média usada na estimativa de duração da fala
+
+# Nível de abertura por vogal (0 = fechada, 1 = toda aberta)
+ABERTURA = {
+    "a": 0.9, "á": 0.9, "à": 0.9, "â": 0.75, "ã": 0.7,
+    "e": 0.6, "é": 0.7, "ê": 0.55,
+    "o": 0.65, "ó": 0.75, "ô": 0.6, "õ": 0.6,
+    "i": 0.4, "í": 0.45, "y": 0.4,
+    "u": 0.4, "ú": 0.45, "ü": 0.4,
+}
+FECHAMENTO = {"m": 0.0, "b": 0.0, "p": 0.0, "f": 0.2, "v": 0.2}
+_TONICAS = set("áàâãéêíóôõú")
+_VOGAIS = "".join(ABERTURA)
+
+# sílaba: (consoante logo antes)(grupo de vogais) | pausa curta | pausa longa | dígito
+_TOKEN = re.compile(
+    rf"([^\W\d_{_VOGAIS}]?)([{_VOGAIS}]+)|([,;:])|([.!?…\n]+)|(\d)",
+    re.IGNORECASE,
+)
+
+
+class Visemas:
+    """Quadros-chave (tempos, níveis) de uma fala; `nivel(t)` interpola."""
+
+    __slots__ = ("tempos", "niveis", "duracao")
+
+    def __init__(self, tempos, niveis):
+        self.tempos = tempos
+        self.niveis = niveis
+        self.duracao = tempos[-1] if tempos else 0.0
+
+    def nivel(self, t):
+        i = bisect.bisect(self.tempos, t)
+        if i == 0 or i == len(self.tempos):
+            return 0.0
+        t0, t1 = self.tempos[i-1], self.tempos[i]
+        v0, v1 = self.niveis[i-1], self.niveis[i]
+        return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+
+
+class ContagemFala:
+    """Palavras e sílabas (estimadas) de uma resposta, somadas por fragmento.
+
+    Os apps estimam duração e intensidade da fala a partir da resposta
+    acumulada; somar só o fragmento novo evita recontar o texto inteiro.
+    """
+
+    __slots__ = ("palavras", "silabas")
+
+    def __init__(self):
+        self.zerar()
+
+    def zerar(self):
+        self.palavras = 0
+        self.silabas = 0.0
+
+    def acrescentar(self, fragmento: str):
+        n = len(fragmento.split())
+        self.palavras += n
+        self.silabas += n * SILABAS_POR_PALAVRA
+
+
+_NUCLEOS = {}  # grupo de vogais -> (nível, duração da sílaba)
+
+
+def _nucleo(vogais):
+    nucleo = _NUCLEOS.get(vogais)
+    if nucleo is None:
+        tonica = VISEMA_TONICA if _TONICAS.intersection(vogais) else 1.0
+        nucleo = _NUCLEOS[vogais] = (max(ABERTURA[v] for v in vogais), VISEMA_SILABA * tonica)
+    return nucleo
+
+
+@lru_cache(maxsize=VISEMA_CACHE)
+def visemas(texto: str) -> Visemas:
+    tempos, niveis = [0.0], [0.0]
+    marca, nivela = tempos.append, niveis.append
+    t = 0.0
+    for consoante, vogais, curta, longa, digito in _TOKEN.findall(texto.lower()):
+        if vogais:
+            nivel, d = _nucleo(vogais)
+            if consoante in FECHAMENTO:
+                marca(t + d*0.15)
+                nivela(FECHAMENTO[consoante])
+            marca(t + d*0.5)
+            nivela(nivel)
+            t += d
+        elif digito:
+            # número lido por extenso: ~1,5 sílaba por dígito, abertura média
+            marca(t + VISEMA_SILABA*0.75)
+            nivela(0.6)
+            t += VISEMA_SILABA*1.5
+        else:
+            marca(t + 0.06)
+            nivela(0.0)
+            t += VISEMA_PAUSA_CURTA if curta else VISEMA_PAUSA_LONGA
+    marca(t + 0.08)
+    nivela(0.0)
+    return Visemas(tuple(tempos), tuple(niveis))